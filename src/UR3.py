@@ -1,6 +1,8 @@
-import socket
 import time
 
+from connection import get_pool
+from gripper import render_grip_program
+
 # Dirección IP del robot UR
 HOST = "10.10.73.23X"
 
@@ -8,19 +10,21 @@ HOST = "10.10.73.23X"
 PORT = 30002
 
 # Scripts para abrir y cerrar la pinza
-Abrir_pinza = 'pinza40UR3.py'
-Cerrar_pinza = 'pinza10UR3.py'
+Abrir_pinza = render_grip_program(43.5)
+Cerrar_pinza = render_grip_program(15.0)
 
 # Función para enviar una trayectoria en espacio de configuraciones a la controladora del robot
 def send_joint_path(path, sock):
     for joint_config in path:
         print(joint_config)
-        sock.send(f"movej({joint_config}, a=0.5, v=0.5)".encode() + "\n".encode())
+        sock.sendall(f"movej({joint_config}, a=0.5, v=0.5)".encode() + "\n".encode())
         time.sleep(3)
 
-# Conexión via socket a la controladora del robot
-sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-sock.connect((HOST, PORT))
+# Conexión persistente a la controladora del robot (se reconecta sola si se cae)
+pool = get_pool(HOST, {"primary": PORT})
+sock = pool.primary
+if not sock.connect():
+    raise SystemExit(f"No se puede conectar a {HOST}:{PORT}: {sock.error}")
 
 # Trayectoria -- configuraciones (variables articulares, en radianes)
 path = [
@@ -32,12 +36,12 @@ path = [
 # Se envia la trayectoria a la controladora del robot
 send_joint_path(path, sock)
 # Enviar archivo script abrir pinza
-with open(Cerrar_pinza, 'rb') as f: sock.sendall(f.read())
+sock.sendall(Cerrar_pinza)
 time.sleep(1)
 # Se envia la trayectoria a la controladora del robot
 send_joint_path(path, sock)
 # Enviar archivo script cerrar pinza
-with open(Abrir_pinza, 'rb') as f: sock.sendall(f.read())
+sock.sendall(Abrir_pinza)
 time.sleep(1)
 # Se envia la trayectoria a la controladora del robot
 send_joint_path(path, sock)
@@ -46,7 +50,7 @@ send_joint_path(path, sock)
 # de la trayectoria
 print("Trayectoria finalizada")
 
-data = sock.recv(1024)
+data = sock.sock.recv(1024)
 
 # Se cierra la conexión
-sock.close()
\ No newline at end of file
+pool.close()
\ No newline at end of file
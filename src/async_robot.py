@@ -0,0 +1,70 @@
+# src/async_robot.py
+
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List
+
+from robot_control import Robot
+
+# API asincrona sopra Robot.
+#
+# Le operazioni di Robot bloccano finché il controller non conferma la fine
+# (programma terminato / registro di completamento). AsyncRobot le esegue in
+# un unico thread dedicato al robot, nell'ordine in cui sono state chieste, e
+# restituisce subito un awaitable: il loop del gioco può intanto parlare,
+# leggere la camera o preparare la parola successiva.
+#
+#   async with AsyncRobot(robot) as arobot:
+#       placed, _ = await asyncio.gather(
+#           arobot.place_letter_in_slot("A", 0),
+#           say_async("Prendo la lettera A!"),
+#       )
+#
+# Annullare l'awaitable non ferma il robot: l'operazione già partita arriva
+# in fondo, quelle ancora in coda vengono scartate.
+
+
+class AsyncRobot:
+    """Wrapper asyncio di Robot: un thread per il robot, un awaitable per ogni operazione."""
+
+    def __init__(self, robot: Robot):
+        self.robot = robot
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="robot")
+
+    def submit(self, method: Callable, *args, **kwargs) -> Future:
+        """Accoda `method(*args, **kwargs)` nel thread del robot (per codice non asyncio)."""
+        return self._executor.submit(method, *args, **kwargs)
+
+    async def _call(self, method: Callable, *args, **kwargs):
+        return await asyncio.wrap_future(self.submit(method, *args, **kwargs))
+
+    # ---------- OPERAZIONI ----------
+
+    async def move_linear(self, pose: List[float], profile: str | None = None) -> bool:
+        return await self._call(self.robot.move_linear, pose, profile)
+
+    async def move_joints(self, joints: List[float], profile: str | None = None) -> bool:
+        return await self._call(self.robot.move_joints, joints, profile)
+
+    async def grip(self, state: bool) -> bool:
+        return await self._call(self.robot.grip, state)
+
+    async def place_letter_in_slot(self, letter: str, slot_index: int, compiled: bool | None = None) -> bool:
+        return await self._call(self.robot.place_letter_in_slot, letter, slot_index, compiled)
+
+    async def place_word(self, letters: str, slot_indexes: List[int] | None = None,
+                         compiled: bool | None = None) -> List[tuple]:
+        return await self._call(self.robot.place_word, letters, slot_indexes, compiled)
+
+    # ---------- CHIUSURA ----------
+
+    async def close(self):
+        """Attende le operazioni in corso, poi chiude le connessioni del robot."""
+        await self._call(self.robot.close)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self) -> "AsyncRobot":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
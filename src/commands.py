@@ -0,0 +1,157 @@
+# src/commands.py
+
+import math
+from dataclasses import dataclass, replace
+from typing import List, Sequence, Tuple, Union
+
+# Comandi robot come oggetti: si possono accumulare, trasformare e poi tradurre
+# in URScript (una riga alla volta oppure come unico programma def ... end).
+
+# Registro di output usato dai programmi compilati per segnalare il completamento
+DONE_REGISTER = 0
+# Esito dell'ultima verifica di presa: +tag presa riuscita, -tag fallita, 0 nessuna
+GRASP_REGISTER = 1
+# Apertura misurata dal gripper dopo la presa (decimi di mm)
+GRASP_WIDTH_REGISTER = 2
+
+
+def _fmt(values: Sequence[float]) -> str:
+    return ", ".join(f"{v:.5f}" for v in values)
+
+
+@dataclass(frozen=True)
+class MoveL:
+    """Movimento lineare verso una posa assoluta [x,y,z,rx,ry,rz]."""
+
+    pose: Tuple[float, ...]
+    a: float
+    v: float
+    r: float = 0.0
+
+    def to_urscript(self) -> str:
+        blend = f", r={self.r:.4f}" if self.r > 0 else ""
+        return f"movel(p[{_fmt(self.pose)}], a={self.a}, v={self.v}{blend})"
+
+
+@dataclass(frozen=True)
+class MoveJ:
+    """Movimento nello spazio dei giunti verso [q1..q6] (rad)."""
+
+    joints: Tuple[float, ...]
+    a: float
+    v: float
+    r: float = 0.0
+
+    def to_urscript(self) -> str:
+        blend = f", r={self.r:.4f}" if self.r > 0 else ""
+        return f"movej([{_fmt(self.joints)}], a={self.a}, v={self.v}{blend})"
+
+
+@dataclass(frozen=True)
+class Grip:
+    """Apertura/chiusura RG2 (larghezza in mm, forza in N)."""
+
+    width: float
+    force: float
+    blocking: bool = True
+
+    def to_urscript(self) -> str:
+        return (
+            f"rg_grip({self.width}, {self.force}, tool_index = 0, "
+            f"blocking = {self.blocking}, depth_comp = False, popupmsg = True)\n"
+            f"rg_payload_set(mass = 0.0, tool_index = 0, use_guard = True)"
+        )
+
+
+@dataclass(frozen=True)
+class WaitGrip:
+    """
+    Barriera: attende che il gripper abbia finito un Grip non bloccante.
+    Si mette prima del movimento che ha bisogno delle dita in posizione
+    (es. la discesa sulla tessera), così l'azionamento si sovrappone al transito.
+    """
+
+    def to_urscript(self) -> str:
+        return "while rg_Busy_arr[0]:\n  sync()\nend"
+
+
+@dataclass(frozen=True)
+class CheckGrasp:
+    """
+    Verifica della presa appena chiusa: pubblica rg_Width e rg_Grip_detected sui
+    registri di output e, con abort=True, se la tessera non è stata presa
+    termina subito il programma (il resto del ciclo sarebbe a vuoto).
+    """
+
+    tag: int = 1
+    abort: bool = True
+
+    def to_urscript(self) -> str:
+        stop = '\n  textmsg("WordBuddy: presa fallita ", {0})\n  halt'.format(self.tag) if self.abort else ""
+        return (
+            f"write_output_integer_register({GRASP_WIDTH_REGISTER}, floor(rg_Width * 10))\n"
+            f"if not rg_Grip_detected:\n"
+            f"  write_output_integer_register({GRASP_REGISTER}, {-self.tag}){stop}\n"
+            f"end\n"
+            f"write_output_integer_register({GRASP_REGISTER}, {self.tag})"
+        )
+
+
+Command = Union[MoveL, MoveJ, Grip, WaitGrip, CheckGrasp]
+
+
+def clamp_blends(commands: List[Command]) -> List[Command]:
+    """
+    Limita i raggi di raccordo: il controller rifiuta raggi più grandi di metà
+    dei segmenti adiacenti, e un raccordo non ha senso se dopo il movimento c'è
+    un comando non di movimento (es. il gripper).
+    """
+    result = list(commands)
+    for i, command in enumerate(result):
+        if not isinstance(command, MoveL) or command.r <= 0:
+            continue
+        nxt = result[i + 1] if i + 1 < len(result) else None
+        if not isinstance(nxt, MoveL):
+            result[i] = replace(command, r=0.0)
+            continue
+        limit = 0.4 * math.dist(command.pose[:3], nxt.pose[:3])
+        prev = result[i - 1] if i > 0 else None
+        if isinstance(prev, MoveL):
+            limit = min(limit, 0.4 * math.dist(prev.pose[:3], command.pose[:3]))
+        result[i] = replace(command, r=min(command.r, limit))
+    return result
+
+
+def clamp_speeds(commands: List[Command], max_speed: float, max_acc: float) -> List[Command]:
+    """
+    Applica i limiti di sicurezza (safety.max_speed / max_acc) a velocità e
+    accelerazione di tutti i movimenti, qualunque profilo li abbia generati.
+    """
+    result = list(commands)
+    for i, command in enumerate(result):
+        if isinstance(command, (MoveL, MoveJ)) and (command.v > max_speed or command.a > max_acc):
+            result[i] = replace(command, v=min(command.v, max_speed), a=min(command.a, max_acc))
+    return result
+
+
+def compile_program(name: str, commands: List[Command], preamble: str = "",
+                    sequence_id: int = 0) -> str:
+    """
+    Traduce una lista di comandi in un unico programma URScript.
+    `preamble` (già indentato) viene inserito prima dei comandi: serve per
+    inizializzare una volta sola il runtime del gripper.
+    A fine programma scrive `sequence_id` nel registro DONE_REGISTER; se ci
+    sono verifiche di presa, GRASP_REGISTER viene azzerato all'inizio.
+    """
+    lines = [f"def {name}():"]
+    if preamble:
+        lines.append(preamble.rstrip("\n"))
+    if any(isinstance(c, CheckGrasp) for c in commands):
+        lines.append(f"  write_output_integer_register({GRASP_REGISTER}, 0)")
+    for command in clamp_blends(commands):
+        for line in command.to_urscript().splitlines():
+            lines.append(f"  {line}")
+    lines.append(f"  write_output_integer_register({DONE_REGISTER}, {sequence_id})")
+    lines.append(f'  textmsg("WordBuddy: sequenza completata ", {sequence_id})')
+    lines.append("end")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,304 @@
+# src/connection.py
+
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from rtde_client import RTDEClient
+
+# Connessioni persistenti alle porte del controller, condivise da Robot e
+# dagli script di prova (testmovel, UR3, demo_gripper_1).
+#
+#   primary    30002  programmi URScript (e flusso di stato)
+#   dashboard  29999  comandi testuali (stop, play, robotmode, ...)
+#   rtde       30004  stato a 125 Hz
+#
+# Ogni connessione resta aperta tra un comando e l'altro. Se cade viene
+# riaperta con backoff esponenziale (base, 2·base, 4·base, ... fino a `cap`,
+# al più `attempts` tentativi). Il comando durante il quale è caduta ha un
+# esito deterministico: con replay=True viene reinviato una volta sulla nuova
+# connessione, altrimenti (o se la riconnessione fallisce) solleva
+# ConnectionLost. Nessun comando viene perso in silenzio. Chi invia può
+# passare `cancelled`: se nel frattempo ha rinunciato (timeout, stop di
+# emergenza) i tentativi si interrompono e il comando non viene reinviato.
+#
+# get_pool(host, porte) restituisce sempre lo stesso pool per lo stesso
+# controller (host e porta primaria), anche se gli utenti indicano porte
+# diverse (Robot tutte, gli script solo la primaria): le porte si sommano.
+
+PRIMARY_PORT = 30002
+DASHBOARD_PORT = 29999
+RTDE_PORT = 30004
+
+
+class ConnectionLost(OSError):
+    """La connessione è caduta e il comando non è stato (ri)consegnato."""
+
+
+class Backoff:
+    """Attese tra i tentativi di riconnessione: base, 2·base, ... fino a cap."""
+
+    def __init__(self, base: float = 0.5, cap: float = 8.0, attempts: int = 5):
+        self.base = base
+        self.cap = cap
+        self.attempts = attempts
+
+    def delays(self) -> List[float]:
+        return [min(self.cap, self.base * 2 ** n) for n in range(max(0, self.attempts - 1))]
+
+
+def _sleep(seconds: float, cancelled: Optional[Callable[[], bool]]) -> bool:
+    """Attende `seconds`; False se nel frattempo `cancelled()` è diventato vero."""
+    end = time.monotonic() + seconds
+    while True:
+        if cancelled is not None and cancelled():
+            return False
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            return True
+        time.sleep(min(remaining, 0.05))
+
+
+class ManagedConnection:
+    """
+    Socket TCP persistente verso una porta del controller. sendall() ha la
+    stessa firma di socket.sendall, quindi Dispatcher può usarla direttamente.
+    """
+
+    def __init__(self, host: str, port: int, name: str, backoff: Optional[Backoff] = None,
+                 connect_timeout: float = 2.0, replay: bool = True):
+        self.host = host
+        self.port = port
+        self.name = name
+        self.backoff = backoff or Backoff()
+        self.connect_timeout = connect_timeout
+        self.replay = replay
+        self.sock: Optional[socket.socket] = None
+        self.reconnects = 0
+        self.error: Optional[Exception] = None
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[socket.socket], None]] = []
+        # Controllo opzionale prima di ogni invio (es. il lettore di stato è vivo?):
+        # se fallisce si riconnette prima di scrivere su un socket già chiuso
+        self.health_check: Optional[Callable[[], bool]] = None
+        self._closed = False
+
+    @property
+    def connected(self) -> bool:
+        return self.sock is not None
+
+    def on_connect(self, callback: Callable[[socket.socket], None]):
+        """`callback(sock)` a ogni nuova connessione (es. per riavviare il lettore di stato)."""
+        self._listeners.append(callback)
+
+    def _open(self) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        sock.settimeout(self.connect_timeout)
+        return sock
+
+    def connect(self, attempts: Optional[int] = None,
+                cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """Apre la connessione (riprovando con backoff finché `cancelled()` è falso). True se connessi."""
+        with self._lock:
+            if self.sock is not None:
+                return True
+            self._closed = False
+            delays = self.backoff.delays()
+            if attempts is not None:
+                delays = delays[:max(0, attempts - 1)]
+            for delay in [0.0] + delays:
+                if delay:
+                    print(f"🔁 {self.name} {self.host}:{self.port}: nuovo tentativo tra {delay:.1f}s")
+                    if not _sleep(delay, cancelled):
+                        return False
+                try:
+                    self.sock = self._open()
+                except OSError as e:
+                    self.error = e
+                    continue
+                self.error = None
+                for callback in self._listeners:
+                    callback(self.sock)
+                return True
+            return False
+
+    def _drop(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+
+    def reconnect(self, cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        with self._lock:
+            if self._closed:
+                return False
+            self._drop()
+            print(f"🔌 {self.name} {self.host}:{self.port} caduta: riconnessione...")
+            if not self.connect(cancelled=cancelled):
+                return False
+            self.reconnects += 1
+            print(f"✅ {self.name} {self.host}:{self.port} riconnessa.")
+            return True
+
+    def sendall(self, data: bytes, replay: Optional[bool] = None,
+                cancelled: Optional[Callable[[], bool]] = None):
+        """
+        Invia `data`. Se la connessione è caduta si riconnette; il comando viene
+        reinviato una volta se `replay` (default: quello della connessione),
+        altrimenti solleva ConnectionLost. Se `cancelled()` diventa vero durante
+        la riconnessione il comando non viene più inviato (ConnectionLost).
+        """
+        replay = self.replay if replay is None else replay
+        with self._lock:
+            if self.sock is None and not self.connect(cancelled=cancelled):
+                raise ConnectionLost(f"{self.name}: non connesso ({self.error})")
+            if self.health_check is not None and not self.health_check():
+                if not self.reconnect(cancelled):
+                    raise ConnectionLost(f"{self.name}: riconnessione fallita ({self.error})")
+            if cancelled is not None and cancelled():
+                raise ConnectionLost(f"{self.name}: invio annullato")
+            try:
+                self.sock.sendall(data)
+                return
+            except OSError as e:
+                self.error = e
+            if not self.reconnect(cancelled):
+                raise ConnectionLost(f"{self.name}: riconnessione fallita ({self.error})")
+            if not replay:
+                raise ConnectionLost(f"{self.name}: connessione caduta durante l'invio")
+            if cancelled is not None and cancelled():
+                raise ConnectionLost(f"{self.name}: connessione caduta, reinvio annullato")
+            try:
+                self.sock.sendall(data)
+            except OSError as e:
+                self._drop()
+                raise ConnectionLost(f"{self.name}: reinvio fallito ({e})") from e
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._drop()
+
+
+class DashboardConnection(ManagedConnection):
+    """Porta 29999: una riga di comando, una riga di risposta."""
+
+    def _open(self) -> socket.socket:
+        sock = super()._open()
+        # Messaggio di benvenuto ("Connected: Universal Robots Dashboard Server")
+        sock.recv(1024)
+        return sock
+
+    def request(self, command: str) -> str:
+        """Invia un comando e ritorna la risposta (i comandi dashboard si possono ripetere)."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    self.sendall((command + "\n").encode("utf-8"), replay=True)
+                    reply = b""
+                    while not reply.endswith(b"\n"):
+                        chunk = self.sock.recv(1024)
+                        if not chunk:
+                            raise OSError("connessione chiusa dal controller")
+                        reply += chunk
+                    return reply.decode("utf-8", "replace").strip()
+                except OSError as e:
+                    self.error = e
+                    if attempt or not self.reconnect():
+                        raise ConnectionLost(f"{self.name}: nessuna risposta a '{command}' ({e})") from e
+        raise ConnectionLost(f"{self.name}: nessuna risposta a '{command}'")
+
+
+class ConnectionPool:
+    """Connessioni calde verso un controller: primary, dashboard e sessione RTDE."""
+
+    def __init__(self, host: str, ports: Optional[Dict[str, int]] = None, backoff: Optional[Backoff] = None):
+        ports = ports or {}
+        self.host = host
+        self.backoff = backoff or Backoff()
+        self.primary = ManagedConnection(host, ports.get("primary", PRIMARY_PORT), "primary", self.backoff)
+        self.dashboard = DashboardConnection(host, ports.get("dashboard", DASHBOARD_PORT), "dashboard",
+                                             self.backoff)
+        self.rtde_port = ports.get("rtde", RTDE_PORT)
+        self._rtde: Optional[RTDEClient] = None
+        self._rtde_lock = threading.Lock()
+        self._rtde_retry_at = 0.0
+        self._rtde_failures = 0
+
+    def rtde(self, block: bool = True) -> Optional[RTDEClient]:
+        """
+        Sessione RTDE attiva, riaperta se è caduta. Con block=False non aspetta:
+        un solo tentativo, e solo se è passato il backoff dall'ultimo fallito.
+        """
+        with self._rtde_lock:
+            if self._rtde is not None and self._rtde.alive:
+                return self._rtde
+            if self._rtde is not None:
+                self._rtde.close()
+                self._rtde = None
+                print(f"🔌 RTDE {self.host}:{self.rtde_port} caduta: riconnessione...")
+            delays = [0.0] + self.backoff.delays() if block else [0.0]
+            for delay in delays:
+                if not block and time.monotonic() < self._rtde_retry_at:
+                    return None
+                time.sleep(delay)
+                client = RTDEClient(self.host, self.rtde_port)
+                try:
+                    client.connect()
+                except (OSError, ValueError):
+                    self._rtde_failures += 1
+                    self._rtde_retry_at = time.monotonic() + min(
+                        self.backoff.cap, self.backoff.base * 2 ** (self._rtde_failures - 1))
+                    continue
+                self._rtde, self._rtde_failures = client, 0
+                return client
+            return None
+
+    def merge_ports(self, ports: Dict[str, int]):
+        """Porte dashboard/RTDE indicate da un altro utente del pool (valgono se non ancora aperte)."""
+        dashboard = ports.get("dashboard")
+        if dashboard is not None and dashboard != self.dashboard.port:
+            with self.dashboard._lock:
+                if self.dashboard.connected:
+                    print(f"⚠️ Dashboard già aperta sulla porta {self.dashboard.port}: ignoro {dashboard}")
+                else:
+                    self.dashboard.port = dashboard
+        rtde = ports.get("rtde")
+        if rtde is not None and rtde != self.rtde_port:
+            with self._rtde_lock:
+                if self._rtde is not None:
+                    print(f"⚠️ RTDE già aperto sulla porta {self.rtde_port}: ignoro {rtde}")
+                else:
+                    self.rtde_port = rtde
+
+    def close(self):
+        self.primary.close()
+        self.dashboard.close()
+        with self._rtde_lock:
+            if self._rtde is not None:
+                self._rtde.close()
+                self._rtde = None
+        with _pools_lock:
+            for key, pool in list(_pools.items()):
+                if pool is self:
+                    del _pools[key]
+
+
+_pools: Dict[Tuple[str, int], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(host: str, ports: Optional[Dict[str, int]] = None, backoff: Optional[Backoff] = None) -> ConnectionPool:
+    """Pool condiviso per controller (host, porta primaria): lo stesso oggetto per Robot e script."""
+    ports = ports or {}
+    key = (host, ports.get("primary", PRIMARY_PORT))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(host, ports, backoff)
+        else:
+            pool.merge_ports(ports)
+        return pool
@@ -1,27 +1,25 @@
-import socket
 import time
+from connection import get_pool
 from utils import load_config
 from robot_control import Robot
+from gripper import render_grip_program
 import os
 
 HOST = "10.10.73.237"    # <-- metti l'IP GIUSTO del robot
 PORT = 30002
 
-# nomi file script gripper (gli stessi che hai sul PC)
-SCRIPT_APRI  = "pinza40UR3.py"
-SCRIPT_CHIUDI = "pinza10UR3.py"
-
-def send_script_file(sock, path):
-    """Invia il contenuto di un file .py/.script al robot tramite socket."""
-    with open(path, "rb") as f:
-        data = f.read()
-    sock.sendall(data)
+# programmi gripper generati dal template OnRobot (larghezza mm)
+SCRIPT_APRI  = render_grip_program(43.5)
+SCRIPT_CHIUDI = render_grip_program(15.0)
 
 def main():
-    # 1) Connessione socket
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    # 1) Connessione persistente (riaperta da sola se cade tra un passo e l'altro)
+    pool = get_pool(HOST, {"primary": PORT})
+    sock = pool.primary
     print(f"Connessione a {HOST}:{PORT} ...")
-    sock.connect((HOST, PORT))
+    if not sock.connect():
+        print(f"⚠️ Impossibile connettersi: {sock.error}")
+        return
     print("✅ Connesso.")
 
     # 2) Popup di test sul pendant (per verificare connessione/stato robot)
@@ -31,17 +29,17 @@ def main():
 
     # 3) APRI pinza
     input("Premi INVIO per APRIRE la pinza...")
-    send_script_file(sock, SCRIPT_APRI)
+    sock.sendall(SCRIPT_APRI)
     time.sleep(1.0)
 
 
     # 4) CHIUDI pinza
     input("Premi INVIO per CHIUDERE la pinza...")
-    send_script_file(sock, SCRIPT_CHIUDI)
+    sock.sendall(SCRIPT_CHIUDI)
     time.sleep(1.0)
 
     print("Test grip completato.")
-    sock.close()
+    pool.close()
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,8 @@
 import os
 from utils import load_config
 from robot_control import Robot
+from table_grid import resolve_poses
+from commands import Grip, MoveJ, MoveL
 
 
 def main():
@@ -13,80 +15,76 @@ def main():
     config = load_config(config_path)
 
     safety = config.get("safety", {})
-    poses = config.get("poses", {})
+    poses = resolve_poses(config)
 
     # 2) Inizializza il robot
     robot = Robot(
         robot_ip=config.get("robot_ip"),
         poses=poses,
-        safety=safety
+        safety=safety,
+        motion=config.get("motion", {}),
+        gripper=config.get("gripper", {}),
+        kinematics=config.get("kinematics", {}),
+        connection=config.get("connection", {})
     )
 
     # Se la connessione fallisce, Robot va in modalità simulata.
     # Va comunque bene per far vedere la sequenza di comandi.
 
     try:
-        # --- STEP 1: Vai in HOME ---
-        print("\n[STEP 1] Vado in HOME")
-        if "home" in poses:
-            robot.move_to_pose("home")
-        else:
+        home = poses.get("home")
+        if home is None:
             print("⚠️ Pose 'home' non definita in config.yaml")
-
-        # --- STEP 2: Vai sopra il blocco sorgente (useremo A) ---
-        print("\n[STEP 2] Vado sopra la sorgente della lettera A")
+            return
         source_A = poses.get("letter_sources", {}).get("A")
         if source_A is None:
             print("⚠️ Nessuna pose per letter_sources.A trovata!")
             return
-
-        robot.move_joints(source_A)
-
-        # --- STEP 3: Scendi per prendere il blocco ---
-        print("\n[STEP 3] Scendo per prendere il blocco")
-        dz = robot.z_pick_offset  # es. -0.04 → scende di 4 cm
-        robot.move_relative_z(dz)
-
-        # --- STEP 4: Chiudi gripper (simulato) ---
-        print("\n[STEP 4] Chiudo il gripper (simulato)")
-        robot.grip(True)
-
-        # --- STEP 5: Risalgo ---
-        print("\n[STEP 5] Risalgo")
-        robot.move_relative_z(-dz)
-
-        # --- STEP 6: Torno in HOME con il blocco ---
-        print("\n[STEP 6] Torno in HOME con il blocco")
-        if "home" in poses:
-            robot.move_to_pose("home")
-
-        # --- STEP 7: Vado sopra lo SLOT 1 ---
-        print("\n[STEP 7] Vado sopra lo slot 1")
         slot1 = poses.get("slots", {}).get("1")
         if slot1 is None:
             print("⚠️ Nessuna pose per slots.\"1\" trovata!")
             return
 
-        robot.move_joints(slot1)
-
-        # --- STEP 8: Scendo per depositare il blocco ---
-        print("\n[STEP 8] Scendo per depositare il blocco")
-        robot.move_relative_z(dz)
-
-        # --- STEP 9: Apro il gripper (rilascio) ---
-        print("\n[STEP 9] Apro il gripper (simulato)")
-        robot.grip(False)
-
-        # --- STEP 10: Risalgo ---
-        print("\n[STEP 10] Risalgo")
-        robot.move_relative_z(-dz)
-
-        # --- STEP 11: Torno in HOME ---
-        print("\n[STEP 11] Torno in HOME")
-        if "home" in poses:
-            robot.move_to_pose("home")
+        # Sorgente e slot sono pose cartesiane: per i movej si usa il ramo IK
+        # più vicino alla configurazione precedente (partendo da home)
+        joints, ok = robot.kinematics.nearest_ik([source_A, slot1], home)
+        if not ok.all():
+            print("⚠️ Sorgente A o slot 1 non raggiungibili dall'UR3: controlla config.yaml")
+            return
+        source_A_joints, slot1_joints = (tuple(q) for q in joints.tolist())
 
-        print("\n✅ DEMO completata con successo.")
+        dz = robot.z_pick_offset  # es. -0.04 → scende di 4 cm
+        source_A_down = list(source_A)
+        source_A_down[2] += dz
+        slot1_down = list(slot1)
+        slot1_down[2] += dz
+
+        # 3) Tutta la demo come un'unica sequenza: il robot la esegue senza
+        # pause tra un passo e l'altro e il peephole toglie gli sprechi
+        # (es. il passaggio da HOME tra presa e deposito diventa raccordato)
+        a, v = robot.max_acc, robot.max_speed
+        commands = [
+            MoveJ(tuple(home), a, v),              # STEP 1: HOME
+            MoveJ(source_A_joints, a, v),          # STEP 2: sopra la sorgente della lettera A
+            Grip(*robot.grip_open),                #         (dita aperte)
+            MoveL(tuple(source_A_down), a, v),     # STEP 3: scendo per prendere il blocco
+            Grip(*robot.grip_close),               # STEP 4: chiudo il gripper
+            MoveL(tuple(source_A), a, v),          # STEP 5: risalgo
+            MoveJ(tuple(home), a, v),              # STEP 6: torno in HOME con il blocco
+            MoveJ(slot1_joints, a, v),             # STEP 7: sopra lo slot 1
+            MoveL(tuple(slot1_down), a, v),        # STEP 8: scendo per depositare il blocco
+            Grip(*robot.grip_open),                # STEP 9: apro il gripper (rilascio)
+            MoveL(tuple(slot1), a, v),             # STEP 10: risalgo
+            MoveJ(tuple(home), a, v),              # STEP 11: torno in HOME
+        ]
+        eta = robot.estimate_time(commands)
+        if eta is not None:
+            print(f"⏳ Tempo stimato: {eta:.1f}s")
+
+        if robot.run_sequence(commands, label="demo pick&place"):
+            print("\n✅ DEMO completata con successo.")
+        else:
+            print("\n⚠️ DEMO interrotta.")
 
     finally:
         robot.close()
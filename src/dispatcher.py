@@ -0,0 +1,319 @@
+# src/dispatcher.py
+
+import heapq
+import itertools
+import queue
+import socket
+import threading
+import time
+from typing import Callable, List, Optional
+
+from commands import Command, MoveJ, MoveL, compile_program
+from connection import ManagedConnection
+
+# Unico thread che scrive sulla porta primaria (30002).
+#
+# I programmi inviati al controller si sostituiscono a vicenda (un nuovo
+# programma interrompe quello in esecuzione), quindi ordine e atomicità
+# contano: se loop principale e correzioni della visione inviano insieme,
+# uno dei due movimenti andrebbe perso a metà. Tutti gli invii passano da una
+# coda con priorità limitata:
+#
+# - put() blocca quando la coda è piena (back-pressure sul chiamante)
+# - a parità di priorità l'ordine è quello di arrivo
+# - un invio con `hold` trattiene la coda: il programma successivo parte solo
+#   quando il chiamante ha finito di aspettarlo (handle.release()) o dopo
+#   `hold` secondi, così non lo interrompe
+# - i movimenti accumulati in coda nel frattempo (stessa priorità) vengono
+#   uniti in un unico programma, eseguito per intero
+# - emergency_stop() scavalca coda e attesa: scarta quanto è in attesa (e il
+#   programma in invio, se è fermo in una riconnessione) e manda subito lo stop
+#
+# Ogni invio restituisce un CommandHandle che si completa quando il programma
+# è stato scritto sul socket (o è fallito / è stato annullato): un handle
+# completato vuol dire "inviato", NON "eseguito". Per i movimenti uniti in un
+# solo programma tutti gli handle si completano insieme, alla scrittura del
+# programma comune. La fine del movimento la segnala il controller: vedi
+# Robot._wait_for_completion. Se un altro programma viene scritto mentre il
+# chiamante aspetta ancora (hold scaduto, stop) l'handle diventa `preempted`.
+
+PRIORITY_STOP = 0
+PRIORITY_HIGH = 1
+PRIORITY_NORMAL = 5
+
+STOP_SCRIPT = b"stopl(2.0)\n"
+
+
+class CommandHandle:
+    """
+    Esito di un invio: wait() ritorna True se il programma è stato scritto sul
+    socket. Non dice nulla sull'esecuzione da parte del controller.
+    """
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.ok: Optional[bool] = None
+        self.error: Optional[str] = None
+        # Quello che before_send ha restituito subito prima della scrittura
+        self.mark = None
+        # Un altro programma è stato scritto prima di release(): questo è stato interrotto
+        self.preempted = False
+        self._event = threading.Event()
+        self._released = threading.Event()
+        self._callbacks: List[Callable[["CommandHandle"], None]] = []
+        self._lock = threading.Lock()
+        # Sveglia il dispatcher (impostato da Dispatcher._put)
+        self._notify: Optional[Callable[[], None]] = None
+
+    def _finish(self, ok: bool, error: Optional[str] = None) -> bool:
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.ok, self.error = ok, error
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+        return True
+
+    def cancel(self, reason: str = "annullato") -> bool:
+        """
+        Rinuncia all'invio: se non è ancora stato scritto non partirà più
+        (nemmeno come reinvio dopo una riconnessione). True se annullato in tempo.
+        """
+        if not self._finish(False, reason):
+            return False
+        if self._notify is not None:
+            self._notify()
+        return True
+
+    def release(self):
+        """Il chiamante ha finito di aspettare il programma: la coda può ripartire."""
+        self._released.set()
+        if self._notify is not None:
+            self._notify()
+
+    def released(self) -> bool:
+        return self._released.is_set()
+
+    def done(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Attende l'esito; False se l'invio è fallito, annullato o non è finito in tempo."""
+        return self._event.wait(timeout) and bool(self.ok)
+
+    def add_done_callback(self, callback: Callable[["CommandHandle"], None]):
+        """Chiama `callback(handle)` a invio concluso (subito se lo è già)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+
+class _Job:
+    __slots__ = ("priority", "order", "data", "commands", "handle", "hold")
+
+    def __init__(self, priority: int, order: int, data: Optional[bytes],
+                 commands: Optional[List[Command]], handle: CommandHandle,
+                 hold: Optional[float] = None):
+        self.priority = priority
+        self.order = order
+        self.data = data
+        self.commands = commands
+        self.handle = handle
+        self.hold = hold
+
+    def __lt__(self, other: "_Job") -> bool:
+        return (self.priority, self.order) < (other.priority, other.order)
+
+
+class Dispatcher(threading.Thread):
+    """
+    Thread che possiede il socket della 30002 e invia i programmi in coda.
+    `sock` può essere anche una connection.ManagedConnection: in quel caso
+    una connessione caduta viene riaperta e il programma reinviato, se nel
+    frattempo nessuno lo ha annullato; altrimenti il job fallisce con ConnectionLost.
+    `before_send()` viene chiamata subito prima di ogni scrittura e il suo
+    risultato finisce in handle.mark (es. lo stato del controller all'invio).
+    """
+
+    def __init__(self, sock: socket.socket, maxsize: int = 16,
+                 on_error: Optional[Callable[[str], None]] = None,
+                 before_send: Optional[Callable[[], object]] = None):
+        super().__init__(daemon=True, name="ur-dispatcher")
+        self.sock = sock
+        self.maxsize = maxsize
+        self.on_error = on_error
+        self.before_send = before_send
+        self._heap: List[_Job] = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+        self._batch_id = 0
+        # Job in scrittura sul socket (annullabili dallo stop di emergenza)
+        self._sending: List[_Job] = []
+        # Handle dell'ultimo programma scritto con hold, non ancora rilasciati
+        # (la coda resta ferma al più fino a _held_until)
+        self._held: List[CommandHandle] = []
+        self._held_until = 0.0
+        # Statistiche
+        self.sent = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    # ---------- INVIO ----------
+
+    def _put(self, job: _Job, block: bool, timeout: Optional[float]) -> CommandHandle:
+        job.handle._notify = self._wake
+        with self._cond:
+            if job.priority != PRIORITY_STOP:
+                full = lambda: len(self._heap) >= self.maxsize and self._running
+                if full() and not block:
+                    raise queue.Full
+                if not self._cond.wait_for(lambda: not full(), timeout):
+                    raise queue.Full
+            if not self._running:
+                job.handle._finish(False, "dispatcher chiuso")
+                return job.handle
+            heapq.heappush(self._heap, job)
+            self._cond.notify_all()
+        return job.handle
+
+    def submit_program(self, data: bytes, label: str = "", priority: int = PRIORITY_NORMAL,
+                       block: bool = True, timeout: Optional[float] = None,
+                       hold: Optional[float] = None) -> CommandHandle:
+        """
+        Accoda un programma già pronto (bytes). queue.Full se la coda resta piena oltre `timeout`.
+        Con `hold` (s) il programma successivo aspetta handle.release() (al più `hold` secondi).
+        """
+        job = _Job(priority, next(self._order), data, None, CommandHandle(label), hold)
+        return self._put(job, block, timeout)
+
+    def submit_motion(self, commands: List[Command], label: str = "", priority: int = PRIORITY_NORMAL,
+                      block: bool = True, timeout: Optional[float] = None,
+                      hold: Optional[float] = None) -> CommandHandle:
+        """Accoda movimenti: se in coda ce ne sono altri adiacenti vengono inviati insieme."""
+        if not commands or not all(isinstance(c, (MoveL, MoveJ)) for c in commands):
+            raise ValueError("submit_motion accetta solo MoveL/MoveJ")
+        job = _Job(priority, next(self._order), None, list(commands), CommandHandle(label), hold)
+        return self._put(job, block, timeout)
+
+    def emergency_stop(self) -> CommandHandle:
+        """Scarta tutto quello che è in coda o in invio e invia subito lo stop."""
+        with self._cond:
+            for job in self._heap + self._sending:
+                job.handle._finish(False, "annullato da stop di emergenza")
+            self.cancelled += len(self._heap)
+            self._heap.clear()
+        return self._put(_Job(PRIORITY_STOP, next(self._order), STOP_SCRIPT, None,
+                              CommandHandle("stop")), True, None)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def busy(self) -> bool:
+        """True se la coda è trattenuta da un programma in esecuzione (chi è in coda partirà dopo)."""
+        with self._cond:
+            return self._holding()
+
+    def close(self):
+        """Ferma il thread; i comandi ancora in coda falliscono."""
+        with self._cond:
+            self._running = False
+            for job in self._heap + self._sending:
+                job.handle._finish(False, "dispatcher chiuso")
+            self._heap.clear()
+            self._held = []
+            self._cond.notify_all()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout=2.0)
+
+    def _wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    # ---------- THREAD ----------
+
+    def _holding(self) -> bool:
+        return (time.monotonic() < self._held_until
+                and any(not handle.released() for handle in self._held))
+
+    def _ready(self) -> bool:
+        """C'è un job da inviare adesso (lo stop non aspetta il programma in corso)."""
+        # I job annullati mentre erano in coda si scartano
+        while self._heap and self._heap[0].handle.done():
+            heapq.heappop(self._heap)
+            self.cancelled += 1
+        if not self._heap:
+            return False
+        return self._heap[0].priority == PRIORITY_STOP or not self._holding()
+
+    def _next_batch(self) -> Optional[List[_Job]]:
+        """Il job più urgente, più i movimenti adiacenti con la stessa priorità."""
+        with self._cond:
+            while self._running and not self._ready():
+                remaining = self._held_until - time.monotonic() if self._holding() else None
+                self._cond.wait(remaining)
+            if not self._running:
+                return None
+            batch = [heapq.heappop(self._heap)]
+            if batch[0].commands is not None:
+                while (self._ready() and self._heap[0].commands is not None
+                       and self._heap[0].priority == batch[0].priority):
+                    batch.append(heapq.heappop(self._heap))
+            self._sending = batch
+            self._cond.notify_all()
+            return batch
+
+    def _encode(self, batch: List[_Job]) -> bytes:
+        if batch[0].data is not None:
+            return batch[0].data
+        commands = [c for job in batch for c in job.commands]
+        if len(batch) == 1 and len(commands) == 1:
+            return (commands[0].to_urscript() + "\n").encode("utf-8")
+        self._batch_id += 1
+        self.coalesced += len(batch) - 1
+        return compile_program(f"wb_batch_{self._batch_id}", commands).encode("utf-8")
+
+    def _write(self, batch: List[_Job], data: bytes):
+        if self.before_send is not None:
+            mark = self.before_send()
+            for job in batch:
+                job.handle.mark = mark
+        if isinstance(self.sock, ManagedConnection):
+            # Reinvio dopo una riconnessione solo se qualcuno aspetta ancora il programma
+            self.sock.sendall(data, cancelled=lambda: all(job.handle.done() for job in batch))
+        else:
+            self.sock.sendall(data)
+
+    def run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._write(batch, self._encode(batch))
+            except OSError as e:
+                message = f"{e}"
+                for job in batch:
+                    job.handle._finish(False, message)
+                if self.on_error is not None:
+                    self.on_error(message)
+                continue
+            finally:
+                with self._cond:
+                    self._sending = []
+            self.sent += 1
+            for job in batch:
+                job.handle._finish(True)
+            with self._cond:
+                # Chi aspettava ancora il programma precedente è stato interrotto
+                for handle in self._held:
+                    if not handle.released():
+                        handle.preempted = True
+                held = [job for job in batch if job.hold is not None and job.handle.ok]
+                self._held = [job.handle for job in held]
+                self._held_until = time.monotonic() + max((job.hold for job in held), default=0.0)
@@ -1,11 +1,29 @@
 import random
+from collections import defaultdict
 
-def select_word(words: list, min_len: int = 3, max_len: int = 6) -> str:
+
+def build_word_index(words: list) -> dict:
+    """
+    Indice lunghezza -> parole, costruito una volta all'avvio: select_word non
+    deve più scorrere tutto il dataset. Le parole restano come nel file
+    (duplicati compresi), quindi la scelta ha la stessa distribuzione.
+    """
+    index = defaultdict(list)
+    for word in words:
+        index[len(word)].append(word)
+    return dict(index)
+
+
+def select_word(words: list, min_len: int = 3, max_len: int = 6, index: dict | None = None) -> str:
     """
     Sceglie casualmente una parola dal dataset, double check sui limiti di lunghezza.
+    Con `index` (vedi build_word_index) si guardano solo le lunghezze ammesse.
     """
     print("Selezionando una parola...")
-    valid_words = [w for w in words if min_len <= len(w) <= max_len]
+    if index is not None:
+        valid_words = [w for n in range(min_len, max_len + 1) for w in index.get(n, [])]
+    else:
+        valid_words = [w for w in words if min_len <= len(w) <= max_len]
     if not valid_words:
         raise ValueError("Nessuna parola valida trovata nel dataset!")
     
@@ -0,0 +1,72 @@
+# src/gripper.py
+
+import os
+import re
+from functools import lru_cache
+from string import Template
+
+from commands import GRASP_REGISTER, CheckGrasp, Grip
+from urscript import minify
+
+# Generatore dei programmi URScript per il gripper OnRobot RG2.
+#
+# Gli script esportati dal pendant (ex pinza10UR3.py / pinza40UR3.py) differivano
+# solo per nome della funzione, rg_Depth_arr[0] e argomenti di rg_grip: ora c'è un
+# unico template con l'inizializzazione OnRobot, e il programma viene generato
+# per qualsiasi larghezza/forza. I programmi generati restano in memoria già
+# codificati, quindi le prese successive non toccano il disco.
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_PATH = os.path.join(ROOT_DIR, "scripts", "onrobot_rg2_init.script")
+
+DEFAULT_FORCE_N = 10.0
+# Valore iniziale di rg_Depth_arr[0]: viene sovrascritto appena il thread
+# rg_dataRead legge i registri del gripper
+DEFAULT_DEPTH_MM = 0.2
+
+
+@lru_cache(maxsize=1)
+def _template() -> Template:
+    with open(TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        return Template(f.read())
+
+
+@lru_cache(maxsize=1)
+def template_tcp() -> list:
+    """
+    TCP impostato dall'inizializzazione OnRobot (primo set_tcp(p[...]) del
+    template): è quello attivo in ogni programma con il gripper, quindi è
+    quello da usare per FK/IK.
+    """
+    match = re.search(r"set_tcp\(p\[([^\]]+)\]\)", _template().template)
+    if match is None:
+        return [0.0] * 6
+    return [float(v) for v in match.group(1).split(",")]
+
+
+@lru_cache(maxsize=8)
+def gripper_preamble(depth: float = DEFAULT_DEPTH_MM) -> str:
+    """Inizializzazione del runtime OnRobot (già indentata, da mettere dentro un def)."""
+    return _template().substitute(depth=repr(float(depth)))
+
+
+@lru_cache(maxsize=64)
+def render_grip_program(width: float, force: float = DEFAULT_FORCE_N,
+                        depth: float = DEFAULT_DEPTH_MM, compact: bool = True,
+                        verify: bool = False) -> bytes:
+    """
+    Programma completo (def ... end) per una presa, codificato e pronto da inviare.
+    Con compact=True è già minificato (vedi urscript.minify).
+    Con verify=True pubblica l'esito della presa sui registri (vedi CheckGrasp).
+    """
+    name = f"wb_grip_{int(round(width * 10))}"
+    script = Grip(width, force).to_urscript()
+    if verify:
+        name += "_check"
+        script = (f"write_output_integer_register({GRASP_REGISTER}, 0)\n{script}\n"
+                  f"{CheckGrasp(abort=False).to_urscript()}")
+    action = "".join(f"  {line}\n" for line in script.splitlines())
+    program = f"def {name}():\n{gripper_preamble(depth)}\n{action}end\n"
+    if compact:
+        program = minify(program)
+    return program.encode("utf-8")
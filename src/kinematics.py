@@ -0,0 +1,299 @@
+# src/kinematics.py
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Cinematica diretta/inversa dell'UR3 con NumPy, per controllare offline le
+# pose del config prima di muovere il robot.
+#
+# - fk(): giunti -> posa TCP p[x,y,z,rx,ry,rz] nel sistema "Base" del controller
+# - ik(): posa -> le 8 soluzioni analitiche (spalla, polso, gomito)
+# - nearest_ik(): per una sequenza di waypoint sceglie il ramo che minimizza lo
+#   spostamento dei giunti rispetto al waypoint precedente
+# - validate_poses(): raggiungibilità, limiti dei giunti e distanza dalle
+#   singolarità di tutte le pose del config, in blocco
+#
+# Tutte le funzioni accettano array (..., 6) e lavorano in modo vettoriale.
+
+# Parametri DH nominali dell'UR3 (CB3), metri / radianti
+UR3_DH = {
+    "d": (0.1519, 0.0, 0.0, 0.11235, 0.08535, 0.0819),
+    "a": (0.0, -0.24365, -0.21325, 0.0, 0.0, 0.0),
+    "alpha": (np.pi / 2, 0.0, 0.0, np.pi / 2, -np.pi / 2, 0.0),
+}
+
+# Limiti dei giunti (rad): ±360° su tutti i giunti dell'UR3
+UR3_JOINT_LIMITS = np.array([[-2 * np.pi, 2 * np.pi]] * 6)
+
+# Sotto questi valori una configurazione è considerata troppo vicina a una singolarità
+WRIST_MARGIN = 0.05       # |sin(q5)|: assi 4 e 6 allineati
+ELBOW_MARGIN = 0.05       # |sin(q3)|: braccio completamente disteso/ripiegato
+SHOULDER_MARGIN = 0.01    # m: centro del polso sull'asse del giunto 1
+
+
+# ---------- ROTAZIONI ----------
+
+def rotvec_to_matrix(rotvec) -> np.ndarray:
+    """Vettori di rotazione (..., 3) -> matrici (..., 3, 3) (Rodrigues)."""
+    rotvec = np.asarray(rotvec, dtype=float)
+    angle = np.linalg.norm(rotvec, axis=-1)[..., None, None]
+    safe = np.where(angle > 1e-12, angle, 1.0)
+    k = rotvec / safe[..., 0]
+    K = np.zeros(rotvec.shape[:-1] + (3, 3))
+    K[..., 0, 1], K[..., 0, 2] = -k[..., 2], k[..., 1]
+    K[..., 1, 0], K[..., 1, 2] = k[..., 2], -k[..., 0]
+    K[..., 2, 0], K[..., 2, 1] = -k[..., 1], k[..., 0]
+    identity = np.broadcast_to(np.eye(3), K.shape)
+    R = identity + np.sin(angle) * K + (1.0 - np.cos(angle)) * (K @ K)
+    return np.where(angle > 1e-12, R, identity)
+
+
+def matrix_to_rotvec(R) -> np.ndarray:
+    """Matrici (..., 3, 3) -> vettori di rotazione (..., 3), angolo in [0, π]."""
+    R = np.asarray(R, dtype=float)
+    cos = np.clip((np.trace(R, axis1=-2, axis2=-1) - 1.0) / 2.0, -1.0, 1.0)
+    angle = np.arccos(cos)
+    axis = np.stack((R[..., 2, 1] - R[..., 1, 2],
+                     R[..., 0, 2] - R[..., 2, 0],
+                     R[..., 1, 0] - R[..., 0, 1]), axis=-1)
+    sin = np.sin(angle)
+    general = axis / np.where(sin > 1e-6, 2.0 * sin, 1.0)[..., None]
+    # Vicino a π l'asse si ricava dalla diagonale di (R + I) / 2
+    B = (R + np.eye(3)) / 2.0
+    diag = np.sqrt(np.clip(np.diagonal(B, axis1=-2, axis2=-1), 0.0, None))
+    signs = np.where(np.stack((np.ones_like(angle), B[..., 0, 1], B[..., 0, 2]), axis=-1) < 0, -1.0, 1.0)
+    # il segno dei componenti segue quello del più grande
+    near_pi = diag * signs
+    near_pi = near_pi / np.maximum(np.linalg.norm(near_pi, axis=-1, keepdims=True), 1e-12)
+    axis = np.where((sin > 1e-6)[..., None], general, near_pi)
+    return np.where((angle > 1e-9)[..., None], axis * angle[..., None], 0.0)
+
+
+def pose_to_matrix(pose) -> np.ndarray:
+    pose = np.asarray(pose, dtype=float)
+    T = np.zeros(pose.shape[:-1] + (4, 4))
+    T[..., :3, :3] = rotvec_to_matrix(pose[..., 3:6])
+    T[..., :3, 3] = pose[..., :3]
+    T[..., 3, 3] = 1.0
+    return T
+
+
+def matrix_to_pose(T) -> np.ndarray:
+    T = np.asarray(T, dtype=float)
+    return np.concatenate((T[..., :3, 3], matrix_to_rotvec(T[..., :3, :3])), axis=-1)
+
+
+# ---------- CINEMATICA ----------
+
+class URKinematics:
+    """
+    FK/IK analitiche di un UR (default UR3). `tcp` è l'offset del TCP rispetto
+    alla flangia (come impostato sul pendant), p[x,y,z,rx,ry,rz].
+    """
+
+    def __init__(self, dh: Dict[str, Sequence[float]] = UR3_DH, tcp: Optional[Sequence[float]] = None,
+                 joint_limits: Optional[np.ndarray] = None):
+        self.d = np.asarray(dh["d"], dtype=float)
+        self.a = np.asarray(dh["a"], dtype=float)
+        self.alpha = np.asarray(dh["alpha"], dtype=float)
+        self.tcp = pose_to_matrix(np.asarray(tcp if tcp is not None else [0.0] * 6, dtype=float))
+        self.tcp_inv = np.linalg.inv(self.tcp)
+        self.joint_limits = UR3_JOINT_LIMITS if joint_limits is None else np.asarray(joint_limits, float)
+        # Il sistema "Base" del controller è ruotato di 180° attorno a z rispetto al frame DH
+        self.base = np.diag([-1.0, -1.0, 1.0, 1.0])
+
+    def _dh(self, i: int, theta: np.ndarray) -> np.ndarray:
+        ct, st = np.cos(theta), np.sin(theta)
+        ca, sa = np.cos(self.alpha[i]), np.sin(self.alpha[i])
+        T = np.zeros(theta.shape + (4, 4))
+        T[..., 0, 0], T[..., 0, 1], T[..., 0, 2], T[..., 0, 3] = ct, -st * ca, st * sa, self.a[i] * ct
+        T[..., 1, 0], T[..., 1, 1], T[..., 1, 2], T[..., 1, 3] = st, ct * ca, -ct * sa, self.a[i] * st
+        T[..., 2, 1], T[..., 2, 2], T[..., 2, 3] = sa, ca, self.d[i]
+        T[..., 3, 3] = 1.0
+        return T
+
+    def fk_matrix(self, q) -> np.ndarray:
+        """Giunti (..., 6) -> trasformazione base -> TCP (..., 4, 4)."""
+        q = np.asarray(q, dtype=float)
+        T = np.broadcast_to(self.base, q.shape[:-1] + (4, 4))
+        for i in range(6):
+            T = T @ self._dh(i, q[..., i])
+        return T @ self.tcp
+
+    def fk(self, q) -> np.ndarray:
+        """Giunti (..., 6) -> posa TCP (..., 6) come la riporta il controller."""
+        return matrix_to_pose(self.fk_matrix(q))
+
+    def ik(self, pose) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pose (N, 6) -> (soluzioni (N, 8, 6), valide (N, 8)).
+        Le soluzioni non valide (posa irraggiungibile per quel ramo) sono NaN.
+        Gli angoli sono in (-π, π]; vedi nearest_ik per gli equivalenti ±2π.
+        """
+        pose = np.atleast_2d(np.asarray(pose, dtype=float))
+        d1, _, _, d4, d5, d6 = self.d
+        a2, a3 = self.a[1], self.a[2]
+        # Flangia nel frame DH
+        T06 = np.linalg.inv(self.base) @ pose_to_matrix(pose) @ self.tcp_inv
+        n = len(pose)
+        solutions = np.full((n, 8, 6), np.nan)
+
+        p05 = T06 @ np.array([0.0, 0.0, -d6, 1.0])
+        R = np.hypot(p05[:, 0], p05[:, 1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            phi = np.arccos(d4 / R)
+            psi = np.arctan2(p05[:, 1], p05[:, 0])
+            for s, shoulder in enumerate((1.0, -1.0)):
+                q1 = psi + shoulder * phi + np.pi / 2
+                s1, c1 = np.sin(q1), np.cos(q1)
+                q5_abs = np.arccos((T06[:, 0, 3] * s1 - T06[:, 1, 3] * c1 - d4) / d6)
+                for w, wrist in enumerate((1.0, -1.0)):
+                    q5 = wrist * q5_abs
+                    s5 = np.sin(q5)
+                    T60 = np.linalg.inv(T06)
+                    q6 = np.arctan2((-T60[:, 1, 0] * s1 + T60[:, 1, 1] * c1) / s5,
+                                    (T60[:, 0, 0] * s1 - T60[:, 0, 1] * c1) / s5)
+                    # Con il polso singolare q6 è arbitrario: si tiene 0
+                    q6 = np.where(np.abs(s5) < 1e-9, 0.0, q6)
+                    T01 = self._dh(0, q1)
+                    T45 = self._dh(4, q5)
+                    T56 = self._dh(5, q6)
+                    T14 = np.linalg.inv(T01) @ T06 @ np.linalg.inv(T45 @ T56)
+                    p13 = T14 @ np.array([0.0, -d4, 0.0, 1.0]) - np.array([0.0, 0.0, 0.0, 1.0])
+                    p13_norm2 = (p13[:, :3] ** 2).sum(axis=1)
+                    q3_abs = np.arccos((p13_norm2 - a2 * a2 - a3 * a3) / (2.0 * a2 * a3))
+                    for e, elbow in enumerate((1.0, -1.0)):
+                        q3 = elbow * q3_abs
+                        q2 = -np.arctan2(p13[:, 1], -p13[:, 0]) + np.arcsin(a3 * np.sin(q3) / np.sqrt(p13_norm2))
+                        T13 = self._dh(1, q2) @ self._dh(2, q3)
+                        T34 = np.linalg.inv(T13) @ T14
+                        q4 = np.arctan2(T34[:, 1, 0], T34[:, 0, 0])
+                        k = s * 4 + w * 2 + e
+                        solutions[:, k] = np.stack((q1, q2, q3, q4, q5, q6), axis=-1)
+
+        solutions = (solutions + np.pi) % (2 * np.pi) - np.pi
+        valid = np.isfinite(solutions).all(axis=-1)
+        # Verifica con la FK: scarta i rami numericamente sbagliati
+        check = np.where(valid[..., None], solutions, 0.0)
+        error = np.abs(self.fk_matrix(check) - pose_to_matrix(pose)[:, None]).max(axis=(-2, -1))
+        valid &= error < 1e-6
+        solutions[~valid] = np.nan
+        return solutions, valid
+
+    def within_limits(self, q) -> np.ndarray:
+        q = np.asarray(q, dtype=float)
+        return ((q >= self.joint_limits[:, 0]) & (q <= self.joint_limits[:, 1])).all(axis=-1)
+
+    def singularity_margins(self, q) -> np.ndarray:
+        """
+        Distanza dalle tre singolarità dell'UR (..., 3):
+        [|sin q5| polso, |sin q3| gomito, distanza (m) del centro del polso
+        dal cilindro di raggio d4 attorno all'asse del giunto 1 (spalla)].
+        """
+        q = np.asarray(q, dtype=float)
+        flange = self.fk_matrix(q) @ self.tcp_inv
+        wrist_center = np.linalg.inv(self.base) @ flange @ np.array([0.0, 0.0, -self.d[5], 1.0])
+        radius = np.hypot(wrist_center[..., 0], wrist_center[..., 1])
+        return np.stack((np.abs(np.sin(q[..., 4])), np.abs(np.sin(q[..., 2])),
+                         np.abs(radius - self.d[3])), axis=-1)
+
+    def near_singularity(self, q) -> np.ndarray:
+        margins = self.singularity_margins(q)
+        return ((margins[..., 0] < WRIST_MARGIN) | (margins[..., 1] < ELBOW_MARGIN)
+                | (margins[..., 2] < SHOULDER_MARGIN))
+
+    def nearest_ik(self, poses, q_start: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Giunti per una sequenza di pose (N, 6): per ogni waypoint si sceglie,
+        tra i rami validi e i loro equivalenti ±2π entro i limiti, quello con lo
+        spostamento massimo dei giunti più piccolo rispetto al waypoint
+        precedente (il primo rispetto a `q_start`). Ritorna (giunti (N, 6), ok (N,)).
+        """
+        solutions, valid = self.ik(poses)
+        # Equivalenti ±2π di ogni ramo: (N, 8*3, 6) combinando gli offset giunto per giunto
+        offsets = np.array([-2 * np.pi, 0.0, 2 * np.pi])
+        result = np.full((len(solutions), 6), np.nan)
+        ok = np.zeros(len(solutions), dtype=bool)
+        previous = np.asarray(q_start, dtype=float)
+        for i in range(len(solutions)):
+            candidates = solutions[i][valid[i]]
+            if not len(candidates):
+                continue
+            # Per ogni giunto l'equivalente più vicino al precedente, poi si scartano quelli fuori limite
+            shifted = candidates[:, None, :] + offsets[None, :, None]
+            best = np.take_along_axis(
+                shifted, np.abs(shifted - previous).argmin(axis=1)[:, None, :], axis=1)[:, 0]
+            best = best[self.within_limits(best)]
+            if not len(best):
+                continue
+            travel = np.abs(best - previous).max(axis=1)
+            result[i] = previous = best[travel.argmin()]
+            ok[i] = True
+        return result, ok
+
+
+# ---------- CONTROLLO DELLE POSE ----------
+
+def looks_like_joints(pose: Sequence[float], kinematics: URKinematics) -> bool:
+    """Un vettore "posa" irraggiungibile che però è una configurazione valida dei giunti."""
+    q = np.asarray(pose, dtype=float)
+    return bool(kinematics.within_limits(q)) and np.linalg.norm(q[:3]) > 1.0
+
+
+def validate_poses(poses: Dict[str, Dict[str, Sequence[float]]], kinematics: URKinematics,
+                   home: Optional[Sequence[float]] = None, z_pick_offset: float = 0.0,
+                   max_travel: float = np.pi / 4) -> Dict[str, str]:
+    """
+    Controlla in blocco le pose cartesiane del config (letter_sources, slots,
+    anche nella variante BASSA con z_pick_offset) e la posa giunti `home`:
+    raggiungibilità, limiti dei giunti, margine dalle singolarità e salti di
+    configurazione (oltre `max_travel` rad) tra posa alta e bassa.
+    Ritorna {"gruppo.chiave" (o "home"): problema} per le pose da non usare
+    (vuoto se è tutto a posto).
+    """
+    problems: Dict[str, str] = {}
+    if home is not None:
+        q_home = np.asarray(home, dtype=float)
+        if not kinematics.within_limits(q_home):
+            problems["home"] = "giunti fuori dai limiti"
+        elif kinematics.near_singularity(q_home):
+            problems["home"] = "configurazione vicina a una singolarità"
+
+    names, rows = [], []
+    for group in ("letter_sources", "slots"):
+        for key, pose in (poses.get(group) or {}).items():
+            names.append(f"{group}.{key}")
+            rows.append(list(pose))
+    if not rows:
+        return problems
+
+    up = np.asarray(rows, dtype=float).reshape(-1, 6)
+    down = up.copy()
+    down[:, 2] += z_pick_offset
+    _, valid_up = kinematics.ik(up)
+    _, valid_down = kinematics.ik(down)
+
+    reference = np.asarray(home, dtype=float) if home is not None else np.zeros(6)
+    for k, name in enumerate(names):
+        if not valid_up[k].any() or not valid_down[k].any():
+            hint = ""
+            if looks_like_joints(up[k], kinematics):
+                tcp = kinematics.fk(up[k])
+                hint = (" (sembra un vettore di giunti: come posa cartesiana sarebbe "
+                        f"p[{', '.join(f'{v:.4f}' for v in tcp)}])")
+            which = "alta" if not valid_up[k].any() else "bassa"
+            problems[name] = f"posa {which} non raggiungibile{hint}"
+            continue
+        # Discesa sullo stesso ramo, partendo dal ramo più vicino a home
+        q, ok = kinematics.nearest_ik(np.stack((up[k], down[k])), reference)
+        if not ok.all():
+            problems[name] = "nessuna soluzione entro i limiti dei giunti"
+        elif kinematics.near_singularity(q).any():
+            margins = kinematics.singularity_margins(q).min(axis=0)
+            problems[name] = (f"vicina a una singolarità (margini polso {margins[0]:.3f}, "
+                              f"gomito {margins[1]:.3f}, spalla {margins[2]:.3f} m)")
+        elif np.abs(q[1] - q[0]).max() > max_travel:
+            problems[name] = (f"la discesa di {abs(z_pick_offset) * 1000:.0f} mm richiede una "
+                              f"riconfigurazione dei giunti ({np.degrees(np.abs(q[1] - q[0]).max()):.0f}°)")
+    return problems
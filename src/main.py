@@ -1,8 +1,12 @@
+import asyncio
 import os
 # import pyttsx3
-from utils import load_config, load_words, ensure_folders
+from utils import load_config, ensure_folders
 from game_logic import select_word
-from robot_control import Robot
+from async_robot import AsyncRobot
+import tts_module
+from tts_module import say_async
+from startup import Startup
 from game_logic import split_letters
 
 """
@@ -29,6 +33,89 @@ def difficulty_feedback(level: str):
     print(f"🎙️ {message}")
     # say(message)
 
+async def play_demo(arobot: AsyncRobot):
+    """
+    Pick&place della demo mentre il robot spiega cosa sta facendo: movimento
+    e sintesi vocale procedono insieme, si prosegue quando sono finiti entrambi.
+    """
+    # Vai su A -> Apri -> Scendi -> Chiudi -> Sali -> Vai su 0 -> Scendi -> Apri -> Sali
+    placed, _ = await asyncio.gather(
+        arobot.place_letter_in_slot("A", 0),
+        say_async("Guarda: prendo la lettera A e la metto nel primo spazio."),
+    )
+    if placed:
+        print("✅ Demo Pick & Place completata.")
+    else:
+        print("⚠️ Demo Pick & Place non completata.")
+
+    print(arobot.robot.telemetry.report())
+
+
+async def run(config: dict) -> bool:
+    """Avvio, scelta della difficoltà e demo. False se l'avvio non è riuscito."""
+    # --- 1. Avvio in background ---
+    # Connessione robot, servizio gripper, indice parole, camera e voce partono
+    # insieme (vedi startup.py) mentre la domanda sulla difficoltà è già a schermo
+    startup = Startup(config, os.path.join("data", "words.json")).start()
+
+    try:
+        # --- 2. Impostazione difficoltà ---
+        difficulty = (await asyncio.to_thread(input, "Scegli la difficoltà (easy / normal / hard): ")).strip().lower()
+        if difficulty not in ["easy", "normal", "hard"]:
+            print("Difficoltà non valida, imposto 'normal' di default.")
+            difficulty = "normal"
+        config["difficulty"] = difficulty
+        difficulty_feedback(difficulty) # Aggiunto feedback vocale qui
+
+        # Si aspetta solo quello che non è ancora pronto
+        resources = await startup.ready()
+    except Exception as e:
+        # Robot o parole non disponibili (o input chiuso): si chiude quello
+        # che è già partito e si esce senza traceback
+        print(f"❌ Avvio non riuscito: {e}")
+        await startup.close()
+        return False
+    robot = resources["robot"]
+    words, word_index = resources["words"]
+    camera = resources["camera"]
+    # Il robot lavora nel suo thread (AsyncRobot): intanto il gioco può
+    # parlare, leggere la camera o preparare la parola successiva.
+    arobot = AsyncRobot(robot)
+    try:
+        print(f"Numero parole disponibili: {len(words)}")
+
+        # --- 3. Selezione parola ---
+        word = select_word(words, index=word_index)
+        if not word:
+            raise RuntimeError("Errore: nessuna parola è stata selezionata.")
+
+        # say(f"La parola è {word}")
+
+        # --- 4. Posizionamento lettere ---
+        robot_letters, user_letters = split_letters(word, difficulty)
+
+        # ------------------------------------------------------------------
+        # DEMO PICK & PLACE: LETTERA A -> SLOT 0
+        # ------------------------------------------------------------------
+        print("\n🚀 AVVIO DEMO: Spostamento lettera 'A' nello Slot '0'...")
+
+        # Nota: Il gioco reale è commentato qui sotto per riferimento futuro.
+        # place_word sceglie l'ordine di presa che minimizza gli spostamenti
+        # e invia tutta la parola come un unico programma.
+        # await asyncio.gather(arobot.place_word(robot_letters), say_async(f"La parola è {word}"))
+        await play_demo(arobot)
+        # ------------------------------------------------------------------
+    finally:
+        # Robot, camera e voce si chiudono anche se selezione o demo falliscono
+        if camera is not None:
+            camera.release()
+        await arobot.close()
+        if resources["tts"]:
+            await asyncio.to_thread(tts_module.shutdown)
+    # say("Demo completata. Ora tocca a te!")
+    return True
+
+
 def main():
     print("WordBuddy - Avvio del sistema...")
 
@@ -37,12 +124,7 @@ def main():
     config = load_config(config_path)
     print("Configurazione caricata con successo:")
     print(config)
-    
-    # Carichiamo la lista di parole
-    words_path = os.path.join("data", "words.json")
-    words = load_words(words_path)
-    print(f"{len(words)} parole caricate.")
-    
+
     # Caricamento dati di calibrazione
     calib_dir = os.path.join("data", "calibration")
     if os.path.exists(calib_dir):
@@ -54,55 +136,9 @@ def main():
     print("\n--- Riepilogo ---")
     print(f"Robot IP: {config.get('robot_ip', 'non specificato')}")
     print(f"Camera ID: {config.get('camera_id', 'default')}")
-    print(f"Numero parole disponibili: {len(words)}")
-
-    print("\nSetup completato ✅")
-
-    # --- 1. Inizializzazione robot ---
-    # Inizializzo il robot
-    robot = Robot(
-        robot_ip=config.get("robot_ip"),
-        poses=config.get("poses", {}),
-        safety=config.get("safety", {})
-    )
-
-    # --- 2. Impostazione difficoltà ---
-    difficulty = input("Scegli la difficoltà (easy / normal / hard): ").strip().lower()
-    if difficulty not in ["easy", "normal", "hard"]:
-        print("Difficoltà non valida, imposto 'normal' di default.")
-        difficulty = "normal"
-    config["difficulty"] = difficulty
-    difficulty_feedback(difficulty) # Aggiunto feedback vocale qui
-
-    # --- 3. Selezione parola ---
-    word = select_word(words)
-    if not word:
-        raise RuntimeError("Errore: nessuna parola è stata selezionata.")
-
-    # say(f"La parola è {word}")
-
-    # --- 4. Posizionamento lettere ---
-    robot_letters, user_letters = split_letters(word, difficulty)
-
-    # ------------------------------------------------------------------
-    # DEMO PICK & PLACE: LETTERA A -> SLOT 0
-    # ------------------------------------------------------------------
-    print("\n🚀 AVVIO DEMO: Spostamento lettera 'A' nello Slot '0'...")
-    
-    # Questa funzione esegue la sequenza: 
-    # Vai su A -> Apri -> Scendi -> Chiudi -> Sali -> Vai su 0 -> Scendi -> Apri -> Sali
-    robot.place_letter_in_slot("A", 0)
-
-    # Nota: Il ciclo del gioco reale è commentato qui sotto per riferimento futuro
-    # for slot_index, letter in enumerate(robot_letters):
-    #     robot.place_letter_in_slot(letter, slot_index)
-
-    print("✅ Demo Pick & Place completata.")
-    # ------------------------------------------------------------------
-
-    # say("Demo completata. Ora tocca a te!")
 
-    robot.close()
+    if not asyncio.run(run(config)):
+        raise SystemExit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,549 @@
+# src/mock_ur_controller.py
+
+import argparse
+import codecs
+import re
+import select
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sim_backend import SimulatedController
+from urscript import ScriptCommand, parse_program, split_programs
+from ur_service import OP_GRIP, OP_GRIP_WAIT, OP_MOVEJ, OP_MOVEL, OP_QUIT, SOCKET_NAME
+from rtde_client import (
+    HEADER as RTDE_HEADER, RTDE_CONTROL_PACKAGE_PAUSE, RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS,
+    RTDE_CONTROL_PACKAGE_START, RTDE_DATA_PACKAGE, RTDE_GET_URCONTROL_VERSION,
+    RTDE_REQUEST_PROTOCOL_VERSION, RUNTIME_STATE_PLAYING, data_struct, pack_packet,
+)
+from ur_state import (
+    PROGRAM_STATE_PLAYING,
+    PROGRAM_STATE_STOPPED,
+    ROBOT_MODE_RUNNING,
+    JOINT_MODE_RUNNING,
+    build_realtime_frame,
+    build_robot_state_message,
+    build_version_message,
+)
+
+# Controller UR finto per benchmark offline (nessun robot fisico richiesto).
+#
+# Ascolta sulle stesse porte del controller reale:
+#   30001 / 30002  interfaccia primaria/secondaria: riceve URScript, invia Robot State a 10 Hz
+#   30003          interfaccia realtime: riceve URScript, invia frame realtime a 125 Hz
+#   30004          RTDE: ricetta di output e flusso dati fino a 125 Hz
+#   29999          dashboard server (comandi testuali)
+#
+# I programmi ricevuti vengono analizzati (movej/movel/rg_grip/sleep) e "eseguiti"
+# in tempo reale con lo stesso modello dei tempi del backend simulato; un nuovo
+# programma interrompe quello in corso, come sul controller vero.
+#
+# Uso:
+#   python src/mock_ur_controller.py                 # ascolta su 127.0.0.1
+#   python src/mock_ur_controller.py --time-scale 10 # esecuzione 10 volte più veloce
+# e poi robot_ip: "127.0.0.1" nel config.yaml.
+
+DEFAULT_PORTS = {"primary": 30001, "secondary": 30002, "realtime": 30003,
+                 "rtde": 30004, "dashboard": 29999}
+STATE_HZ = 10.0
+REALTIME_HZ = 125.0
+RTDE_MAX_HZ = 125.0
+
+# Variabili RTDE pubblicate dal mock e loro tipo
+RTDE_VARIABLES = {
+    "timestamp": "DOUBLE", "actual_q": "VECTOR6D", "actual_qd": "VECTOR6D",
+    "actual_TCP_pose": "VECTOR6D", "actual_TCP_speed": "VECTOR6D",
+    "runtime_state": "UINT32", "robot_mode": "INT32", "safety_mode": "INT32",
+    **{f"output_int_register_{i}": "INT32" for i in range(24)},
+}
+
+# Posa iniziale del robot simulato (giunti in rad, TCP in m/rad)
+HOME_JOINTS = [0.0, -1.5708, 1.5708, -1.5708, -1.5708, 0.0]
+HOME_TCP = [0.3, -0.2, 0.2, 2.22, -2.22, 0.0]
+
+# Programma di servizio persistente (vedi ur_service.py): si collega al PC
+_SERVICE_RE = re.compile(r'socket_open\("([^"]+)",\s*(\d+),\s*"' + SOCKET_NAME + r'"\)')
+
+
+@dataclass
+class _Segment:
+    """Movimento in corso, usato per interpolare lo stato pubblicato."""
+
+    kind: str
+    start: List[float]
+    end: List[float]
+    t0: float
+    t1: float
+
+    def sample(self, now: float):
+        span = max(self.t1 - self.t0, 1e-9)
+        frac = min(max((now - self.t0) / span, 0.0), 1.0)
+        position = [s + (e - s) * frac for s, e in zip(self.start, self.end)]
+        if self.t0 <= now < self.t1:
+            velocity = [(e - s) / span for s, e in zip(self.start, self.end)]
+        else:
+            velocity = [0.0] * len(self.start)
+        return position, velocity
+
+
+class MockURController:
+    """Server che imita un controller UR sulle porte 30001/30002/30003/30004/29999."""
+
+    def __init__(self, host: str = "127.0.0.1", ports: Optional[dict] = None,
+                 max_speed: float = 0.25, max_acc: float = 1.2,
+                 time_scale: float = 1.0, verbose: bool = True):
+        self.host = host
+        self.ports = {**DEFAULT_PORTS, **(ports or {})}
+        self.time_scale = max(time_scale, 1e-6)
+        self.verbose = verbose
+
+        self.model = SimulatedController(max_speed, max_acc, verbose=False)
+        self.model.tcp_pose = list(HOME_TCP)
+        self.model.joints = list(HOME_JOINTS)
+
+        self.program_running = False
+        # Registri scritti con write_output_integer_register (letti via RTDE)
+        self.registers = {}
+        self.stats = {"programs": 0, "preempted": 0, "bytes": 0, "connections": 0}
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending: Optional[str] = None
+        self._abort = threading.Event()
+        self._stop = threading.Event()
+        self._segment: Optional[_Segment] = None
+        self._started_at = time.monotonic()
+        self._servers: List[socket.socket] = []
+        self._threads: List[threading.Thread] = []
+
+    # ---------- AVVIO / ARRESTO ----------
+
+    def start(self):
+        handlers = {
+            "primary": self._serve_primary,
+            "secondary": self._serve_primary,
+            "realtime": self._serve_realtime,
+            "rtde": self._serve_rtde,
+            "dashboard": self._serve_dashboard,
+        }
+        for name, port in self.ports.items():
+            server = socket.create_server((self.host, port), reuse_port=False)
+            server.settimeout(0.2)
+            self._servers.append(server)
+            self._spawn(self._accept_loop, server, handlers[name], name)
+        self._spawn(self._executor)
+        self._log(f"🧪 Controller UR simulato in ascolto su {self.host} "
+                  f"{sorted(self.ports.values())} (time scale x{self.time_scale:g})")
+
+    def stop(self):
+        self._stop.set()
+        self._abort.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for server in self._servers:
+            server.close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+
+    def serve_forever(self):
+        self.start()
+        try:
+            while not self._stop.is_set():
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+            self._log(f"📊 Statistiche: {self.stats}")
+
+    def _spawn(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+
+    # ---------- ESECUZIONE PROGRAMMI ----------
+
+    def submit(self, script: str):
+        """Riceve un programma: quelli primari interrompono il programma in corso."""
+        if script.lstrip().startswith("sec "):
+            # I programmi secondari non muovono il robot e non interrompono nulla
+            self._log("🧪 Programma secondario ricevuto (ignorato).")
+            return
+        with self._wakeup:
+            if self.program_running or self._pending is not None:
+                self.stats["preempted"] += 1
+            self._pending = script
+            # Come sul controller reale, il flag si alza solo dopo la compilazione
+            self.program_running = False
+            self._abort.set()
+            self._wakeup.notify()
+
+    def _executor(self):
+        while not self._stop.is_set():
+            with self._wakeup:
+                while self._pending is None and not self._stop.is_set():
+                    self._wakeup.wait(0.2)
+                if self._stop.is_set():
+                    return
+                script, self._pending = self._pending, None
+                self._abort.clear()
+            self._run(script)
+
+    def _wait(self, seconds: float) -> bool:
+        """Attende `seconds` di tempo robot; False se interrotto da un nuovo programma."""
+        return not self._abort.wait(max(0.0, seconds) / self.time_scale)
+
+    def _run(self, script: str):
+        program = parse_program(script)
+        with self._lock:
+            self.stats["programs"] += 1
+            self.stats["bytes"] += program.size_bytes
+        first_line = script.strip().splitlines()[0] if script.strip() else ""
+        self._log(f"🧪 Programma ({program.size_bytes} B, {len(program.commands)} comandi): {first_line[:60]}")
+
+        try:
+            if not self._wait(self.model.load_time(program)):
+                return
+            with self._lock:
+                self.program_running = True
+            service = _SERVICE_RE.search(script)
+            if service:
+                self._run_service(service.group(1), int(service.group(2)))
+                return
+            previous = (None, 0.0)
+            for command in program.commands:
+                previous = self._execute(command, previous)
+                if previous is None:
+                    return
+        finally:
+            with self._lock:
+                self._segment = None
+                if self._pending is None:
+                    self.program_running = False
+
+    def _execute(self, command: ScriptCommand, previous):
+        """
+        Esegue un comando in tempo reale. `previous` = (comando, durata) del
+        precedente, per il raccordo. Ritorna il nuovo `previous` o None se interrotto.
+        """
+        previous_command, previous_time = previous
+        if command.kind == "register":
+            with self._lock:
+                self.registers[int(command.target[0])] = int(command.target[1])
+            return previous
+        with self._lock:
+            start = self._current_position(command.kind)
+            duration = self.model.command_time(command)
+            duration -= self.model.blend_saving(previous_command, previous_time, command, duration)
+            if command.kind in ("movel", "movej") and start and command.target:
+                now = time.monotonic()
+                self._segment = _Segment(command.kind, start, list(command.target),
+                                         now, now + duration / self.time_scale)
+        if not self._wait(duration):
+            self._freeze()
+            return None
+        with self._lock:
+            self._segment = None
+        return command, duration
+
+    def _run_service(self, host: str, port: int):
+        """Emula il ciclo del programma di servizio: legge opcode dal PC e li esegue."""
+        try:
+            conn = socket.create_connection((host, port), timeout=2.0)
+        except OSError as e:
+            self._log(f"🧪 Servizio: impossibile collegarsi a {host}:{port} ({e})")
+            return
+        self._log(f"🧪 Servizio collegato a {host}:{port}")
+        previous = (None, 0.0)
+        buffer = b""
+        with conn:
+            conn.sendall(b"ready\n")
+            while not self._abort.is_set():
+                readable, _, _ = select.select([conn], [], [], 0.1)
+                if not readable:
+                    continue
+                data = conn.recv(65536)
+                if not data:
+                    return
+                buffer += data
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    values = [float(v) for v in line.decode("ascii").strip().strip("()").split(",")]
+                    op = int(values[0])
+                    if op == OP_QUIT:
+                        return
+                    command = self._service_command(op, values[1:])
+                    if command is None:
+                        continue
+                    previous = self._execute(command, previous)
+                    if previous is None:
+                        return
+                    conn.sendall(self._service_reply(command).encode("ascii"))
+
+    @staticmethod
+    def _service_command(op: int, args: List[float]) -> Optional[ScriptCommand]:
+        if op in (OP_MOVEL, OP_MOVEJ):
+            kind = "movel" if op == OP_MOVEL else "movej"
+            return ScriptCommand(kind=kind, target=tuple(args[:6]), a=args[6], v=args[7], r=args[8])
+        if op == OP_GRIP:
+            return ScriptCommand(kind="grip", target=(args[0], args[1]), blocking=args[2] > 0)
+        if op == OP_GRIP_WAIT:
+            return ScriptCommand(kind="grip_wait")
+        return None
+
+    def _service_reply(self, command: ScriptCommand) -> str:
+        if command.kind != "grip":
+            return "done\n"
+        width = self.model.gripper_width or 0.0
+        # Nessun blocco reale: si considera "presa" ogni chiusura sotto i 30 mm
+        detected = width < 30.0
+        return f"grip,{width},{detected}\n"
+
+    def _current_position(self, kind: str) -> Optional[List[float]]:
+        if kind == "movel":
+            return list(self.model.tcp_pose) if self.model.tcp_pose else None
+        if kind == "movej":
+            return list(self.model.joints) if self.model.joints else None
+        return None
+
+    def _freeze(self):
+        """Programma interrotto: il robot si ferma dove si trova in quel momento."""
+        with self._lock:
+            segment = self._segment
+            if segment is None:
+                return
+            position, _ = segment.sample(time.monotonic())
+            if segment.kind == "movel":
+                self.model.tcp_pose = position
+            else:
+                self.model.joints = position
+            self._segment = None
+
+    def snapshot(self):
+        """Stato corrente (interpolato se c'è un movimento in corso)."""
+        with self._lock:
+            now = time.monotonic()
+            q = list(self.model.joints)
+            tcp = list(self.model.tcp_pose)
+            qd = [0.0] * 6
+            tcp_speed = [0.0] * 6
+            segment = self._segment
+            if segment is not None:
+                position, velocity = segment.sample(now)
+                if segment.kind == "movel":
+                    tcp, tcp_speed = position, velocity
+                    # Senza cinematica non conosciamo le velocità dei giunti:
+                    # pubblichiamo un valore non nullo per indicare il movimento
+                    speed = sum(v * v for v in velocity[:3]) ** 0.5
+                    qd = [speed] * 6
+                else:
+                    q, qd = position, velocity
+            return self.program_running, q, qd, tcp, tcp_speed, now - self._started_at
+
+    # ---------- SERVER ----------
+
+    def _accept_loop(self, server: socket.socket, handler, name: str):
+        while not self._stop.is_set():
+            try:
+                conn, address = server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            with self._lock:
+                self.stats["connections"] += 1
+            self._log(f"🧪 Connessione {name} da {address[0]}:{address[1]}")
+            self._spawn(handler, conn)
+
+    def _receive_scripts(self, conn: socket.socket, decoder, pending: List[str]) -> bool:
+        """Legge dati dal client e invia al motore i programmi completi. False = client chiuso."""
+        data = conn.recv(65536)
+        if not data:
+            return False
+        pending[0] += decoder.decode(data)
+        programs, pending[0] = split_programs(pending[0])
+        for program in programs:
+            self.submit(program)
+        return True
+
+    def _stream(self, conn: socket.socket, period: float, build_packet, greeting: bytes = b""):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = [""]
+        try:
+            if greeting:
+                conn.sendall(greeting)
+            next_send = time.monotonic()
+            while not self._stop.is_set():
+                timeout = max(0.0, next_send - time.monotonic())
+                readable, _, _ = select.select([conn], [], [], timeout)
+                if readable and not self._receive_scripts(conn, decoder, pending):
+                    return
+                if time.monotonic() >= next_send:
+                    conn.sendall(build_packet())
+                    next_send += period
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def _serve_primary(self, conn: socket.socket):
+        def packet():
+            running, q, qd, tcp, _, uptime = self.snapshot()
+            return build_robot_state_message(running, q, qd, tcp, int(uptime * 1e6))
+
+        self._stream(conn, 1.0 / STATE_HZ, packet, greeting=build_version_message())
+
+    def _serve_realtime(self, conn: socket.socket):
+        def packet():
+            running, q, qd, tcp, tcp_speed, uptime = self.snapshot()
+            return build_realtime_frame({
+                "time": uptime,
+                "q_target": q, "q_actual": q,
+                "qd_target": qd, "qd_actual": qd,
+                "tool_vector_actual": tcp, "tool_vector_target": tcp,
+                "tcp_speed_actual": tcp_speed, "tcp_speed_target": tcp_speed,
+                "robot_mode": ROBOT_MODE_RUNNING,
+                "joint_modes": [JOINT_MODE_RUNNING] * 6,
+                "safety_mode": 1,
+                "speed_scaling": 1.0,
+                "v_main": 48.0, "v_robot": 48.0,
+                "program_state": PROGRAM_STATE_PLAYING if running else PROGRAM_STATE_STOPPED,
+            })
+
+        self._stream(conn, 1.0 / REALTIME_HZ, packet)
+
+    def _serve_rtde(self, conn: socket.socket):
+        """Protocollo RTDE v2 ridotto: versione, ricetta di output, start/pause, dati."""
+        buffer = b""
+        recipe: List[str] = []
+        layout = None
+        period = 1.0 / RTDE_MAX_HZ
+        streaming = False
+        next_send = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                timeout = max(0.0, next_send - time.monotonic()) if streaming else 0.2
+                readable, _, _ = select.select([conn], [], [], timeout)
+                if readable:
+                    data = conn.recv(4096)
+                    if not data:
+                        return
+                    buffer += data
+                    while len(buffer) >= RTDE_HEADER.size:
+                        size, packet_type = RTDE_HEADER.unpack_from(buffer)
+                        if len(buffer) < size:
+                            break
+                        payload, buffer = buffer[RTDE_HEADER.size:size], buffer[size:]
+                        if packet_type == RTDE_REQUEST_PROTOCOL_VERSION:
+                            conn.sendall(pack_packet(packet_type, b"\x01"))
+                        elif packet_type == RTDE_GET_URCONTROL_VERSION:
+                            conn.sendall(pack_packet(packet_type, struct.pack(">IIII", 5, 11, 0, 0)))
+                        elif packet_type == RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS:
+                            frequency, = struct.unpack_from(">d", payload)
+                            period = 1.0 / min(max(frequency, 1.0), RTDE_MAX_HZ)
+                            recipe = payload[8:].decode("ascii").split(",")
+                            types = [RTDE_VARIABLES.get(name, "NOT_FOUND") for name in recipe]
+                            if "NOT_FOUND" not in types:
+                                layout = data_struct(types)
+                            conn.sendall(pack_packet(packet_type, b"\x01" + ",".join(types).encode("ascii")))
+                        elif packet_type == RTDE_CONTROL_PACKAGE_START:
+                            streaming = layout is not None
+                            next_send = time.monotonic()
+                            conn.sendall(pack_packet(packet_type, b"\x01" if streaming else b"\x00"))
+                        elif packet_type == RTDE_CONTROL_PACKAGE_PAUSE:
+                            streaming = False
+                            conn.sendall(pack_packet(packet_type, b"\x01"))
+                if streaming and time.monotonic() >= next_send:
+                    conn.sendall(pack_packet(RTDE_DATA_PACKAGE, layout.pack(1, *self._rtde_values(recipe))))
+                    next_send += period
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def _rtde_values(self, recipe: List[str]) -> list:
+        running, q, qd, tcp, tcp_speed, uptime = self.snapshot()
+        values = {
+            "timestamp": uptime, "actual_q": q, "actual_qd": qd,
+            "actual_TCP_pose": tcp, "actual_TCP_speed": tcp_speed,
+            "runtime_state": RUNTIME_STATE_PLAYING if running else 1,
+            "robot_mode": ROBOT_MODE_RUNNING, "safety_mode": 1,
+        }
+        flat = []
+        for name in recipe:
+            if name.startswith("output_int_register_"):
+                flat.append(self.registers.get(int(name.rsplit("_", 1)[1]), 0))
+            elif isinstance(values[name], list):
+                flat.extend(values[name])
+            else:
+                flat.append(values[name])
+        return flat
+
+    def _serve_dashboard(self, conn: socket.socket):
+        try:
+            conn.sendall(b"Connected: Universal Robots Dashboard Server\n")
+            buffer = b""
+            while not self._stop.is_set():
+                readable, _, _ = select.select([conn], [], [], 0.2)
+                if not readable:
+                    continue
+                data = conn.recv(4096)
+                if not data:
+                    return
+                buffer += data
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    reply = self._dashboard_reply(line.decode("utf-8", "replace").strip())
+                    conn.sendall((reply + "\n").encode("utf-8"))
+                    if reply == "Disconnected":
+                        return
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def _dashboard_reply(self, command: str) -> str:
+        running = self.program_running
+        replies = {
+            "robotmode": "Robotmode: RUNNING",
+            "programState": f"{'PLAYING' if running else 'STOPPED'} <unnamed>",
+            "running": f"Program running: {'true' if running else 'false'}",
+            "safetystatus": "Safetystatus: NORMAL",
+            "safetymode": "Safetymode: NORMAL",
+            "power on": "Powering on",
+            "brake release": "Brake releasing",
+            "play": "Starting program",
+            "pause": "Pausing program",
+            "quit": "Disconnected",
+        }
+        if command == "stop":
+            self._abort.set()
+            return "Stopped"
+        return replies.get(command, f"could not understand: '{command}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Controller UR simulato per benchmark offline")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="fattore di accelerazione del tempo robot (1 = tempo reale)")
+    parser.add_argument("--port-offset", type=int, default=0,
+                        help="somma un offset a tutte le porte (utile se sono già occupate)")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    ports = {name: port + args.port_offset for name, port in DEFAULT_PORTS.items()}
+    controller = MockURController(args.host, ports, time_scale=args.time_scale,
+                                  verbose=not args.quiet)
+    controller.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
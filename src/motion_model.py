@@ -0,0 +1,152 @@
+# src/motion_model.py
+
+import math
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from commands import Command, Grip, MoveJ, MoveL, WaitGrip
+
+# Stima dei tempi di movimento con profili di velocità trapezoidali, come il
+# controller UR: accelerazione `a` fino alla velocità `v`, crociera, frenata.
+# Se la distanza è troppo corta per arrivare a `v` il profilo è triangolare.
+#
+#   movel: distanza cartesiana del TCP (m), v in m/s, a in m/s^2
+#   movej: spostamento del giunto che si muove di più (rad), v in rad/s
+#
+# Le funzioni lavorano su array NumPy: un'intera sequenza di waypoint (o una
+# matrice di tragitti) si stima con poche operazioni vettoriali. Lo usano il
+# simulatore (orologio virtuale), Robot (timeout e tempo stimato di una parola)
+# e il planner.
+
+# Gripper RG2
+GRIPPER_SPEED_MM_S = 80.0     # velocità di apertura/chiusura
+GRIPPER_SETTLE = 0.15         # tempo di assestamento a fine presa
+
+
+def trapezoid_time(distance: float, v: float, a: float) -> float:
+    """
+    Durata di un profilo di velocità trapezoidale (o triangolare se la
+    distanza non basta a raggiungere la velocità massima).
+    """
+    distance = abs(distance)
+    if distance == 0.0 or v <= 0.0 or a <= 0.0:
+        return 0.0
+    if distance <= v * v / a:
+        return 2.0 * math.sqrt(distance / a)
+    return distance / v + v / a
+
+
+def trapezoid_times(distances, v, a) -> np.ndarray:
+    """Versione vettoriale di trapezoid_time (v e a scalari o array della stessa forma)."""
+    d = np.abs(np.asarray(distances, dtype=float))
+    v, a = np.broadcast_arrays(np.asarray(v, dtype=float), np.asarray(a, dtype=float))
+    v = np.broadcast_to(v, d.shape)
+    a = np.broadcast_to(a, d.shape)
+    valid = (d > 0.0) & (v > 0.0) & (a > 0.0)
+    v = np.where(valid, v, 1.0)
+    a = np.where(valid, a, 1.0)
+    times = np.where(d <= v * v / a, 2.0 * np.sqrt(d / a), d / v + v / a)
+    return np.where(valid, times, 0.0)
+
+
+def segment_distances(points, start: Optional[Sequence[float]] = None) -> np.ndarray:
+    """
+    Distanze cartesiane (m) tra waypoint consecutivi [x,y,z,...]; il primo
+    tratto parte da `start` (0 se non è nota la posizione di partenza).
+    """
+    xyz = np.asarray(points, dtype=float).reshape(-1, 6)[:, :3]
+    if len(xyz) == 0:
+        return np.zeros(0)
+    first = np.asarray(start, dtype=float)[:3] if start is not None else xyz[0]
+    starts = np.vstack((first, xyz[:-1]))
+    return np.linalg.norm(xyz - starts, axis=1)
+
+
+def joint_deltas(joints, start: Optional[Sequence[float]] = None) -> np.ndarray:
+    """Spostamento (rad) del giunto che si muove di più, per ogni tratto movej."""
+    q = np.asarray(joints, dtype=float).reshape(-1, 6)
+    if len(q) == 0:
+        return np.zeros(0)
+    first = np.asarray(start, dtype=float) if start is not None else q[0]
+    starts = np.vstack((first, q[:-1]))
+    return np.abs(q - starts).max(axis=1)
+
+
+def blend_savings(times: np.ndarray, radii: np.ndarray, v, a) -> np.ndarray:
+    """
+    Tempo risparmiato su ogni tratto quando il precedente ha un raccordo: il
+    robot non si ferma sul waypoint (al massimo metà del tratto più breve).
+    """
+    savings = np.zeros_like(times)
+    if len(times) < 2:
+        return savings
+    v = np.broadcast_to(np.asarray(v, dtype=float), times.shape)
+    a = np.broadcast_to(np.asarray(a, dtype=float), times.shape)
+    blended = radii[:-1] > 0.0
+    savings[1:] = np.where(blended, np.minimum(v[1:] / a[1:], 0.5 * np.minimum(times[:-1], times[1:])), 0.0)
+    return savings
+
+
+def grip_time(width: float, previous: Optional[float]) -> float:
+    travel = abs(width - previous) if previous is not None else width
+    return travel / GRIPPER_SPEED_MM_S + GRIPPER_SETTLE
+
+
+class MotionModel:
+    """Stime dei tempi con i limiti di sicurezza del config (safety.max_speed / max_acc)."""
+
+    def __init__(self, max_speed: float, max_acc: float):
+        self.max_speed = max_speed
+        self.max_acc = max_acc
+
+    def movel_times(self, poses, start: Optional[Sequence[float]] = None,
+                    v: float | None = None, a: float | None = None) -> np.ndarray:
+        """Durata di ogni movel di una sequenza di pose (N×6)."""
+        return trapezoid_times(segment_distances(poses, start),
+                               v or self.max_speed, a or self.max_acc)
+
+    def movej_times(self, joints, start: Optional[Sequence[float]] = None,
+                    v: float | None = None, a: float | None = None) -> np.ndarray:
+        """Durata di ogni movej di una sequenza di configurazioni (N×6)."""
+        return trapezoid_times(joint_deltas(joints, start),
+                               v or self.max_speed, a or self.max_acc)
+
+    def command_times(self, commands: List[Command], tcp: Optional[Sequence[float]] = None,
+                      joints: Optional[Sequence[float]] = None,
+                      gripper_width: Optional[float] = None) -> np.ndarray:
+        """
+        Durata stimata di ogni comando (raccordi compresi). I Grip non
+        bloccanti procedono in parallelo ai comandi seguenti: si paga solo il
+        residuo alla barriera WaitGrip o al Grip successivo.
+        """
+        times = np.zeros(len(commands))
+        for kind, start in ((MoveL, tcp), (MoveJ, joints)):
+            index = [i for i, c in enumerate(commands) if isinstance(c, kind)]
+            if not index:
+                continue
+            moves = [commands[i] for i in index]
+            targets = [c.pose if kind is MoveL else c.joints for c in moves]
+            v = np.array([c.v or self.max_speed for c in moves])
+            a = np.array([c.a or self.max_acc for c in moves])
+            distances = segment_distances(targets, start) if kind is MoveL else joint_deltas(targets, start)
+            segment = trapezoid_times(distances, v, a)
+            # Il raccordo conta solo tra due movimenti consecutivi dello stesso tipo
+            radii = np.array([c.r if i + 1 in index else 0.0 for i, c in zip(index, moves)])
+            times[index] = segment - blend_savings(segment, radii, v, a)
+
+        busy = 0.0
+        for i, command in enumerate(commands):
+            if isinstance(command, Grip):
+                duration = grip_time(command.width, gripper_width)
+                gripper_width = command.width
+                times[i], busy = (busy, duration) if not command.blocking else (busy + duration, 0.0)
+            elif isinstance(command, WaitGrip):
+                times[i], busy = busy, 0.0
+            else:
+                busy = max(0.0, busy - times[i])
+        return times
+
+    def sequence_time(self, commands: List[Command], **start) -> float:
+        """Durata totale stimata di una lista di comandi (vedi command_times)."""
+        return float(self.command_times(commands, **start).sum())
@@ -0,0 +1,203 @@
+# src/peephole.py
+
+from dataclasses import dataclass, replace
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from commands import CheckGrasp, Command, Grip, MoveJ, MoveL, WaitGrip
+from motion_model import MotionModel
+
+# Ottimizzazione "a finestra" su una lista di comandi prima dell'invio.
+#
+# Ogni passata riscrive solo pattern locali che non cambiano dove arriva il
+# robot né cosa fa il gripper:
+#
+#   zero_length     movimento verso la posizione in cui il robot è già
+#   out_and_back    A -> B -> A senza nulla in mezzo: il giro è inutile
+#   collinear       A -> B -> C sulla stessa retta, stesso orientamento e
+#                   profilo: B si toglie, resta un segmento unico
+#   gripper         Grip alla larghezza già raggiunta, Grip subito sostituito
+#                   da un altro, WaitGrip senza nulla da aspettare
+#   blend           waypoint di passaggio (seguito da un altro movimento dello
+#                   stesso tipo) senza raccordo: il robot non si ferma più lì
+#
+# Le deviazioni verso pose arbitrarie (es. passare da home tra presa e
+# deposito) non si eliminano: senza un modello degli ostacoli non si può
+# dire che la scorciatoia sia sicura. Diventano però waypoint raccordati.
+#
+# Per ogni passata si stima con MotionModel quanto tempo ha fatto risparmiare.
+
+POSITION_TOL = 1e-4    # m
+ROTATION_TOL = 1e-3    # rad
+JOINT_TOL = 1e-4       # rad
+
+
+@dataclass
+class Rewrite:
+    name: str
+    changed: int
+    saved: float
+
+
+def _same_pose(a: Sequence[float], b: Sequence[float]) -> bool:
+    return (np.abs(np.subtract(a[:3], b[:3])).max() < POSITION_TOL
+            and np.abs(np.subtract(a[3:6], b[3:6])).max() < ROTATION_TOL)
+
+
+def _same_target(command: Command, tcp, joints) -> bool:
+    if isinstance(command, MoveL):
+        return tcp is not None and _same_pose(command.pose, tcp)
+    if isinstance(command, MoveJ):
+        return joints is not None and np.abs(np.subtract(command.joints, joints)).max() < JOINT_TOL
+    return False
+
+
+def _advance(command: Command, tcp, joints):
+    """Posizione nota dopo `command` (un movej rende ignota la posa e viceversa)."""
+    if isinstance(command, MoveL):
+        return list(command.pose), None
+    if isinstance(command, MoveJ):
+        return None, list(command.joints)
+    return tcp, joints
+
+
+# ---------- PASSATE ----------
+
+def drop_zero_length(commands: List[Command], tcp=None, joints=None, **_) -> Tuple[List[Command], int]:
+    result: List[Command] = []
+    for command in commands:
+        if _same_target(command, tcp, joints):
+            continue
+        result.append(command)
+        tcp, joints = _advance(command, tcp, joints)
+    return result, len(commands) - len(result)
+
+
+def drop_out_and_back(commands: List[Command], tcp=None, joints=None, **_) -> Tuple[List[Command], int]:
+    result: List[Command] = []
+    i = 0
+    while i < len(commands):
+        command = commands[i]
+        nxt = commands[i + 1] if i + 1 < len(commands) else None
+        if (isinstance(command, (MoveL, MoveJ)) and type(nxt) is type(command)
+                and _same_target(nxt, tcp, joints)):
+            i += 2      # si resta dove si era
+            continue
+        result.append(command)
+        tcp, joints = _advance(command, tcp, joints)
+        i += 1
+    return result, len(commands) - len(result)
+
+
+def merge_collinear(commands: List[Command], tcp=None, **_) -> Tuple[List[Command], int]:
+    result: List[Command] = []
+    # Posa del TCP prima di ogni comando di result (None = ignota)
+    before: List[Optional[Sequence[float]]] = []
+    for command in commands:
+        prev = result[-1] if result else None
+        start = before[-1] if before else None
+        if (isinstance(command, MoveL) and isinstance(prev, MoveL) and start is not None
+                and (prev.a, prev.v) == (command.a, command.v)
+                and _same_rotation(start, prev.pose) and _same_rotation(prev.pose, command.pose)
+                and _on_segment(start, command.pose, prev.pose)):
+            result[-1] = command
+            tcp = list(command.pose)
+            continue
+        before.append(tcp)
+        result.append(command)
+        tcp, _joints = _advance(command, tcp, None)
+    return result, len(commands) - len(result)
+
+
+def _same_rotation(a: Sequence[float], b: Sequence[float]) -> bool:
+    return np.abs(np.subtract(a[3:6], b[3:6])).max() < ROTATION_TOL
+
+
+def _on_segment(a, c, b) -> bool:
+    """b sta sul segmento a-c (entro POSITION_TOL)?"""
+    a, b, c = (np.asarray(p[:3], dtype=float) for p in (a, b, c))
+    ac = c - a
+    length2 = float(ac @ ac)
+    if length2 == 0.0:
+        return False
+    t = float((b - a) @ ac) / length2
+    return 0.0 <= t <= 1.0 and np.linalg.norm(a + t * ac - b) < POSITION_TOL
+
+
+def drop_redundant_grips(commands: List[Command], gripper_width=None, **_) -> Tuple[List[Command], int]:
+    result: List[Command] = []
+    width = gripper_width
+    pending: Optional[int] = None     # indice in result dell'ultimo Grip non ancora "usato"
+    busy = False                      # c'è un Grip non bloccante da aspettare
+    changed = 0
+    for command in commands:
+        if isinstance(command, Grip):
+            if command.width == width:
+                changed += 1
+                continue
+            if pending is not None:
+                # Il Grip precedente non è servito a nulla: sostituito da questo
+                result.pop(pending)
+                changed += 1
+            width = command.width
+            busy = not command.blocking
+            result.append(command)
+            pending = len(result) - 1
+            continue
+        if isinstance(command, WaitGrip):
+            if not busy:
+                changed += 1
+                continue
+            busy = False
+        elif isinstance(command, (MoveL, MoveJ, CheckGrasp)):
+            pending = None
+        result.append(command)
+    return result, changed
+
+
+def blend_pass_through(commands: List[Command], blend_radius: float = 0.0, **_) -> Tuple[List[Command], int]:
+    if blend_radius <= 0.0:
+        return list(commands), 0
+    result = list(commands)
+    changed = 0
+    for i, command in enumerate(result[:-1]):
+        if (isinstance(command, (MoveL, MoveJ)) and command.r == 0.0
+                and type(result[i + 1]) is type(command)):
+            result[i] = replace(command, r=blend_radius)
+            changed += 1
+    return result, changed
+
+
+PASSES: List[Tuple[str, Callable]] = [
+    ("zero_length", drop_zero_length),
+    ("out_and_back", drop_out_and_back),
+    ("collinear", merge_collinear),
+    ("gripper", drop_redundant_grips),
+    ("blend", blend_pass_through),
+]
+
+
+def optimize(commands: List[Command], model: MotionModel, tcp: Optional[Sequence[float]] = None,
+             joints: Optional[Sequence[float]] = None, gripper_width: Optional[float] = None,
+             blend_radius: float = 0.0) -> Tuple[List[Command], List[Rewrite]]:
+    """
+    Applica tutte le passate in ordine. Ritorna i comandi ottimizzati e, per
+    ogni passata che ha cambiato qualcosa, quanti comandi ha toccato e il
+    tempo stimato risparmiato (s).
+    """
+    start = {"tcp": tcp, "joints": joints, "gripper_width": gripper_width}
+    before = model.sequence_time(commands, **start)
+    rewrites: List[Rewrite] = []
+    for name, rewrite in PASSES:
+        commands, changed = rewrite(commands, blend_radius=blend_radius, **start)
+        if not changed:
+            continue
+        after = model.sequence_time(commands, **start)
+        rewrites.append(Rewrite(name, changed, before - after))
+        before = after
+    return commands, rewrites
+
+
+def report(rewrites: List[Rewrite]) -> str:
+    return ", ".join(f"{r.name} ×{r.changed} (-{r.saved:.2f}s)" for r in rewrites)
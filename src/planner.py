@@ -0,0 +1,135 @@
+# src/planner.py
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from motion_model import MotionModel
+
+# Pianificazione dell'ordine di pick&place per una parola intera.
+#
+# Ogni lavoro i = "prendi dalla sorgente s_i, deposita nello slot t_i".
+# Il tratto sorgente -> slot di ogni lavoro è fisso; l'ordine influisce solo
+# sui trasferimenti a vuoto slot_i -> sorgente_j tra un lavoro e il successivo.
+# Si cerca quindi il percorso (aperto) di costo minimo tra i lavori: problema
+# tipo TSP asimmetrico. Fino a EXACT_JOBS lavori (le parole del gioco) si
+# risolve esattamente con la programmazione dinamica di Held-Karp; oltre, con
+# nearest neighbour + miglioramento 2-opt sulle matrici delle distanze (NumPy).
+
+# Oltre questo numero di lavori Held-Karp (n²·2ⁿ) diventa troppo costoso
+EXACT_JOBS = 8
+
+
+def _cost_tables(sources, slots, start):
+    """
+    Distanze (m) usate dal planner, calcolate una volta con NumPy:
+    tratto fisso sorgente_i -> slot_i, trasferimento a vuoto slot_i -> sorgente_j
+    e avvicinamento iniziale start -> sorgente_i (0 se start non è nota).
+    """
+    src = np.asarray(sources, dtype=float).reshape(-1, 6)[:, :3]
+    dst = np.asarray(slots, dtype=float).reshape(-1, 6)[:, :3]
+    fixed = np.linalg.norm(src - dst, axis=1)
+    transfer = np.linalg.norm(dst[:, None, :] - src[None, :, :], axis=2)
+    if start is None:
+        initial = np.zeros(len(src))
+    else:
+        initial = np.linalg.norm(src - np.asarray(start, dtype=float)[:3], axis=1)
+    return fixed, transfer, initial
+
+
+def _path_cost(order: List[int], fixed, transfer, initial) -> float:
+    if not order:
+        return 0.0
+    index = np.asarray(order)
+    return float(initial[index[0]] + fixed[index].sum() + transfer[index[:-1], index[1:]].sum())
+
+
+def order_jobs(sources: Sequence[Sequence[float]], slots: Sequence[Sequence[float]],
+               start: Optional[Sequence[float]] = None, costs: Optional[tuple] = None) -> List[int]:
+    """
+    Ritorna l'ordine (indici) in cui eseguire i lavori per minimizzare il
+    percorso totale del TCP. `sources[i]`/`slots[i]` sono le pose alte del
+    lavoro i (liste o righe di un array N×6); `start` è la posizione attuale
+    del TCP (se nota). `costs` = (fisso, trasferimento, avvicinamento) già
+    calcolati, es. da PoseTable.job_costs.
+    """
+    n = len(sources)
+    if n <= 1:
+        return list(range(n))
+    fixed, transfer, initial = costs if costs is not None else _cost_tables(sources, slots, start)
+    if n <= EXACT_JOBS:
+        return _held_karp(transfer, initial)
+
+    # 1) Nearest neighbour: dalla posizione corrente alla sorgente più vicina
+    remaining = np.ones(n, dtype=bool)
+    order: List[int] = []
+    costs = initial if start is not None else None
+    while remaining.any():
+        if costs is None:
+            job = int(np.flatnonzero(remaining)[0])
+        else:
+            job = int(np.argmin(np.where(remaining, costs, np.inf)))
+        order.append(job)
+        remaining[job] = False
+        costs = transfer[job]
+
+    # 2) 2-opt: inverte tratti dell'ordine finché il costo diminuisce
+    best = _path_cost(order, fixed, transfer, initial)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(n - 1):
+            for k in range(i + 1, n):
+                candidate = order[:i] + order[i:k + 1][::-1] + order[k + 1:]
+                cost = _path_cost(candidate, fixed, transfer, initial)
+                if cost < best - 1e-9:
+                    order, best = candidate, cost
+                    improved = True
+    return order
+
+
+def _held_karp(transfer: np.ndarray, initial: np.ndarray) -> List[int]:
+    """
+    Ordine ottimo: best[S, j] = costo minimo per eseguire i lavori dell'insieme
+    S (bitmask) finendo con j. I tratti fissi non dipendono dall'ordine.
+    """
+    n = len(initial)
+    full = 1 << n
+    best = np.full((full, n), np.inf)
+    parent = np.full((full, n), -1, dtype=int)
+    for j in range(n):
+        best[1 << j, j] = initial[j]
+    for subset in range(1, full):
+        row = best[subset]
+        if not np.isfinite(row).any():
+            continue
+        # Estende con ogni lavoro k non ancora in S, dal miglior j di S
+        candidates = row[:, None] + transfer
+        previous = candidates.argmin(axis=0)
+        cost = candidates[previous, np.arange(n)]
+        for k in range(n):
+            if subset & (1 << k):
+                continue
+            extended = subset | (1 << k)
+            if cost[k] < best[extended, k]:
+                best[extended, k] = cost[k]
+                parent[extended, k] = previous[k]
+    subset, job = full - 1, int(best[full - 1].argmin())
+    order = []
+    while job >= 0:
+        order.append(job)
+        subset, job = subset & ~(1 << job), int(parent[subset, job])
+    return order[::-1]
+
+
+def travel_length(order: List[int], sources, slots, start=None, costs: Optional[tuple] = None) -> float:
+    """Lunghezza totale (m) del percorso del TCP per un certo ordine."""
+    return _path_cost(order, *(costs if costs is not None else _cost_tables(sources, slots, start)))
+
+
+def travel_time(order: List[int], sources, slots, start, model: MotionModel) -> float:
+    """Tempo (s) dei tratti sorgente/slot per un certo ordine, con profili trapezoidali."""
+    if not order:
+        return 0.0
+    waypoints = [pose for job in order for pose in (sources[job], slots[job])]
+    return float(model.movel_times(waypoints, start).sum())
@@ -0,0 +1,96 @@
+# src/pose_table.py
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Tabella delle pose "compilata" una volta all'avvio.
+#
+# Le pose del config (letter_sources, slots) diventano array NumPy contigui
+# N×6 / M×6 con indici interi, e le varianti BASSE (z + z_pick_offset) sono
+# calcolate una volta sola. La matrice N×M delle distanze sorgente -> slot dà
+# al planner i costi di una parola con un'indicizzazione, invece di ricalcolarli
+# a ogni chiamata (vedi job_costs).
+
+
+def _pose_array(poses: Iterable[Sequence[float]]) -> np.ndarray:
+    array = np.array([list(p) for p in poses], dtype=float).reshape(-1, 6)
+    array.flags.writeable = False
+    return array
+
+
+class PoseTable:
+    """Pose alte/basse di sorgenti (lettere) e slot, indicizzate da interi."""
+
+    def __init__(self, letter_sources: Dict[str, Sequence[float]], slots: Dict[str, Sequence[float]],
+                 z_pick_offset: float):
+        self.letters: List[str] = [str(k).upper() for k in letter_sources]
+        self.slot_keys: List[str] = [str(k) for k in slots]
+        self.letter_index: Dict[str, int] = {letter: i for i, letter in enumerate(self.letters)}
+        self.slot_index: Dict[str, int] = {key: j for j, key in enumerate(self.slot_keys)}
+        self.z_pick_offset = z_pick_offset
+
+        self.source_up = _pose_array(letter_sources.values())
+        self.slot_up = _pose_array(slots.values())
+        self.source_down = self._down(self.source_up)
+        self.slot_down = self._down(self.slot_up)
+        # Righe utilizzabili: reject() toglie quelle scartate dal controllo FK/IK
+        self.source_valid = np.ones(len(self.letters), dtype=bool)
+        self.slot_valid = np.ones(len(self.slot_keys), dtype=bool)
+
+        # Distanza del TCP (m) tra la posa alta di ogni sorgente e di ogni slot: N×M
+        self.distance = np.linalg.norm(
+            self.source_up[:, None, :3] - self.slot_up[None, :, :3], axis=2)
+        # ... e il tragitto a vuoto slot -> sorgente per il lavoro successivo: M×N
+        self.return_distance = self.distance.T
+
+    def _down(self, up: np.ndarray) -> np.ndarray:
+        down = up.copy()
+        down[:, 2] += self.z_pick_offset
+        down.flags.writeable = False
+        return down
+
+    def reject(self, letters: Iterable[str] = (), slot_keys: Iterable = ()):
+        """Segna come non utilizzabili le pose di queste lettere/slot."""
+        for letter in letters:
+            i = self.source(letter)
+            if i is not None:
+                self.source_valid[i] = False
+        for key in slot_keys:
+            j = self.slot(key)
+            if j is not None:
+                self.slot_valid[j] = False
+
+    def job_costs(self, sources: np.ndarray, slots: np.ndarray,
+                  start: Optional[Sequence[float]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Costi (m) dei lavori "sorgente sources[i] -> slot slots[i]" per il planner
+        (vedi planner.order_jobs): tratto fisso di ogni lavoro, trasferimento a
+        vuoto slot_i -> sorgente_j e avvicinamento da `start` (0 se non nota).
+        """
+        fixed = self.distance[sources, slots]
+        transfer = self.return_distance[np.ix_(slots, sources)]
+        if start is None:
+            initial = np.zeros(len(sources))
+        else:
+            initial = np.linalg.norm(self.source_up[sources, :3] - np.asarray(start, dtype=float)[:3], axis=1)
+        return fixed, transfer, initial
+
+    # ---------- LOOKUP ----------
+
+    def source(self, letter: str) -> Optional[int]:
+        return self.letter_index.get(letter.upper())
+
+    def slot(self, slot_key) -> Optional[int]:
+        return self.slot_index.get(str(slot_key))
+
+    def lookup(self, letters: Iterable[str], slot_keys: Iterable) -> Tuple[np.ndarray, np.ndarray]:
+        """Indici (array) di lettere e slot; -1 dove la posa manca."""
+        sources = np.array([self.letter_index.get(l.upper(), -1) for l in letters], dtype=int)
+        slots = np.array([self.slot_index.get(str(k), -1) for k in slot_keys], dtype=int)
+        return sources, slots
+
+    def pick_place_poses(self, i: int, j: int) -> Tuple[List[float], List[float], List[float], List[float]]:
+        """(sorgente alta, sorgente bassa, slot alto, slot basso) come liste."""
+        return (self.source_up[i].tolist(), self.source_down[i].tolist(),
+                self.slot_up[j].tolist(), self.slot_down[j].tolist())
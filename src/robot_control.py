@@ -1,188 +1,1231 @@
 # src/robot_control.py
 
 import time
+import queue
 import socket
-from typing import List
+import threading
+from typing import List, Optional
 import os
 
+import numpy as np
+
+from ur_state import RobotState, StateReader
+from ur_realtime import RealtimeReader, StateHistory
+from rtde_client import RTDEClient
+from sim_backend import SimulatedController
+from urscript import minify, parse_program
+from commands import (
+    DONE_REGISTER, GRASP_REGISTER, GRASP_WIDTH_REGISTER, CheckGrasp, Command, Grip, MoveJ, MoveL,
+    WaitGrip, clamp_blends, clamp_speeds, compile_program,
+)
+from ur_service import URService
+from dispatcher import Dispatcher, PRIORITY_NORMAL
+from connection import Backoff, ConnectionLost, ConnectionPool, ManagedConnection, get_pool
+from gripper import DEFAULT_FORCE_N, gripper_preamble, render_grip_program, template_tcp
+from planner import order_jobs, travel_length, travel_time
+from motion_model import MotionModel
+from pose_table import PoseTable
+from kinematics import URKinematics, validate_poses
+from transit import TransitBlocked, plan_transit
+from telemetry import SessionTelemetry
+from peephole import drop_redundant_grips, optimize, report
+
+
 class Robot:
     """
     Controllo UR tramite socket TCP sulla porta 30002.
+    Il completamento dei movimenti viene letto da una sessione RTDE (30004) se
+    disponibile, altrimenti dal flusso di stato della stessa porta 30002.
     """
 
-    def __init__(self, robot_ip: str, poses: dict, safety: dict, port: int = 30002):
+    # Timeout di sicurezza (s): se il controller non segnala la fine, si prosegue comunque.
+    # Quando la posizione di partenza è nota il timeout viene dal tempo stimato
+    # (motion_model) moltiplicato per TIMEOUT_FACTOR più TIMEOUT_MARGIN.
+    MOVE_TIMEOUT = 15.0
+    GRIP_TIMEOUT = 10.0
+    TIMEOUT_FACTOR = 2.0
+    TIMEOUT_MARGIN = 5.0
+    # Finestra entro cui ci aspettiamo di vedere il programma partire (s).
+    # Lo script del gripper è grande e impiega di più a essere compilato.
+    MOVE_START_GRACE = 0.5
+    # Attesa massima (s) per mettere in coda e scrivere un programma sul socket
+    SEND_TIMEOUT = 5.0
+    # Età massima (s) di un campione della storia per usarlo come posizione
+    # attuale: il lettore realtime non si riconnette, se cade la storia si ferma
+    HISTORY_MAX_AGE = 0.5
+    GRIP_START_GRACE = 3.0
+
+    def __init__(self, robot_ip: str, poses: dict, safety: dict, port: int = 30002,
+                 sim_verbose: bool = True, motion: dict | None = None,
+                 gripper: dict | None = None, state_stream: dict | None = None,
+                 telemetry: SessionTelemetry | None = None, kinematics: dict | None = None,
+                 connection: dict | None = None):
         self.robot_ip = robot_ip
         self.port = port
+        self.telemetry = telemetry or SessionTelemetry()
 
         self.poses = poses or {}
         self.letter_sources = self.poses.get("letter_sources", {})
         self.slots = self.poses.get("slots", {})
 
+        # Quota massima di transito (z base): si sale solo se il tratto diretto
+        # passa sopra al magazzino o a slot occupati
         self.safe_height = safety.get("safe_height", 0.25)
+        # Ingombro in pianta (m) di una tessera sul tavolo attorno alla sua posa
+        self.obstacle_radius = safety.get("obstacle_radius", 0.04)
         # z_pick_offset: quanto scendere rispetto alla posa salvata (es. -0.05)
         self.z_pick_offset = safety.get("z_pick_offset", -0.05) 
         self.max_speed = safety.get("max_speed", 0.1)
         self.max_acc = safety.get("max_acc", 0.2)
+        # Stima dei tempi (profili trapezoidali) con gli stessi limiti
+        self.motion_model = MotionModel(self.max_speed, self.max_acc)
+        # Pose alte/basse di lettere e slot come array NumPy, calcolate una volta
+        self.pose_table = PoseTable(self.letter_sources, self.slots, self.z_pick_offset)
+        # Slot (chiavi) in cui c'è già una tessera: ostacoli per il transito
+        self.occupied_slots: set = set()
+        # FK/IK dell'UR3: controllo delle pose del config e movej verso pose cartesiane
+        kinematics = kinematics or {}
+        # TCP non indicato = quello che i programmi del gripper impostano con set_tcp
+        tcp = kinematics.get("tcp")
+        self.kinematics = URKinematics(tcp=tcp if tcp is not None else template_tcp())
+        if kinematics.get("check_poses", True):
+            self.check_poses()
+
+        motion = motion or {}
+        # compiled_sequences: tutto il pick&place in un unico programma URScript
+        self.compile_sequences = motion.get("compiled_sequences", False)
+        self.blend_radius = motion.get("blend_radius", 0.01)
+        # overlap_gripper: le aperture non bloccano, il gripper si apre durante
+        # il transito e si aspetta solo prima della discesa
+        self.overlap_gripper = motion.get("overlap_gripper", False)
+        # peephole: passate di ottimizzazione sulle sequenze prima dell'invio
+        self.peephole = motion.get("peephole", False)
+        # Profili (a, v) per tipo di tratto, limitati ai valori di sicurezza
+        self.profiles = self._load_profiles(motion.get("profiles") or {})
+        self._sequence_id = 0
+        self._sequence_lock = threading.Lock()
+        # Coda del thread che invia i programmi sulla 30002 (back-pressure oltre queue_size)
+        self.queue_size = motion.get("queue_size", 16)
+
+        gripper = gripper or {}
+        # Parametri rg_grip (larghezza mm, forza N) per apertura e chiusura
+        force = gripper.get("force_n", DEFAULT_FORCE_N)
+        self.grip_open = (gripper.get("open_width_mm", 43.5), force)
+        self.grip_close = (gripper.get("close_width_mm", 15.0), force)
+        # verify_grasp: dopo ogni chiusura si legge rg_Grip_detected e, se la
+        # tessera non è stata presa, si interrompe il ciclo e si riprova
+        self.verify_grasp = gripper.get("verify_grasp", False)
+        self.grasp_retries = gripper.get("grasp_retries", 1)
+        # Tag dell'ultima verifica di presa fallita (None = nessun fallimento noto)
+        self.failed_grasp: int | None = None
+        # Apertura misurata dopo l'ultima presa verificata (mm)
+        self.last_grasp_width: float | None = None
+        # Ultima larghezza comandata al gripper e se il comando è stato
+        # confermato (programma terminato regolarmente): serve a saltare le
+        # aperture/chiusure che non cambierebbero nulla
+        self.gripper_width: float | None = None
+        self.gripper_confirmed = False
+        # persistent_service: runtime OnRobot inizializzato una volta sola sul
+        # controller, poi ogni presa/movimento è un comando breve via socket
+        self.use_gripper_service = gripper.get("persistent_service", False)
+        self.service_port = gripper.get("service_port", 50002)
+        self.service: URService | None = None
+        self._service_simulated = False
+        # Avvio/uso/chiusura del servizio da thread diversi (es. dispatcher e gioco)
+        self._service_lock = threading.RLock()
 
         self._simulated = False
-        self.sock: socket.socket | None = None
+        connection = connection or {}
+        # Connessioni persistenti (30002, dashboard, RTDE) riaperte con backoff
+        # se cadono; il programma in volo viene reinviato una volta (replay)
+        # oppure fallisce in modo esplicito
+        self.connect_attempts = connection.get("connect_attempts", 3)
+        self.backoff = Backoff(connection.get("backoff_s", 0.5), connection.get("backoff_max_s", 8.0),
+                               connection.get("reconnect_attempts", 5))
+        self.replay = connection.get("replay", True)
+        self.dashboard_port = connection.get("dashboard_port", 29999)
+        self.pool: ConnectionPool | None = None
+        self.conn: ManagedConnection | None = None
+        # Thread che possiede il socket: ordine, unione dei movimenti, stop di emergenza
+        self.dispatcher: Dispatcher | None = None
+        self._estopped = False
+        # Backend simulato con orologio virtuale (creato solo in modalità SIMULATA)
+        self.sim: SimulatedController | None = None
+        self._sim_verbose = sim_verbose
+
+        # Stato letto in background dalla porta 30002 (program running, giunti, TCP)
+        self.reader: StateReader | None = None
+        self._feed_history = True
+        # Ultimo invio di ogni thread (CommandHandle del dispatcher): ogni
+        # chiamante aspetta il proprio programma (vedi _state_mark)
+        self._sent = threading.local()
+
+        state_stream = state_stream or {}
+        # Storia recente dello stato (buffer circolare NumPy): alimentata dalla
+        # porta realtime a 125 Hz se abilitata, altrimenti dalla 30002 (~10 Hz)
+        self.use_realtime = state_stream.get("realtime", False)
+        self.realtime_port = state_stream.get("realtime_port", 30003)
+        self.history = StateHistory(int(state_stream.get("history_seconds", 10.0) * 125))
+        self.realtime: RealtimeReader | None = None
+        # Sessione RTDE: sorgente preferita per attese, verifiche di presa e telemetria
+        self.use_rtde = state_stream.get("rtde", False)
+        self.rtde_port = state_stream.get("rtde_port", 30004)
+        self.rtde: RTDEClient | None = None
+        # Tempo (s) tra l'invio dell'ultimo programma minificato e il suo avvio
+        self.last_load_time: float | None = None
+        self._measure_load = False
 
         if self.robot_ip is None:
             print("⚠️ Nessun IP robot specificato → modalità SIMULATA.")
-            self._simulated = True
+            self._start_simulation()
             return
 
+        print(f"🤖 Connessione all'UR3 {self.robot_ip}:{self.port} ...")
+        self.pool = get_pool(self.robot_ip, {"primary": self.port, "dashboard": self.dashboard_port,
+                                             "rtde": self.rtde_port}, self.backoff)
+        self.conn = self.pool.primary
+        self.conn.replay = self.replay
+        if not self.conn.connect(self.connect_attempts):
+            print(f"⚠️ Impossibile connettersi a {self.robot_ip}:{self.port} → {self.conn.error}")
+            print("➡️ Passo alla modalità SIMULATA.")
+            self.pool.close()
+            self.pool = self.conn = None
+            self._start_simulation()
+            return
+        # Il dispatcher scrive sulla connessione gestita: se cade durante un
+        # invio si riconnette da sola (vedi connection.ManagedConnection)
+        self.dispatcher = Dispatcher(self.conn, self.queue_size, before_send=self._state_mark)
+        self.dispatcher.start()
+        self._feed_history = not self._start_realtime()
+        self._attach_reader(self.conn.sock)
+        self.conn.on_connect(self._on_reconnect)
+        # Un lettore fermo vuol dire flusso 30002 caduto: si riconnette prima
+        # di inviare, invece di scrivere su un socket già chiuso dal controller
+        self.conn.health_check = lambda: self.reader is None or self.reader.alive
+        self._start_rtde()
+        print("✅ Connessione socket riuscita.")
+
+    @property
+    def sock(self) -> socket.socket | None:
+        """Socket attuale della 30002 (cambia dopo una riconnessione)."""
+        return self.conn.sock if self.conn is not None else None
+
+    def _attach_reader(self, sock: socket.socket):
+        # Il flusso della 30002 va comunque letto, altrimenti il buffer si riempie
+        if self.reader is not None:
+            self.reader.stop()
+        self.reader = StateReader(sock, self.history if self._feed_history else None)
+        self.reader.start()
+
+    def _on_reconnect(self, sock: socket.socket):
+        """Nuovo socket 30002: il lettore di stato riparte e il servizio gripper è perso."""
+        self.telemetry.count("reconnects")
+        self._attach_reader(sock)
+        # Il nuovo lettore riparte da sequence 0: le attese lo riconoscono
+        # perché la sorgente è cambiata. Il servizio si chiude senza lock (chi lo
+        # tiene può essere in attesa proprio di questo invio): _service_active()
+        # lo vedrà scollegato e lo riavvierà
+        service = self.service
+        if service is not None:
+            service.close()
+
+    # Tipi di tratto del pick&place:
+    #   transit   spostamenti tra pose alte (e via-point di transito)
+    #   approach  dalla quota di transito alla posa alta di sorgente/slot
+    #   descend   discesa di presa/deposito (stop preciso)
+    #   retreat   risalita dalla posa bassa
+    PROFILES = ("transit", "approach", "descend", "retreat")
+
+    def _load_profiles(self, profiles: dict) -> dict:
+        """(a, v) per ogni tipo di tratto; mancanti = limiti di sicurezza."""
+        result = {}
+        for name in self.PROFILES:
+            profile = profiles.get(name) or {}
+            v = profile.get("v", self.max_speed)
+            a = profile.get("a", self.max_acc)
+            if v > self.max_speed or a > self.max_acc:
+                print(f"⚠️ Profilo '{name}' (v={v}, a={a}) oltre i limiti di sicurezza: "
+                      f"uso v={min(v, self.max_speed)}, a={min(a, self.max_acc)}")
+            result[name] = (min(a, self.max_acc), min(v, self.max_speed))
+        return result
+
+    def _profile(self, name: str | None) -> tuple:
+        """(a, v) del profilo `name`; None = limiti di sicurezza."""
+        return self.profiles.get(name, (self.max_acc, self.max_speed))
+
+    def _start_simulation(self):
+        self._simulated = True
+        self.sim = SimulatedController(self.max_speed, self.max_acc, verbose=self._sim_verbose)
+
+    def _start_realtime(self) -> bool:
+        """Avvia il lettore della porta realtime. False se disabilitato o non raggiungibile."""
+        if not self.use_realtime:
+            return False
         try:
-            print(f"🤖 Connessione all'UR3 {self.robot_ip}:{self.port} ...")
-            self.sock = socket.create_connection((self.robot_ip, self.port), timeout=2.0)
-            self.sock.settimeout(2.0)
-            print("✅ Connessione socket riuscita.")
+            self.realtime = RealtimeReader(self.robot_ip, self.history, self.realtime_port)
         except OSError as e:
-            print(f"⚠️ Impossibile connettersi a {self.robot_ip}:{self.port} → {e}")
-            print("➡️ Passo alla modalità SIMULATA.")
-            self._simulated = True
-            self.sock = None
+            print(f"⚠️ Porta realtime {self.realtime_port} non disponibile ({e}): uso la 30002.")
+            return False
+        self.realtime.start()
+        return True
+
+    def _start_rtde(self) -> bool:
+        """Apre la sessione RTDE. False se disabilitata o non raggiungibile."""
+        if not self.use_rtde:
+            return False
+        self.rtde = self.pool.rtde(block=False)
+        if self.rtde is None:
+            print(f"⚠️ RTDE {self.rtde_port} non disponibile: stato dalla 30002 (riprovo più tardi).")
+            return False
+        return True
+
+    @property
+    def sim_time(self) -> float:
+        """Tempo virtuale trascorso in modalità simulata (s)."""
+        return self.sim.now if self.sim is not None else 0.0
 
     def close(self):
-        if self.sock is not None and not self._simulated:
-            try:
-                self.sock.close()
-            except OSError:
-                pass
+        with self._service_lock:
+            if self.service is not None:
+                self.service.close(send_quit=True)
+                self.service = None
+        if self.reader is not None:
+            self.reader.stop()
+        if self.realtime is not None:
+            self.realtime.stop()
+            self.realtime = None
+        self.rtde = None
+        if self.dispatcher is not None:
+            self.dispatcher.close()
+            self.dispatcher = None
+        if self.pool is not None:
+            # Chiude anche la sessione RTDE e la dashboard
+            self.pool.close()
+            self.pool = self.conn = None
             print("🔌 Connessione socket chiusa.")
 
-    def _send_urscript(self, script: str):
-        if self._simulated or self.sock is None:
-            print(f"(SIM) URScript:\n{script.strip()}")
-            return
+    def _send_urscript(self, script: str, label: str = "", hold: float | None = None) -> bool:
+        """Invia URScript; i programmi def ... end vengono prima minificati. False se l'invio fallisce."""
         if not script.endswith("\n"):
             script += "\n"
+        compact = minify(script)
+        original = script.encode("utf-8") if compact != script else None
+        return self._send_program(compact.encode("utf-8"), label, original, hold)
+
+    def _send_program(self, data: bytes, label: str = "", original: bytes | None = None,
+                      hold: float | None = None) -> bool:
+        """
+        Invia un programma già codificato (es. quelli del gripper, in cache).
+        `original` = il programma prima della minificazione, per il resoconto.
+        `hold` = per quanto (s) al più il programma verrà aspettato con
+        _wait_for_completion: fino ad allora nessun altro invio lo interrompe.
+        """
+        if original is not None:
+            self._report_upload(label, original, data)
+        self.telemetry.count("programs")
+        self.telemetry.count("bytes_sent", len(data))
+        if self._simulated or self.dispatcher is None:
+            if self.sim is not None:
+                self.sim.execute(data.decode("utf-8"), label=label)
+            return True
+        if not self._dispatch(lambda: self.dispatcher.submit_program(data, label, timeout=self.SEND_TIMEOUT,
+                                                                     hold=hold)):
+            self._measure_load = False
+            return False
+        return True
+
+    def _send_motion(self, commands: List[Command], label: str = "", priority: int = PRIORITY_NORMAL,
+                     hold: float | None = None) -> bool:
+        """
+        Invia movimenti tramite il dispatcher: se il controller sta ancora
+        eseguendo un programma aspettato da un altro thread, partono alla sua
+        fine, uniti in un solo programma agli altri movimenti accodati nel frattempo.
+        """
+        if self._simulated or self.dispatcher is None:
+            return self._send_urscript("\n".join(c.to_urscript() for c in commands), label)
+        self.telemetry.count("programs")
+        return self._dispatch(lambda: self.dispatcher.submit_motion(commands, label, priority,
+                                                             timeout=self.SEND_TIMEOUT, hold=hold))
+
+    def _dispatch(self, submit) -> bool:
+        """
+        Mette in coda un invio e aspetta che sia scritto sul socket (non che sia
+        eseguito: la fine la dice _wait_for_completion). Finché il dispatcher
+        aspetta la fine del programma di un altro thread l'attesa continua;
+        altrimenti dopo SEND_TIMEOUT l'invio viene annullato.
+        """
+        with self._service_lock:
+            if self.service is not None:
+                # Un nuovo programma primario interrompe il servizio sul controller
+                self.service.close()
+                self.service = None
+        self._estopped = False
+        self._sent.handle = None
         try:
-            self.sock.sendall(script.encode("utf-8"))
-        except OSError as e:
-            print(f"⚠️ Errore nell'invio di URScript: {e}")
+            handle = submit()
+        except queue.Full:
+            print("⚠️ Coda comandi piena: invio rinunciato.")
+            self.telemetry.count("queue_full")
+            return False
+        while not handle.wait(self.SEND_TIMEOUT):
+            if handle.done() or not self.dispatcher.busy():
+                break
+        if not handle.done():
+            handle.cancel("timeout")
+        if not handle.ok:
+            print(f"⚠️ Errore nell'invio di URScript: {handle.error}")
+            return False
+        self._sent.handle = handle
+        return True
 
-    def _send_script_file(self, filepath: str):
-        if self._simulated or self.sock is None:
-            print(f"(SIM) Invierei il file URScript: {filepath}")
-            return
+    def emergency_stop(self) -> bool:
+        """
+        Ferma subito il robot: i comandi in coda o in invio vengono scartati
+        e lo stop scavalca tutto, il servizio gripper viene chiuso. Si può
+        chiamare da qualunque thread; le attese in corso ritornano False.
+        """
+        print("🛑 STOP di emergenza")
+        self.telemetry.count("emergency_stops")
+        self._estopped = True
+        if self.dispatcher is None:
+            return True
+        # Lo stop sulla 30002 interrompe anche il programma di servizio: lo si
+        # chiude subito (senza lock, chi lo tiene può essere in attesa di una risposta)
+        service, self.service = self.service, None
+        if service is not None:
+            service.close()
+        if self.dispatcher.emergency_stop().wait(self.SEND_TIMEOUT):
+            return True
+        # 30002 irraggiungibile: si ferma il programma dalla dashboard
         try:
-            with open(filepath, "rb") as f:
-                data = f.read()
-            print(f"📄 Invio script UR: {filepath} ({len(data)} bytes)")
-            self.sock.sendall(data)
-        except OSError as e:
-            print(f"⚠️ Errore nel leggere o inviare {filepath}: {e}")
+            reply = self.pool.dashboard.request("stop")
+        except ConnectionLost as e:
+            print(f"⚠️ Stop non consegnato: {e}")
+            return False
+        print(f"🛑 Dashboard: {reply}")
+        return True
+
+    def _report_upload(self, label: str, original: bytes, data: bytes):
+        """Byte prima/dopo la minificazione e tempo di caricamento sul controller."""
+        saved = 100.0 * (len(original) - len(data)) / len(original)
+        message = f"🗜️ {label or 'programma'}: {len(original)} → {len(data)} bytes (-{saved:.0f}%)"
+        if self.sim is not None:
+            before = self.sim.load_time(parse_program(original.decode("utf-8")))
+            after = self.sim.load_time(parse_program(data.decode("utf-8")))
+            message += f", caricamento stimato {before:.2f}s → {after:.2f}s"
+        else:
+            # Il tempo reale viene misurato in _wait_for_completion
+            self._measure_load = True
+        print(message)
+
+    # ---------- STATO / COMPLETAMENTO ----------
+
+    def _state_source(self) -> StateReader | RTDEClient | None:
+        """RTDE se la sessione è attiva, altrimenti il lettore della 30002."""
+        if self.rtde is not None and self.rtde.alive:
+            return self.rtde
+        if self.use_rtde and self.pool is not None:
+            # Sessione caduta: nuovo tentativo, senza bloccare, rispettando il backoff
+            self.rtde = self.pool.rtde(block=False)
+            if self.rtde is not None:
+                return self.rtde
+        return self.reader
+
+    @property
+    def state(self) -> Optional[RobotState]:
+        """Ultimo stato ricevuto dal controller (aggiornato dal thread di lettura)."""
+        source = self._state_source()
+        return source.latest if source is not None else None
+
+    def _state_mark(self) -> tuple:
+        """
+        Chiamata dal dispatcher subito prima di scrivere un programma: da lì in
+        poi conta solo lo stato arrivato dopo. Il segno finisce nell'handle di
+        quell'invio, così ogni chiamante aspetta il proprio programma.
+        Il controller esegue un programma alla volta: se un altro invio lo
+        interrompe (handle.preempted) l'attesa fallisce.
+        """
+        source = self._state_source()
+        if source is None:
+            return None, 0, None, False
+        # Valore del registro di fine sequenza prima dell'invio (può essere
+        # rimasto da una sessione precedente con lo stesso id), e se il
+        # controller stava ancora eseguendo un programma (es. uno la cui
+        # attesa è scaduta)
+        state = source.latest
+        return (source, source.sequence,
+                state.output_int_registers.get(DONE_REGISTER) if state else None,
+                bool(state and state.program_running))
+
+    def _wait_for_completion(self, timeout: float, start_grace: float,
+                             done_value: int | None = None) -> bool:
+        """
+        Attende che il programma appena inviato termini.
+        Fine = il flag "program running" passa da True a False, oppure (se il
+        programma è stato così rapido da non essere mai visto in esecuzione)
+        il robot risulta fermo e non in esecuzione dopo `start_grace` secondi.
+        Con `done_value` e registri disponibili (RTDE) la fine è SOLO il registro
+        DONE_REGISTER che vale `done_value`: un programma che termina senza
+        scriverlo (es. halt di una verifica di presa) non è andato a buon fine.
+        Se un altro invio interrompe il programma l'attesa fallisce.
+        In simulazione il tempo è già stato contato sull'orologio virtuale.
+        """
+        handle = getattr(self._sent, "handle", None)
+        self._sent.handle = None
+        try:
+            return self._wait_for_program(handle, timeout, start_grace, done_value)
+        finally:
+            if handle is not None:
+                # La coda del dispatcher può ripartire
+                handle.release()
+
+    def _wait_for_program(self, handle, timeout: float, start_grace: float,
+                          done_value: int | None) -> bool:
+        source = self._state_source()
+        if self._simulated or source is None:
+            return True
+
+        start = time.monotonic()
+        deadline = start + timeout
+        seen_running = False
+        marked_source, last, done_mark, busy = handle.mark if handle is not None else (None, 0, None, False)
+        if marked_source is not source:
+            # Sorgente cambiata dopo l'invio (riconnessione, RTDE caduto/ripreso)
+            last = 0
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            state = source.wait_for_update(last, deadline - now)
+            if self._estopped:
+                print("🛑 Attesa interrotta dallo stop di emergenza.")
+                return False
+            if handle is not None and handle.preempted:
+                print("⚠️ Programma interrotto da un altro invio.")
+                return False
+            if state is None:
+                if not source.alive:
+                    print(f"⚠️ Errore nella lettura dello stato: {source.error}")
+                    return False
+                continue
+            last = state.sequence
+            if state.protective_stopped or state.emergency_stopped:
+                print("⚠️ Robot in stop di sicurezza: interrompo l'attesa.")
+                return False
+            expects_register = done_value is not None and DONE_REGISTER in state.output_int_registers
+            if (expects_register and done_value != done_mark
+                    and state.output_int_registers[DONE_REGISTER] == done_value):
+                return True
+            if state.program_running and busy:
+                # Ancora il programma precedente: il nostro parte dopo che il
+                # controller lo ha interrotto (flag abbassato durante il caricamento)
+                continue
+            busy = False
+            if state.program_running:
+                if not seen_running and self._measure_load:
+                    self.last_load_time = state.received_at - start
+                    self._measure_load = False
+                    print(f"⏱️ Programma avviato dal controller in {self.last_load_time:.2f}s")
+                seen_running = True
+            elif seen_running:
+                if expects_register:
+                    print("⚠️ Programma terminato prima della fine della sequenza.")
+                    return False
+                return True
+            elif (not expects_register and state.received_at - start > start_grace
+                  and state.is_steady()):
+                return True
+
+        print(f"⚠️ Timeout ({timeout:.1f}s) in attesa del completamento.")
+        return False
 
     # ---------- MOVIMENTO BASE ----------
 
-    def move_joints(self, joints: List[float]):
-        cmd = (
-            f"movej([{joints[0]:.5f}, {joints[1]:.5f}, {joints[2]:.5f}, "
-            f"{joints[3]:.5f}, {joints[4]:.5f}, {joints[5]:.5f}], "
-            f"a={self.max_acc}, v={self.max_speed})"
-        )
+    def move_joints(self, joints: List[float], profile: str | None = None) -> bool:
+        """Movimento nello spazio dei giunti. True se il controller ne conferma la fine."""
+        if not self.kinematics.within_limits(np.asarray(joints, dtype=float)):
+            print(f"❌ move_joints: giunti fuori dai limiti {joints}")
+            return False
+        command = MoveJ(tuple(joints), *self._profile(profile))
         print("➡️ move_joints:", joints)
-        self._send_urscript(cmd)
-        time.sleep(2.0)
-
-    def move_linear(self, pose: List[float]):
-        """Movimento lineare verso una posa assoluta [x,y,z,rx,ry,rz]."""
-        cmd = (
-            f"movel(p[{pose[0]:.5f}, {pose[1]:.5f}, {pose[2]:.5f}, "
-            f"{pose[3]:.5f}, {pose[4]:.5f}, {pose[5]:.5f}], "
-            f"a={self.max_acc}, v={self.max_speed})"
-        )
+        if self._use_service():
+            return self._run_on_service([command])
+        timeout = self._timeout([command], self.MOVE_TIMEOUT)
+        if not self._send_motion([command], hold=timeout):
+            return False
+        return self._wait_for_completion(timeout, self.MOVE_START_GRACE)
+
+    def move_linear(self, pose: List[float], profile: str | None = None) -> bool:
+        """
+        Movimento lineare verso una posa assoluta [x,y,z,rx,ry,rz] (profilo di
+        velocità opzionale). True se il controller ne conferma la fine.
+        """
+        command = MoveL(tuple(pose), *self._profile(profile))
         print(f"➡️ move_linear verso: {pose}")
-        self._send_urscript(cmd)
-        time.sleep(2.5) 
-
-    def grip(self, state: bool):
-        """True -> CHIUDI, False -> APRI"""
-        # Assicurati che i file siano nella cartella corretta o usa percorso assoluto/relativo
-        script_apri = "src\pinza40UR3.py"
-        script_chiudi = "src\pinza10UR3.py"
-        
-        filepath = script_chiudi if state else script_apri
-        print(f"{'🔴 CHIUDI' if state else '🟢 APRI'} gripper ({filepath})")
-        self._send_script_file(filepath)
-        time.sleep(1.5)
+        if self._use_service():
+            return self._run_on_service([command])
+        timeout = self._timeout([command], self.MOVE_TIMEOUT)
+        if not self._send_motion([command], hold=timeout):
+            return False
+        return self._wait_for_completion(timeout, self.MOVE_START_GRACE)
+
+    def move_joints_to_pose(self, pose: List[float]) -> bool:
+        """
+        movej verso una posa cartesiana [x,y,z,rx,ry,rz]: tra le soluzioni IK
+        si usa quella più vicina ai giunti attuali (o a home), senza riconfigurazioni.
+        """
+        reference = self._current_joints() or self.poses.get("home") or [0.0] * 6
+        joints, ok = self.kinematics.nearest_ik([pose], reference)
+        if not ok[0]:
+            print(f"❌ Posa non raggiungibile dall'UR3: {pose}")
+            return False
+        return self.move_joints(joints[0].tolist())
+
+    def check_poses(self) -> List[str]:
+        """
+        Controllo FK/IK di tutte le pose del config; stampa e ritorna i problemi.
+        Le lettere e gli slot con una posa non valida vengono esclusi dalla
+        tabella delle pose: place_letter_in_slot e place_word li rifiutano.
+        """
+        problems = validate_poses(self.poses, self.kinematics, self.poses.get("home"), self.z_pick_offset)
+        for name, problem in problems.items():
+            print(f"⚠️ Pose: {name}: {problem}")
+        if not problems:
+            print("✅ Pose del config raggiungibili e lontane da singolarità.")
+        rejected = {"letter_sources": [], "slots": []}
+        for name in problems:
+            group, _, key = name.partition(".")
+            if group in rejected:
+                rejected[group].append(key)
+        self.pose_table.reject(rejected["letter_sources"], rejected["slots"])
+        if rejected["letter_sources"] or rejected["slots"]:
+            print(f"🚫 Pose escluse: lettere {rejected['letter_sources'] or '-'}, slot {rejected['slots'] or '-'}")
+        return [f"{name}: {problem}" for name, problem in problems.items()]
+
+    def grip(self, state: bool) -> bool:
+        """
+        True -> CHIUDI, False -> APRI.
+        Ritorna False se il controller non ne conferma la fine (timeout, stop)
+        o se la chiusura è stata verificata come fallita (tag in `failed_grasp`).
+        """
+        verify = state and self.verify_grasp
+        self.failed_grasp = None
+        width, force = self.grip_close if state else self.grip_open
+        if self.gripper_confirmed and self.gripper_width == width:
+            print(f"⏭️ Gripper già {'chiuso' if state else 'aperto'} ({width} mm): comando saltato")
+            self.telemetry.count("gripper_skipped")
+            return True
+
+        if self._use_service():
+            print(f"{'🔴 CHIUDI' if state else '🟢 APRI'} gripper (servizio)")
+            commands: List[Command] = [Grip(width, force)]
+            if verify:
+                commands.append(CheckGrasp(abort=False))
+            done = self._run_on_service(commands)
+            self._track_gripper(commands, done)
+            return done and self.failed_grasp is None
+
+        print(f"{'🔴 CHIUDI' if state else '🟢 APRI'} gripper ({width} mm)")
+        sent = self._send_program(render_grip_program(width, force, verify=verify), f"gripper {width} mm",
+                                  render_grip_program(width, force, compact=False, verify=verify),
+                                  hold=self.GRIP_TIMEOUT)
+        done = sent and self._wait_for_completion(self.GRIP_TIMEOUT, self.GRIP_START_GRACE)
+        if verify and sent:
+            self._check_grasp_registers()
+        self._track_gripper([Grip(width, force)], done)
+        return done and self.failed_grasp is None
+
+    def open_while_moving(self, pose: List[float], profile: str | None = None) -> bool:
+        """
+        Apre il gripper mentre il TCP va verso `pose`: un solo programma con
+        Grip non bloccante e barriera finale, così l'apertura non allunga il ciclo.
+        True se apertura e movimento sono stati completati.
+        """
+        if not self.overlap_gripper:
+            return self.grip(False) and self.move_linear(pose, profile)
+        print(f"🟢 APRI gripper durante move_linear verso: {pose}")
+        a, v = self._profile(profile)
+        return self.run_sequence([Grip(*self.grip_open, blocking=False),
+                                  MoveL(tuple(pose), a, v), WaitGrip()], label="apertura in movimento")
+
+    def _optimize(self, commands: List[Command]) -> List[Command]:
+        """Passate peephole (vedi peephole.py); stampa il tempo stimato risparmiato da ognuna."""
+        optimized, rewrites = optimize(
+            commands, self.motion_model, tcp=self._current_tcp(), joints=self._current_joints(),
+            gripper_width=self.gripper_width if self.gripper_confirmed else None,
+            blend_radius=self.blend_radius)
+        if rewrites:
+            print(f"🔧 Peephole: {report(rewrites)}")
+            for rewrite in rewrites:
+                self.telemetry.count(f"peephole_{rewrite.name}", rewrite.changed)
+                self.telemetry.add_time("peephole_saved", rewrite.saved)
+        return optimized
+
+    # ---------- STATO GRIPPER ----------
+
+    def _track_gripper(self, commands: List[Command], done: bool, skipped: int = 0):
+        """
+        Aggiorna lo stato del gripper dopo l'esecuzione di `commands`; solo se
+        il programma è stato completato conta gli azionamenti e i `skipped`
+        Grip tolti perché superflui.
+        """
+        grips = [c for c in commands if isinstance(c, Grip)]
+        if not done:
+            # Programma interrotto: non sappiamo fin dove è arrivato
+            self.gripper_width, self.gripper_confirmed = None, False
+            return
+        self.telemetry.count("gripper_actuations", len(grips))
+        self.telemetry.count("gripper_skipped", skipped)
+        if grips:
+            self.gripper_width, self.gripper_confirmed = grips[-1].width, True
+
+    # ---------- VERIFICA PRESA ----------
+
+    def _done_register(self) -> int | None:
+        """
+        Valore attuale di DONE_REGISTER; None se i registri di output (fine
+        sequenza, esito prese) non sono disponibili: arrivano solo via RTDE.
+        """
+        source = self._state_source()
+        if not isinstance(source, RTDEClient):
+            return None
+        # Subito dopo la connessione il primo campione può non essere ancora arrivato
+        state = source.latest or source.wait_for_update(0, 1.0)
+        return state.output_int_registers.get(DONE_REGISTER) if state is not None else None
+
+    def _check_grasp_registers(self):
+        """
+        Legge l'esito delle verifiche di presa dai registri (via RTDE): un valore
+        negativo in GRASP_REGISTER è il tag della presa fallita. Senza registri
+        (simulazione, stato solo dalla 30002) l'esito resta sconosciuto.
+        """
+        state = self.state
+        if state is None or GRASP_REGISTER not in state.output_int_registers:
+            return
+        width = state.output_int_registers.get(GRASP_WIDTH_REGISTER)
+        if width is not None:
+            self.last_grasp_width = width / 10.0
+        value = state.output_int_registers[GRASP_REGISTER]
+        if value < 0:
+            self.failed_grasp = -value
+            print(f"❌ Presa fallita: nessuna tessera rilevata (apertura {self.last_grasp_width} mm)")
+            self.telemetry.count("grasp_failures")
+
+    # ---------- PROGRAMMI COMPILATI ----------
+
+    def run_sequence(self, commands: List[Command], label: str = "sequenza") -> bool:
+        """
+        Invia una lista di comandi come UN SOLO programma URScript (gripper
+        inizializzato una volta, raccordi tra i waypoint) e attende la fine.
+        Se una verifica di presa fallisce il programma si ferma lì: ritorna
+        False e il tag della presa è in `failed_grasp`.
+        """
+        self.failed_grasp = None
+        commands = clamp_speeds(commands, self.max_speed, self.max_acc)
+        requested = sum(1 for c in commands if isinstance(c, Grip))
+        if self.peephole:
+            commands = self._optimize(commands)
+        else:
+            # I Grip superflui si tolgono sempre, anche senza le altre passate
+            commands, _ = drop_redundant_grips(
+                commands, gripper_width=self.gripper_width if self.gripper_confirmed else None)
+        skipped = requested - sum(1 for c in commands if isinstance(c, Grip))
+        if self._use_service():
+            print(f"🧩 Sequenza '{label}' via servizio: {len(commands)} comandi")
+            done = self._run_on_service(clamp_blends(commands))
+            self._track_gripper(commands, done, skipped)
+            return done
+
+        done_register = None if self._simulated else self._done_register()
+        if (not self._simulated and done_register is None
+                and any(isinstance(c, CheckGrasp) for c in commands)):
+            # Senza registri l'halt di una presa vuota sembrerebbe una fine
+            # regolare: la verifica non si può fare, meglio non compilarla
+            print("⚠️ Registri RTDE non disponibili: verifica di presa disattivata per questa sequenza.")
+            commands = [c for c in commands if not isinstance(c, CheckGrasp)]
+
+        with self._sequence_lock:
+            self._sequence_id += 1
+            if done_register == self._sequence_id:
+                # Valore rimasto da una sessione precedente: la fine non sarebbe riconoscibile
+                self._sequence_id += 1
+            sequence_id = self._sequence_id
+        needs_gripper = any(isinstance(c, (Grip, WaitGrip, CheckGrasp)) for c in commands)
+        preamble = gripper_preamble() if needs_gripper else ""
+        program = compile_program(f"wb_seq_{sequence_id}", commands, preamble, sequence_id)
+
+        n_moves = sum(1 for c in commands if isinstance(c, (MoveL, MoveJ)))
+        n_grips = sum(1 for c in commands if isinstance(c, Grip))
+        print(f"🧩 Programma compilato '{label}': {n_moves} movimenti, {n_grips} prese")
+        timeout = self._timeout(commands, n_moves * self.MOVE_TIMEOUT + n_grips * self.GRIP_TIMEOUT)
+        if not self._send_urscript(program, f"sequenza {label}", hold=timeout):
+            self._track_gripper(commands, False)
+            return False
+        start_grace = self.GRIP_START_GRACE if needs_gripper else self.MOVE_START_GRACE
+        done = self._wait_for_completion(timeout, start_grace, sequence_id)
+        if any(isinstance(c, CheckGrasp) for c in commands):
+            self._check_grasp_registers()
+        done = done and self.failed_grasp is None
+        self._track_gripper(commands, done, skipped)
+        return done
+
+    # ---------- SERVIZIO PERSISTENTE ----------
+
+    def start_gripper_service(self) -> bool:
+        """
+        Invia il programma di servizio (inizializzazione OnRobot + ciclo comandi)
+        e attende che si colleghi al PC. Se fallisce si torna agli script completi.
+        """
+        with self._service_lock:
+            return self._start_gripper_service()
+
+    def _start_gripper_service(self) -> bool:
+        if self._service_active():
+            return True
+        preamble = gripper_preamble()
+
+        if self._simulated:
+            if self.sim is not None:
+                # Stesso programma del robot reale, così il modello di carico è realistico
+                program = URService("127.0.0.1", self.service_port).program(preamble)
+                self._send_urscript(program, "servizio gripper")
+            self._service_simulated = True
+            print("🧰 (SIM) Servizio gripper avviato.")
+            return True
+        if self.sock is None:
+            return False
+
+        # L'indirizzo del PC visto dal robot è quello della connessione già aperta
+        service = URService(self.sock.getsockname()[0], self.service_port)
+        try:
+            service.listen()
+        except OSError as e:
+            print(f"⚠️ Impossibile aprire la porta {self.service_port} per il servizio: {e}")
+            self.use_gripper_service = False
+            return False
+
+        print(f"🧰 Avvio servizio gripper (porta {self.service_port}) ...")
+        self._send_urscript(service.program(preamble), "servizio gripper")
+        # Il programma di servizio non passa da _wait_for_completion: niente
+        # misura del caricamento, altrimenti finirebbe sul prossimo programma
+        self._measure_load = False
+        if not service.accept():
+            print("➡️ Servizio non disponibile: uso gli script gripper completi.")
+            self.use_gripper_service = False
+            return False
+        self.service = service
+        print("✅ Servizio gripper attivo.")
+        return True
+
+    def _service_active(self) -> bool:
+        return self._service_simulated or (self.service is not None and self.service.connected)
+
+    def _use_service(self) -> bool:
+        if not self.use_gripper_service:
+            return False
+        return self._service_active() or self.start_gripper_service()
+
+    def _run_on_service(self, commands: List[Command]) -> bool:
+        with self._service_lock:
+            if not self._service_active() and not self._start_gripper_service():
+                return False
+            return self._run_service_batches(commands)
+
+    def _run_service_batches(self, commands: List[Command]) -> bool:
+        if self._service_simulated:
+            if self.sim is not None:
+                moves = [c for c in commands if not isinstance(c, CheckGrasp)]
+                script = "\n".join(c.to_urscript() for c in moves) + "\n"
+                self.sim.execute(script, label=f"(servizio) {len(moves)} comandi")
+            return True
+        # Le verifiche di presa spezzano la pipeline: l'esito arriva con la
+        # risposta "grip,<larghezza>,<rilevata>" dell'ultima presa
+        service = self.service
+        batch: List[Command] = []
+        for command in commands + [None]:
+            if command is not None and not isinstance(command, CheckGrasp):
+                batch.append(command)
+                continue
+            if batch and (self._estopped or service is None):
+                print("🛑 Stop di emergenza: comandi al servizio non inviati.")
+                return False
+            if batch and not service.run(batch):
+                if self.service is service:
+                    self.service = None
+                return False
+            # Solo la risposta di una presa di questo lotto conta: senza, la
+            # presa non è verificabile e si considera fallita
+            grip = service.last_grip if batch else None
+            batch = []
+            if command is None:
+                continue
+            if grip is None:
+                self.failed_grasp = command.tag
+                print("❌ Presa non verificabile: nessuna risposta del gripper prima della verifica")
+                self.telemetry.count("grasp_failures")
+                if command.abort:
+                    return False
+                continue
+            self.last_grasp_width, detected = grip
+            if not detected:
+                self.failed_grasp = command.tag
+                print(f"❌ Presa fallita: nessuna tessera rilevata (apertura {self.last_grasp_width} mm)")
+                self.telemetry.count("grasp_failures")
+                if command.abort:
+                    return False
+        return True
+
+    def _transit(self, start, end, source: int, slot: int, occupied=None) -> List[List[float]]:
+        """
+        Via-point tra due pose alte: ostacoli sono le tessere del magazzino
+        (tranne la sorgente `source`) e gli slot occupati (tranne `slot`).
+        TransitBlocked se non si possono scavalcare entro safe_height.
+        """
+        if start is None:
+            return []
+        occupied = self.occupied_slots if occupied is None else occupied
+        rows = [self.pose_table.slot(key) for key in occupied]
+        rows = [j for j in rows if j is not None and j != slot]
+        obstacles = np.vstack((np.delete(self.pose_table.source_up, source, axis=0),
+                               self.pose_table.slot_up[rows]))
+        return plan_transit(start, end, obstacles, self.obstacle_radius,
+                            abs(self.z_pick_offset), self.safe_height)
+
+    def _pick_place_commands(self, source: int, slot: int, grasp_tag: int = 1,
+                             start: Optional[List[float]] = None, occupied=None) -> List[Command]:
+        """
+        Sequenza pick&place (indici della tabella delle pose): raccordo sui
+        waypoint alti e sui via-point di transito, stop preciso in basso.
+        `start` è la posa da cui si arriva (per il transito verso la sorgente).
+        Con verify_grasp, dopo la chiusura una presa mancata ferma il programma.
+        Con overlap_gripper le aperture procedono durante i movimenti.
+        """
+        source_up, source_down, slot_up, slot_down = self.pose_table.pick_place_poses(source, slot)
+        r = self.blend_radius
+        transit, descend, retreat = self._profile("transit"), self._profile("descend"), self._profile("retreat")
+        check = [CheckGrasp(grasp_tag)] if self.verify_grasp else []
+        overlap = self.overlap_gripper
+        barrier = [WaitGrip()] if overlap else []
+
+        def hop(begin, end):
+            # Tragitto fino alla posa alta `end`: diretto (transit) oppure via-point
+            # di transito e discesa finale sulla posa alta (approach)
+            via = self._transit(begin, end, source, slot, occupied)
+            profile = self._profile("approach") if via else transit
+            return [MoveL(tuple(p), *transit, r) for p in via] + [MoveL(tuple(end), *profile, r)]
+
+        return [
+            Grip(*self.grip_open, blocking=not overlap),   # 1. Apri
+            *hop(start, source_up),                         # 2. Sopra la lettera
+            *barrier,                                       #    (dita aperte?)
+            MoveL(tuple(source_down), *descend),            # 3. Scendi
+            Grip(*self.grip_close),                         # 4. Chiudi
+            *check,                                         #    (tessera presa?)
+            MoveL(tuple(source_up), *retreat, r),           # 5. Risali
+            *hop(source_up, slot_up),                       # 6. Sopra lo slot
+            MoveL(tuple(slot_down), *descend),              # 7. Scendi
+            Grip(*self.grip_open, blocking=not overlap),   # 8. Rilascia
+            MoveL(tuple(slot_up), *retreat),                # 9. Risali (mentre si apre)
+        ]
+
+    def _plan_commands(self, rows: List[tuple], start: Optional[List[float]], first_tag: int = 1) -> List[Command]:
+        """
+        Pick&place consecutivi (coppie sorgente/slot della tabella): ogni
+        ciclo parte dallo slot del precedente e trova occupati i suoi slot.
+        """
+        commands: List[Command] = []
+        occupied = set(self.occupied_slots)
+        for tag, (i, j) in enumerate(rows, start=first_tag):
+            commands += self._pick_place_commands(i, j, tag, start, occupied)
+            start = self.pose_table.slot_up[j].tolist()
+            occupied.add(self.pose_table.slot_keys[j])
+        return commands
 
     # ---------- UTILS CALCOLO POSIZIONE ----------
 
-    def _get_down_pose(self, pose: List[float]) -> List[float]:
+    def _fresh_sample(self):
+        """Ultimo campione della storia, se abbastanza recente (altrimenti None)."""
+        latest = self.history.latest()
+        if latest is None or time.monotonic() - latest["received_at"] > self.HISTORY_MAX_AGE:
+            return None
+        return latest
+
+    def _current_tcp(self) -> Optional[List[float]]:
+        """Posa TCP attuale se nota (stato dal controller o backend simulato)."""
+        if self.sim is not None:
+            return self.sim.tcp_pose
+        latest = self._fresh_sample()
+        if latest is not None:
+            return latest["tcp"].tolist()
+        state = self.state
+        if state is not None and state.tcp_pose:
+            return state.tcp_pose
+        return None
+
+    def _current_joints(self) -> Optional[List[float]]:
+        """Posizione dei giunti attuale se nota."""
+        if self.sim is not None:
+            return self.sim.joints
+        latest = self._fresh_sample()
+        if latest is not None:
+            return latest["q"].tolist()
+        state = self.state
+        if state is not None and state.q_actual:
+            return state.q_actual
+        return None
+
+    def estimate_time(self, commands: List[Command]) -> Optional[float]:
         """
-        Prende una posa [x,y,z,rx,ry,rz] e restituisce una NUOVA posa
-        con la Z modificata sommando z_pick_offset.
-        Non interroga il robot, fa solo matematica pura.
+        Tempo stimato (s) di movimenti e gripper per una lista di comandi,
+        partendo dalla posizione attuale. None se la partenza non è nota.
         """
-        # Creiamo una copia della lista per non modificare l'originale
-        down_pose = list(pose)
-        
-        # Modifichiamo la Z (indice 2)
-        # z_pick_offset nel config deve essere negativo (es. -0.05)
-        down_pose[2] = down_pose[2] + self.z_pick_offset
-        
-        return down_pose
+        tcp, joints = self._current_tcp(), self._current_joints()
+        if tcp is None and any(isinstance(c, MoveL) for c in commands):
+            return None
+        if joints is None and any(isinstance(c, MoveJ) for c in commands):
+            return None
+        return self.motion_model.sequence_time(commands, tcp=tcp, joints=joints,
+                                               gripper_width=self.gripper_width)
+
+    def _timeout(self, commands: List[Command], fallback: float) -> float:
+        """Timeout di attesa per `commands`: stima con margine, `fallback` se non stimabile."""
+        estimate = self.estimate_time(commands)
+        if estimate is None:
+            return fallback
+        return self.TIMEOUT_FACTOR * estimate + self.TIMEOUT_MARGIN
 
     # ---------- PICK & PLACE LOGIC ----------
 
-    def place_letter_in_slot(self, letter: str, slot_index: int):
+    def place_letter_in_slot(self, letter: str, slot_index: int, compiled: bool | None = None) -> bool:
         """
         Esegue Pick & Place calcolando le coordinate di discesa
         basandosi ESCLUSIVAMENTE sui dati del config.yaml.
         Nessuna chiamata a get_actual_tcp_pose().
+        Con compiled=True (default: motion.compiled_sequences) l'intera sequenza
+        viene inviata come un unico programma con raccordi.
+        Se la presa fallisce (verify_grasp) il ciclo si interrompe subito e la
+        presa viene ritentata fino a grasp_retries volte.
+        Ritorna True se la lettera è stata depositata.
         """
         print(f"\n📦 INIZIO Pick&Place: Lettera '{letter}' -> Slot {slot_index}")
         
         # --- 0. RECUPERO COORDINATE DAL CONFIG ---
         letter = letter.upper()
-        if letter not in self.letter_sources:
+        source_index = self.pose_table.source(letter)
+        if source_index is None:
             print(f"⚠️ Errore: Lettera {letter} non trovata nei source.")
-            return
+            return False
         
-        slot_key = str(slot_index)
-        if slot_key not in self.slots:
+        slot_table_index = self.pose_table.slot(slot_index)
+        if slot_table_index is None:
             print(f"⚠️ Errore: Slot {slot_index} non trovato.")
-            return
+            return False
+        if not self.pose_table.source_valid[source_index] or not self.pose_table.slot_valid[slot_table_index]:
+            print(f"⚠️ Errore: posa non valida per la lettera {letter} o lo slot {slot_index} (vedi controllo pose).")
+            return False
+
+        # Pose ALTE (dal config) e BASSE (z + z_pick_offset) della lettera e
+        # dello slot, già calcolate nella tabella delle pose
+        source_pose_up, source_pose_down, slot_pose_up, slot_pose_down = \
+            self.pose_table.pick_place_poses(source_index, slot_table_index)
+        slot_key = self.pose_table.slot_keys[slot_table_index]
 
-        # Posa ALTA della lettera (dal config)
-        source_pose_up = self.letter_sources[letter]
-        # Calcolo Posa BASSA della lettera (matematica Python)
-        source_pose_down = self._get_down_pose(source_pose_up)
+        attempts = 1 + max(0, self.grasp_retries) if self.verify_grasp else 1
 
-        # Posa ALTA dello slot (dal config)
-        slot_pose_up = self.slots[slot_key]
-        # Calcolo Posa BASSA dello slot (matematica Python)
-        slot_pose_down = self._get_down_pose(slot_pose_up)
+        def interrupted() -> bool:
+            print(f"⚠️ Sequenza non completata: lettera '{letter}' non posizionata.\n")
+            return False
 
+        if compiled if compiled is not None else self.compile_sequences:
+            for attempt in range(1, attempts + 1):
+                # Ricalcolata a ogni tentativo: dopo un halt il robot è fermo
+                # sulla posa bassa della sorgente, non dove era partito
+                try:
+                    commands = self._pick_place_commands(source_index, slot_table_index,
+                                                         start=self._current_tcp())
+                except TransitBlocked as e:
+                    print(f"❌ Transito impossibile ({e}): lettera '{letter}' non posizionata.\n")
+                    return False
+                if self.run_sequence(commands, label=f"{letter} -> slot {slot_index}"):
+                    print("✅ Sequenza completata.\n")
+                    self.telemetry.count("letters_placed")
+                    self.occupied_slots.add(slot_key)
+                    return True
+                if self.failed_grasp is None:
+                    print("⚠️ Sequenza non completata.\n")
+                    return False
+                if attempt < attempts:
+                    print(f"🔁 Riprovo la presa della lettera '{letter}' ({attempt}/{attempts - 1})")
+            print(f"❌ Lettera '{letter}' non presa dopo {attempts} tentativi.\n")
+            return False
+
+
+        # Tragitto sorgente -> slot pianificato prima della presa: se non c'è
+        # una quota sicura non si prende nemmeno la tessera
+        try:
+            place_via = self._transit(source_pose_up, slot_pose_up, source_index, slot_table_index)
+        except TransitBlocked as e:
+            print(f"❌ Transito impossibile ({e}): lettera '{letter}' non posizionata.\n")
+            return False
 
         # --- FASE 1: PICK (PRESA) ---
         print("--- FASE PICK ---")
         
-        self.grip(False)                    # 1. Apri
-        self.move_linear(source_pose_up)    # 2. Vai sopra la lettera (ALTO)
-        
-        print(f"   ⬇️ Scendo a Z={source_pose_down[2]:.4f}")
-        self.move_linear(source_pose_down)  # 3. Scendi alla posa calcolata (BASSO)
-        
-        self.grip(True)                     # 4. Chiudi (PRESA)
-        
-        print(f"   ⬆️ Risalgo a Z={source_pose_up[2]:.4f}")
-        self.move_linear(source_pose_up)    # 5. Torna su (ALTO)
+        for attempt in range(1, attempts + 1):
+            # Transito sopra le tessere (se serve), poi 1. Apri + 2. Vai sopra
+            # la lettera (ALTO), in parallelo se overlap_gripper
+            try:
+                via_points = self._transit(self._current_tcp(), source_pose_up, source_index, slot_table_index)
+            except TransitBlocked as e:
+                print(f"❌ Transito impossibile ({e}): lettera '{letter}' non posizionata.\n")
+                return False
+            # Ogni passo deve essere confermato dal controller, altrimenti ci si ferma lì
+            if not all(self.move_linear(via, "transit") for via in via_points):
+                return interrupted()
+            if not self.open_while_moving(source_pose_up, "approach" if via_points else "transit"):
+                return interrupted()
+
+            print(f"   ⬇️ Scendo a Z={source_pose_down[2]:.4f}")
+            if not self.move_linear(source_pose_down, "descend"):  # 3. Scendi alla posa calcolata (BASSO)
+                return interrupted()
+
+            grasped = self.grip(True)           # 4. Chiudi (PRESA)
+            if not grasped and self.failed_grasp is None:
+                return interrupted()
+
+            print(f"   ⬆️ Risalgo a Z={source_pose_up[2]:.4f}")
+            if not self.move_linear(source_pose_up, "retreat"):    # 5. Torna su (ALTO)
+                return interrupted()
+            if grasped:
+                break
+            if attempt < attempts:
+                print(f"🔁 Riprovo la presa della lettera '{letter}' ({attempt}/{attempts - 1})")
+        else:
+            # Niente fase di deposito a vuoto
+            self.grip(False)
+            print(f"❌ Lettera '{letter}' non presa dopo {attempts} tentativi.\n")
+            return False
 
 
         # --- FASE 2: PLACE (DEPOSITO) ---
         print("--- FASE PLACE ---")
-        
-        self.move_linear(slot_pose_up)      # 6. Vai sopra lo slot (ALTO)
-        
+
+        if not all(self.move_linear(via, "transit") for via in place_via):
+            return interrupted()
+        # 6. Vai sopra lo slot (ALTO)
+        if not self.move_linear(slot_pose_up, "approach" if place_via else "transit"):
+            return interrupted()
+
         print(f"   ⬇️ Scendo a Z={slot_pose_down[2]:.4f}")
-        self.move_linear(slot_pose_down)    # 7. Scendi alla posa calcolata (BASSO)
+        if not self.move_linear(slot_pose_down, "descend"):    # 7. Scendi alla posa calcolata (BASSO)
+            return interrupted()
         
-        self.grip(False)                    # 8. Apri (RILASCIO)
-        
-        print(f"   ⬆️ Risalgo a Z={slot_pose_up[2]:.4f}")
-        self.move_linear(slot_pose_up)      # 9. Torna su (ALTO)
+        # 8. Apri (RILASCIO) + 9. Torna su (ALTO)
+        print(f"   ⬆️ Rilascio e risalgo a Z={slot_pose_up[2]:.4f}")
+        if not self.open_while_moving(slot_pose_up, "retreat"):
+            return interrupted()
+
+        print("✅ Sequenza completata.\n")
+        self.telemetry.count("letters_placed")
+        self.occupied_slots.add(slot_key)
+        return True
+
+    # ---------- PAROLA INTERA ----------
+
+    def place_word(self, letters: str, slot_indexes: List[int] | None = None,
+                   compiled: bool | None = None) -> List[tuple]:
+        """
+        Posiziona tutte le lettere del robot (es. robot_letters di split_letters).
+        Lo slot di default di ogni lettera è la sua posizione nella parola.
+        L'ordine di esecuzione minimizza gli spostamenti a vuoto del TCP e, in
+        modalità compilata, l'intero piano viene inviato come un unico programma.
+        Se una presa fallisce il programma si ferma e si riparte da quella
+        lettera (fino a grasp_retries tentativi per lettera).
+        Ritorna la lista (lettera, slot) effettivamente posizionate, nell'ordine eseguito.
+        """
+        if slot_indexes is None:
+            slot_indexes = list(range(len(letters)))
+
+        # Validazione vettoriale: indici nella tabella delle pose (-1 = mancante)
+        letters = letters.upper()[:len(slot_indexes)]
+        slot_indexes = list(slot_indexes)[:len(letters)]
+        source_rows, slot_rows = self.pose_table.lookup(letters, slot_indexes)
+        for k in np.flatnonzero(source_rows < 0):
+            print(f"⚠️ Lettera {letters[k]} non trovata nei source: la salto.")
+        for k in np.flatnonzero((source_rows >= 0) & (slot_rows < 0)):
+            print(f"⚠️ Slot {slot_indexes[k]} non trovato: salto la lettera {letters[k]}.")
+        found = (source_rows >= 0) & (slot_rows >= 0)
+        usable = found.copy()
+        usable[found] = (self.pose_table.source_valid[source_rows[found]]
+                         & self.pose_table.slot_valid[slot_rows[found]])
+        for k in np.flatnonzero(found & ~usable):
+            print(f"⚠️ Posa non valida per {letters[k]} -> slot {slot_indexes[k]}: salto la lettera.")
+        valid = np.flatnonzero(usable)
+        if not len(valid):
+            print("⚠️ Nessuna lettera da posizionare.")
+            return []
+        jobs = [(letters[k], slot_indexes[k]) for k in valid]
+        source_rows, slot_rows = source_rows[valid], slot_rows[valid]
+        rows = list(zip(source_rows.tolist(), slot_rows.tolist()))
+
+        sources = self.pose_table.source_up[source_rows]
+        slots = self.pose_table.slot_up[slot_rows]
+        start = self._current_tcp()
+        # Distanze dei lavori dalle matrici della tabella delle pose
+        costs = self.pose_table.job_costs(source_rows, slot_rows, start)
+        order = order_jobs(sources, slots, start, costs)
+        plan = [jobs[i] for i in order]
+
+        word_order = travel_length(list(range(len(jobs))), sources, slots, start, costs)
+        optimized = travel_length(order, sources, slots, start, costs)
+        transfer = travel_time(order, sources, slots, start, self.motion_model)
+        print(f"🗺️ Piano parola: {' '.join(f'{l}->{s}' for l, s in plan)} "
+              f"(percorso {optimized:.3f} m invece di {word_order:.3f} m, ~{transfer:.1f}s di transito)")
 
-        print("✅ Sequenza completata.\n")
\ No newline at end of file
+        # Tempo stimato dell'intera parola, annunciato prima di partire (e
+        # controllo che ogni tragitto abbia una quota sicura)
+        try:
+            eta = self.estimate_time(self._plan_commands([rows[i] for i in order], start))
+        except TransitBlocked as e:
+            print(f"❌ Transito impossibile ({e}): parola non posizionata.\n")
+            return []
+        if eta is not None:
+            print(f"⏳ Tempo stimato per la parola: {eta:.1f}s")
+
+        if not (compiled if compiled is not None else self.compile_sequences):
+            return [(letter, slot_index) for letter, slot_index in plan
+                    if self.place_letter_in_slot(letter, slot_index, compiled=False)]
+
+        placed: List[tuple] = []
+        remaining = list(order)
+        failures = 0
+        while remaining:
+            try:
+                commands = self._plan_commands([rows[i] for i in remaining], self._current_tcp())
+            except TransitBlocked as e:
+                print(f"❌ Transito impossibile ({e}): parola interrotta.\n")
+                return placed
+            if self.run_sequence(commands, label=f"parola '{letters}'"):
+                placed += [jobs[i] for i in remaining]
+                self.occupied_slots.update(self.pose_table.slot_keys[rows[i][1]] for i in remaining)
+                self.telemetry.count("letters_placed", len(remaining))
+                break
+            if self.failed_grasp is None:
+                print("⚠️ Parola interrotta.\n")
+                return placed
+            # Le lettere prima di quella mancata sono già negli slot
+            failed = self.failed_grasp - 1
+            placed += [jobs[i] for i in remaining[:failed]]
+            self.occupied_slots.update(self.pose_table.slot_keys[rows[i][1]] for i in remaining[:failed])
+            self.telemetry.count("letters_placed", failed)
+            remaining = remaining[failed:]
+            letter = jobs[remaining[0]][0]
+            failures = failures + 1 if failed == 0 else 1
+            if failures > self.grasp_retries:
+                print(f"❌ Lettera '{letter}' non presa: la salto.")
+                remaining.pop(0)
+                failures = 0
+            else:
+                print(f"🔁 Riprovo dalla lettera '{letter}' ({failures}/{self.grasp_retries})")
+        print("✅ Parola completata.\n")
+        return placed
@@ -0,0 +1,319 @@
+# src/rtde_client.py
+
+import asyncio
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from ur_state import RobotState
+
+# Client RTDE (Real-Time Data Exchange, porta 30004), protocollo versione 2.
+#
+# Si negozia una "ricetta" di output (elenco di variabili del controller) e il
+# controller invia un pacchetto dati a frequenza fissa (fino a 125 Hz sui CB3,
+# 500 Hz sugli e-Series). Ogni pacchetto diventa un campione {variabile: valore}
+# e uno snapshot RobotState, lo stesso usato da Robot per le attese.
+#
+# Pacchetto: uint16 dimensione (header incluso) + uint8 tipo + payload big-endian.
+
+RTDE_REQUEST_PROTOCOL_VERSION = 86        # 'V'
+RTDE_GET_URCONTROL_VERSION = 118          # 'v'
+RTDE_TEXT_MESSAGE = 77                    # 'M'
+RTDE_DATA_PACKAGE = 85                    # 'U'
+RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS = 79   # 'O'
+RTDE_CONTROL_PACKAGE_START = 83           # 'S'
+RTDE_CONTROL_PACKAGE_PAUSE = 80           # 'P'
+
+PROTOCOL_VERSION = 2
+HEADER = struct.Struct(">HB")
+
+# Tipi RTDE -> formato struct
+TYPE_FORMATS = {
+    "BOOL": "?", "UINT8": "B", "UINT32": "I", "UINT64": "Q", "INT32": "i",
+    "DOUBLE": "d", "VECTOR3D": "3d", "VECTOR6D": "6d",
+    "VECTOR6INT32": "6i", "VECTOR6UINT32": "6I",
+}
+
+# runtime_state
+RUNTIME_STATE_PLAYING = 2
+# safety_mode
+SAFETY_MODE_PROTECTIVE_STOP = 3
+SAFETY_MODE_SYSTEM_EMERGENCY_STOP = 6
+SAFETY_MODE_ROBOT_EMERGENCY_STOP = 7
+
+# Ricetta usata da Robot: giunti, TCP, stato del programma e registri di
+# fine sequenza / esito presa / apertura gripper (vedi commands.py)
+DEFAULT_RECIPE = [
+    "timestamp", "actual_q", "actual_qd", "actual_TCP_pose",
+    "runtime_state", "robot_mode", "safety_mode",
+    "output_int_register_0", "output_int_register_1", "output_int_register_2",
+]
+
+
+def pack_packet(packet_type: int, payload: bytes = b"") -> bytes:
+    return HEADER.pack(HEADER.size + len(payload), packet_type) + payload
+
+
+def data_struct(types: Sequence[str]) -> struct.Struct:
+    """Struct di un pacchetto dati: id ricetta + i campi nell'ordine della ricetta."""
+    return struct.Struct(">B" + "".join(TYPE_FORMATS[t] for t in types))
+
+
+def _register_index(name: str) -> Optional[int]:
+    prefix = "output_int_register_"
+    return int(name[len(prefix):]) if name.startswith(prefix) else None
+
+
+def to_robot_state(sample: Dict[str, object], sequence: int = 0) -> RobotState:
+    """Converte un campione RTDE nello snapshot usato dal resto del codice."""
+    safety_mode = sample.get("safety_mode", 1)
+    return RobotState(
+        received_at=sample["received_at"],
+        sequence=sequence,
+        program_running=sample.get("runtime_state") == RUNTIME_STATE_PLAYING,
+        protective_stopped=safety_mode == SAFETY_MODE_PROTECTIVE_STOP,
+        emergency_stopped=safety_mode in (SAFETY_MODE_SYSTEM_EMERGENCY_STOP,
+                                          SAFETY_MODE_ROBOT_EMERGENCY_STOP),
+        robot_mode=sample.get("robot_mode", -1),
+        q_actual=list(sample.get("actual_q", ())),
+        qd_actual=list(sample.get("actual_qd", ())),
+        tcp_pose=list(sample.get("actual_TCP_pose", ())),
+        output_int_registers={index: value for name, value in sample.items()
+                              if (index := _register_index(name)) is not None},
+    )
+
+
+class RTDEClient:
+    """
+    Sessione RTDE in sola lettura. Dopo connect() un thread riceve i pacchetti:
+    - latest / wait_for_update(): ultimo snapshot RobotState (come StateReader);
+    - stream() / astream(): tutti i campioni in ordine da quando si inizia a
+      iterare, con buffer limitato (se il consumatore è lento si perdono i più
+      vecchi, contati in `dropped`).
+    """
+
+    def __init__(self, host: str, port: int = 30004, frequency: float = 125.0,
+                 variables: Sequence[str] = DEFAULT_RECIPE, buffer_size: int = 256,
+                 connect_timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.frequency = frequency
+        self.variables = list(variables)
+        self.buffer_size = buffer_size
+        self.connect_timeout = connect_timeout
+        self.controller_version: Optional[tuple] = None
+        self.error: Optional[Exception] = None
+        self.dropped = 0
+
+        self.sock: Optional[socket.socket] = None
+        self._rx = bytearray()
+        self._data: Optional[struct.Struct] = None
+        self._fields: List[tuple] = []
+        self._recipe_id = 0
+        self._samples: deque = deque(maxlen=buffer_size)
+        # stream() attivi: senza nessuno i campioni non vengono accumulati
+        self._streams = 0
+        self._subscribers: List[tuple] = []
+        self._latest: Optional[RobotState] = None
+        self._sequence = 0
+        self._updated = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rtde-reader", daemon=True)
+
+    # ---------- SESSIONE ----------
+
+    def connect(self):
+        """Negozia protocollo e ricetta, avvia il flusso e il thread di lettura."""
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        self.sock.settimeout(self.connect_timeout)
+        try:
+            accepted, = self._request(RTDE_REQUEST_PROTOCOL_VERSION,
+                                      struct.pack(">H", PROTOCOL_VERSION), ">B")
+            if not accepted:
+                raise OSError(f"protocollo RTDE v{PROTOCOL_VERSION} non supportato")
+            self.controller_version = self._request(RTDE_GET_URCONTROL_VERSION, b"", ">IIII")
+            self._setup_outputs()
+            started, = self._request(RTDE_CONTROL_PACKAGE_START, b"", ">B")
+            if not started:
+                raise OSError("il controller ha rifiutato l'avvio del flusso RTDE")
+        except (OSError, ValueError):
+            self.sock.close()
+            self.sock = None
+            raise
+        self.sock.settimeout(1.0)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self.sock is not None:
+            try:
+                self.sock.sendall(pack_packet(RTDE_CONTROL_PACKAGE_PAUSE))
+            except OSError:
+                pass
+        if self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def _setup_outputs(self):
+        payload = struct.pack(">d", self.frequency) + ",".join(self.variables).encode("ascii")
+        self.sock.sendall(pack_packet(RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS, payload))
+        reply = self._read_reply(RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS)
+        self._recipe_id = reply[0]
+        types = reply[1:].decode("ascii").split(",")
+        missing = [name for name, t in zip(self.variables, types) if t == "NOT_FOUND"]
+        if missing:
+            raise ValueError(f"variabili RTDE non disponibili: {', '.join(missing)}")
+        self._data = data_struct(types)
+        # (nome, numero di valori) per ricomporre i vettori dal pacchetto
+        self._fields = [(name, int(TYPE_FORMATS[t][:-1] or 1)) for name, t in zip(self.variables, types)]
+
+    def _request(self, packet_type: int, payload: bytes, reply_format: str) -> tuple:
+        self.sock.sendall(pack_packet(packet_type, payload))
+        return struct.unpack_from(reply_format, self._read_reply(packet_type))
+
+    def _read_reply(self, packet_type: int) -> bytes:
+        """Attende la risposta di tipo `packet_type` (i messaggi di testo vengono saltati)."""
+        while True:
+            for reply_type, payload in self._packets():
+                if reply_type == packet_type:
+                    return payload
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise OSError("connessione RTDE chiusa dal controller")
+            self._rx += chunk
+
+    def _packets(self) -> Iterator[tuple]:
+        while len(self._rx) >= HEADER.size:
+            size, packet_type = HEADER.unpack_from(self._rx)
+            if size < HEADER.size:
+                raise OSError("flusso RTDE desincronizzato")
+            if len(self._rx) < size:
+                return
+            payload = bytes(self._rx[HEADER.size:size])
+            del self._rx[:size]
+            yield packet_type, payload
+
+    # ---------- LETTURA ----------
+
+    @property
+    def latest(self) -> Optional[RobotState]:
+        return self._latest
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+    @property
+    def alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def wait_for_update(self, after: int, timeout: float) -> Optional[RobotState]:
+        """Come StateReader.wait_for_update: uno snapshot con sequence > `after`."""
+        with self._updated:
+            self._updated.wait_for(
+                lambda: self._sequence > after or not self.alive, max(0.0, timeout))
+            return self._latest if self._sequence > after else None
+
+    def stream(self, timeout: Optional[float] = None) -> Iterator[Dict[str, object]]:
+        """
+        Genera i campioni nell'ordine di arrivo, a partire dal primo arrivato
+        dopo l'inizio dell'iterazione. Termina se per `timeout` secondi non
+        arriva nulla o se la sessione si chiude.
+        """
+        with self._updated:
+            if not self._streams:
+                # Campioni rimasti da uno stream precedente: sarebbero vecchi
+                self._samples.clear()
+            self._streams += 1
+        try:
+            while True:
+                with self._updated:
+                    if not self._updated.wait_for(lambda: self._samples or not self.alive, timeout):
+                        return
+                    if not self._samples:
+                        return
+                    sample = self._samples.popleft()
+                yield sample
+        finally:
+            with self._updated:
+                self._streams -= 1
+                if not self._streams:
+                    self._samples.clear()
+
+    async def astream(self) -> AsyncIterator[Dict[str, object]]:
+        """Versione asyncio di stream(): il thread di lettura consegna i campioni al loop."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.buffer_size)
+        subscriber = (loop, queue)
+        with self._updated:
+            self._subscribers.append(subscriber)
+        try:
+            while True:
+                sample = await queue.get()
+                if sample is None:
+                    return
+                yield sample
+        finally:
+            with self._updated:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+
+    def _offer(self, queue: asyncio.Queue, sample):
+        """Eseguito nel loop asyncio: se la coda è piena si scarta il campione più vecchio."""
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(sample)
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    chunk = self.sock.recv(65536)
+                except socket.timeout:
+                    continue
+                if not chunk:
+                    raise OSError("connessione RTDE chiusa dal controller")
+                self._rx += chunk
+                for packet_type, payload in self._packets():
+                    if packet_type == RTDE_DATA_PACKAGE and payload[0] == self._recipe_id:
+                        self._publish(payload)
+        except OSError as e:
+            if not self._stop.is_set():
+                self.error = e
+        finally:
+            with self._updated:
+                self._updated.notify_all()
+                self._deliver(None)
+
+    def _publish(self, payload: bytes):
+        values = self._data.unpack(payload)
+        sample: Dict[str, object] = {"received_at": time.monotonic()}
+        index = 1
+        for name, width in self._fields:
+            sample[name] = values[index] if width == 1 else values[index:index + width]
+            index += width
+        with self._updated:
+            self._sequence += 1
+            self._latest = to_robot_state(sample, self._sequence)
+            if self._streams:
+                if len(self._samples) == self._samples.maxlen:
+                    self.dropped += 1
+                self._samples.append(sample)
+            self._updated.notify_all()
+            self._deliver(sample)
+
+    def _deliver(self, sample):
+        """Consegna `sample` ai loop di astream() (con il lock preso); quelli già chiusi vengono tolti."""
+        for subscriber in list(self._subscribers):
+            loop, queue = subscriber
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, sample)
+            except RuntimeError:
+                # Loop chiuso senza aver chiuso il generatore astream()
+                self._subscribers.remove(subscriber)
@@ -0,0 +1,157 @@
+# src/sim_backend.py
+
+import math
+from typing import List, Optional
+
+from motion_model import GRIPPER_SETTLE, grip_time, trapezoid_time
+from urscript import ScriptCommand, ScriptProgram, parse_program
+
+
+class VirtualClock:
+    """Orologio virtuale: il tempo avanza solo quando lo dice il simulatore."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def advance(self, dt: float) -> float:
+        self.now += max(0.0, dt)
+        return self.now
+
+
+class SimulatedController:
+    """
+    Controller UR simulato con orologio virtuale.
+    Riceve gli stessi script che andrebbero al robot, stima quanto durerebbero
+    e fa avanzare il tempo virtuale invece di dormire.
+    """
+
+    # Modello dei tempi lato controller (s); movimenti e gripper: motion_model
+    PROGRAM_START = 0.02          # avvio di un programma già compilato
+    COMPILE_PER_KB = 0.004        # compilazione dello script ricevuto
+    GRIPPER_INIT = 0.8            # rg_wait_for_init + avvio thread OnRobot
+
+    def __init__(self, max_speed: float, max_acc: float,
+                 clock: Optional[VirtualClock] = None, verbose: bool = True):
+        self.max_speed = max_speed
+        self.max_acc = max_acc
+        self.clock = clock or VirtualClock()
+        self.verbose = verbose
+
+        # Stato simulato (None = sconosciuto finché non arriva il primo movimento)
+        self.tcp_pose: Optional[List[float]] = None
+        self.joints: Optional[List[float]] = None
+        self.gripper_width: Optional[float] = None
+        # Tempo residuo di un Grip non bloccante che procede durante i movimenti
+        self.gripper_busy = 0.0
+
+        self.stats = {"programs": 0, "moves": 0, "grips": 0, "bytes": 0}
+
+    @property
+    def now(self) -> float:
+        return self.clock.now
+
+    # ---------- ESECUZIONE ----------
+
+    def execute(self, script: str, label: str = "") -> float:
+        """Esegue (virtualmente) uno script e ritorna la durata stimata."""
+        program = parse_program(script)
+        duration = self.load_time(program)
+        previous, previous_time = None, 0.0
+        for command in program.commands:
+            command_duration = self.command_time(command)
+            command_duration -= self.blend_saving(previous, previous_time, command, command_duration)
+            duration += command_duration
+            previous, previous_time = command, command_duration
+
+        self.clock.advance(duration)
+        self.stats["programs"] += 1
+        self.stats["bytes"] += program.size_bytes
+
+        if self.verbose:
+            what = label or (script.strip().splitlines() or [""])[0]
+            print(f"(SIM t={self.clock.now:8.3f}s) {what} (+{duration:.3f}s)")
+        return duration
+
+    # ---------- MODELLO DEI TEMPI ----------
+
+    def load_time(self, program: ScriptProgram) -> float:
+        """Tempo che il controller impiega a compilare e avviare il programma."""
+        duration = self.PROGRAM_START + self.COMPILE_PER_KB * program.size_bytes / 1024.0
+        if program.needs_gripper_init:
+            duration += self.GRIPPER_INIT
+        return duration
+
+    def command_time(self, command: ScriptCommand) -> float:
+        """
+        Durata di un singolo comando; aggiorna lo stato simulato al suo target.
+        Un Grip non bloccante non occupa il programma: il suo tempo scorre in
+        parallelo ai comandi successivi e si paga solo il residuo alla barriera
+        (grip_wait) o al comando gripper seguente.
+        """
+        if command.kind == "grip":
+            self.stats["grips"] += 1
+            pending, self.gripper_busy = self.gripper_busy, 0.0
+            duration = self._grip_time(command)
+            if not command.blocking:
+                self.gripper_busy = duration
+                return pending
+            return pending + duration
+        if command.kind == "grip_wait":
+            pending, self.gripper_busy = self.gripper_busy, 0.0
+            return pending
+
+        if command.kind == "movel":
+            self.stats["moves"] += 1
+            duration = self._movel_time(command)
+        elif command.kind == "movej":
+            self.stats["moves"] += 1
+            duration = self._movej_time(command)
+        elif command.kind == "sleep":
+            duration = command.target[0]
+        else:
+            return 0.0
+        self.gripper_busy = max(0.0, self.gripper_busy - duration)
+        return duration
+
+    def blend_saving(self, previous: Optional[ScriptCommand], previous_time: float,
+                     command: ScriptCommand, command_time: float) -> float:
+        """
+        Tempo risparmiato quando il movimento precedente ha un raggio di raccordo:
+        il robot non si ferma sul waypoint, quindi si evitano una decelerazione e
+        un'accelerazione (al massimo metà del segmento più breve).
+        """
+        if previous is None or previous.r <= 0:
+            return 0.0
+        if previous.kind not in ("movel", "movej") or command.kind != previous.kind:
+            return 0.0
+        v = command.v or self.max_speed
+        a = command.a or self.max_acc
+        return min(v / a, 0.5 * min(previous_time, command_time))
+
+    def _movel_time(self, command: ScriptCommand) -> float:
+        target = command.target
+        if target is None:
+            return 0.0
+        start, self.tcp_pose = self.tcp_pose, list(target)
+        if start is None:
+            return 0.0
+        distance = math.dist(start[:3], target[:3])
+        return trapezoid_time(distance, command.v or self.max_speed, command.a or self.max_acc)
+
+    def _movej_time(self, command: ScriptCommand) -> float:
+        target = command.target
+        if target is None:
+            return 0.0
+        start, self.joints = self.joints, list(target)
+        if start is None:
+            return 0.0
+        # movej: tutti i giunti arrivano insieme, comanda il giunto con lo spostamento maggiore
+        delta = max(abs(t - s) for s, t in zip(start, target))
+        return trapezoid_time(delta, command.v or self.max_speed, command.a or self.max_acc)
+
+    def _grip_time(self, command: ScriptCommand) -> float:
+        width = command.target[0]
+        if width is None:
+            return GRIPPER_SETTLE
+        previous, self.gripper_width = self.gripper_width, width
+        return grip_time(width, previous)
@@ -0,0 +1,92 @@
+# src/sim_benchmark.py
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+
+from utils import load_config, load_words
+from game_logic import select_word, split_letters
+from robot_control import Robot
+
+# Esegue molte partite in modalità SIMULATA (orologio virtuale) per test di
+# regressione e throughput: select_word -> split_letters -> place_letter_in_slot.
+#
+# Uso (dalla root del progetto):
+#   python src/sim_benchmark.py --games 1000 --difficulty normal
+
+
+def run(games: int, difficulty: str, seed: int | None = None) -> dict:
+    config = load_config(os.path.join("data", "config.yaml"))
+    words = load_words(os.path.join("data", "words.json"))
+    rng_seed = seed if seed is not None else random.randrange(1 << 30)
+    random.seed(rng_seed)
+
+    robot = Robot(
+        robot_ip=None,
+        poses=config.get("poses", {}),
+        safety=config.get("safety", {}),
+        motion=config.get("motion", {}),
+        gripper=config.get("gripper", {}),
+        kinematics=config.get("kinematics", {}),
+        sim_verbose=False,
+    )
+
+    placed = failed = skipped = 0
+    wall_start = time.perf_counter()
+    # I print dei moduli di gioco/robot non servono qui: li scartiamo
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(games):
+            word = select_word(words)
+            robot_letters, _ = split_letters(word, difficulty)
+            # Nuova partita: tavolo libero
+            robot.occupied_slots.clear()
+            for slot_index, letter in enumerate(robot_letters):
+                if robot.pose_table.source(letter) is not None and robot.pose_table.slot(slot_index) is not None:
+                    if robot.place_letter_in_slot(letter, slot_index):
+                        placed += 1
+                    else:
+                        failed += 1
+                else:
+                    skipped += 1
+    wall = time.perf_counter() - wall_start
+
+    return {
+        "seed": rng_seed,
+        "games": games,
+        "placed": placed,
+        "failed": failed,
+        "skipped": skipped,
+        "sim_time": robot.sim_time,
+        "wall_time": wall,
+        **robot.sim.stats,
+        "gripper_skipped": robot.telemetry.counters["gripper_skipped"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WordBuddy in simulazione")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--difficulty", default="normal", choices=["easy", "normal", "hard"])
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    result = run(args.games, args.difficulty, args.seed)
+
+    print("--- Benchmark simulato ---")
+    print(f"Seed: {result['seed']}")
+    print(f"Partite: {result['games']}  lettere piazzate: {result['placed']}  "
+          f"non riuscite: {result['failed']}  saltate (pose mancanti): {result['skipped']}")
+    print(f"Programmi inviati: {result['programs']}  movimenti: {result['moves']}  "
+          f"prese: {result['grips']}  byte: {result['bytes']}")
+    print(f"Azionamenti gripper saltati (già nello stato richiesto): {result['gripper_skipped']}")
+    print(f"Tempo robot simulato: {result['sim_time']:.1f}s")
+    if result["placed"]:
+        print(f"Tempo medio per lettera: {result['sim_time'] / result['placed']:.2f}s")
+    print(f"Tempo reale: {result['wall_time']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
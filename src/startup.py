@@ -0,0 +1,147 @@
+# src/startup.py
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+import tts_module
+from game_logic import build_word_index
+from robot_control import Robot
+from table_grid import resolve_poses
+from telemetry import SessionTelemetry
+from utils import load_words
+from vision import open_camera
+
+# Avvio in parallelo di tutto quello che serve al gioco.
+#
+# Ogni risorsa lenta è un task asyncio (il lavoro bloccante gira in un thread
+# con asyncio.to_thread) lanciato subito, mentre la domanda sulla difficoltà
+# è già a schermo:
+#
+#   robot     connessione al controller (con i tentativi di connection.py)
+#   gripper   programma di servizio OnRobot (parte appena il robot è connesso)
+#   words     lettura del dataset e indice per lunghezza
+#   camera    apertura della camera e primo frame
+#   tts       inizializzazione del motore di sintesi vocale (nel suo thread)
+#
+# Il tempo prima di poter giocare è quello del task più lento, non la somma.
+# Chi ha bisogno di una risorsa la aspetta con `await startup.get(nome)`:
+#
+#   startup = Startup(config, words_path).start()
+#   difficulty = await asyncio.to_thread(input, "Difficoltà? ")
+#   words, index = await startup.get("words")
+#
+# robot e words sono indispensabili (un errore viene rilanciato); camera,
+# gripper e tts sono facoltativi: se falliscono si prosegue con None/False.
+
+REQUIRED = ("robot", "words")
+
+
+class Startup:
+    """Task di avvio concorrenti; i tempi di ciascuno finiscono nella telemetria (startup_<nome>)."""
+
+    def __init__(self, config: dict, words_path: str, telemetry: SessionTelemetry | None = None):
+        self.config = config
+        self.words_path = words_path
+        self.telemetry = telemetry or SessionTelemetry()
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.durations: Dict[str, float] = {}
+        self.started_at: float | None = None
+
+    def start(self) -> "Startup":
+        """Lancia tutti i task (va chiamata dentro il loop asyncio) e ritorna subito."""
+        self.started_at = time.monotonic()
+        self._spawn("robot", self._connect_robot)
+        self._spawn("gripper", self._init_gripper, after="robot")
+        self._spawn("words", self._load_words)
+        self._spawn("camera", lambda: asyncio.to_thread(open_camera, self.config.get("camera_id", 0)))
+        # Il motore nasce nel thread della sintesi, dove poi parlerà
+        self._spawn("tts", tts_module.warm_up_async)
+        return self
+
+    def _spawn(self, name: str, job: Callable[[], Awaitable[Any]], after: str | None = None):
+        self.tasks[name] = asyncio.create_task(self._timed(name, job, after), name=f"startup-{name}")
+
+    async def _timed(self, name: str, job: Callable[[], Awaitable[Any]], after: str | None):
+        if after is not None:
+            # Il tempo conta dalla fine del task da cui dipende
+            await self.tasks[after]
+        start = time.monotonic()
+        try:
+            return await job()
+        finally:
+            self.durations[name] = time.monotonic() - start
+            self.telemetry.add_time(f"startup_{name}", self.durations[name])
+
+    # ---------- TASK ----------
+
+    async def _connect_robot(self) -> Robot:
+        return await asyncio.to_thread(self._make_robot)
+
+    def _make_robot(self) -> Robot:
+        # Anche le pose (table frame, cache della griglia, controllo IK) si
+        # preparano nel thread
+        config = self.config
+        return Robot(
+            robot_ip=config.get("robot_ip"),
+            poses=resolve_poses(config),
+            safety=config.get("safety", {}),
+            motion=config.get("motion", {}),
+            gripper=config.get("gripper", {}),
+            state_stream=config.get("state_stream", {}),
+            kinematics=config.get("kinematics", {}),
+            connection=config.get("connection", {}),
+            telemetry=self.telemetry,
+        )
+
+    async def _init_gripper(self) -> bool:
+        robot = self.tasks["robot"].result()
+        if not robot.use_gripper_service:
+            return False
+        return await asyncio.to_thread(robot.start_gripper_service)
+
+    async def _load_words(self) -> tuple:
+        words = await asyncio.to_thread(load_words, self.words_path)
+        return words, build_word_index(words)
+
+    # ---------- ATTESA ----------
+
+    async def get(self, name: str):
+        """Risultato del task `name` (lo aspetta se non è finito)."""
+        try:
+            return await self.tasks[name]
+        except Exception as e:
+            if name in REQUIRED:
+                raise
+            print(f"⚠️ Avvio '{name}' fallito: {e}")
+            return None
+
+    async def ready(self) -> Dict[str, Any]:
+        """Aspetta tutti i task; stampa il tempo di ognuno e quello totale."""
+        results = {name: await self.get(name) for name in self.tasks}
+        total = time.monotonic() - self.started_at
+        self.telemetry.add_time("startup_ready", total)
+        parts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.durations.items())
+        print(f"⏱️ Avvio completato in {total:.2f}s ({parts}; "
+              f"in sequenza {sum(self.durations.values()):.2f}s)")
+        return results
+
+    async def close(self):
+        """
+        Uscita senza giocare (es. avvio fallito): aspetta i task ancora in corso
+        (il lavoro nei thread non si può interrompere) e chiude quello che è partito.
+        """
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+        closers = {
+            "robot": lambda robot: robot.close(),
+            "camera": lambda camera: camera.release() if camera is not None else None,
+            "tts": lambda ok: tts_module.shutdown() if ok else None,
+        }
+        for name, close in closers.items():
+            task = self.tasks.get(name)
+            if task is None or task.cancelled() or task.exception() is not None:
+                continue
+            try:
+                await asyncio.to_thread(close, task.result())
+            except Exception as e:
+                print(f"⚠️ Chiusura '{name}' non riuscita: {e}")
@@ -0,0 +1,189 @@
+# src/table_grid.py
+
+import argparse
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from kinematics import rotvec_to_matrix
+from utils import ensure_folders, load_config
+
+# Pose degli slot (e, se configurato, del magazzino delle lettere) calcolate
+# dalla griglia invece che insegnate una per una in free-drive.
+#
+# Serve una sola posa misurata, il "table frame": il TCP all'altezza di presa
+# sul centro del marker ArUco del tavolo, con la pinza allineata alla griglia.
+# Gli assi x/y del TCP (proiettati sul piano orizzontale) sono colonne e righe
+# della griglia, l'orientamento della pinza è lo stesso per tutte le celle.
+#
+#   slot k = riga k // cols, colonna k % cols (ordine per righe)
+#   posa ALTA = centro cella all'altezza di presa, sollevata di -z_pick_offset
+#
+# Il risultato è salvato in data/calibration/grid_poses.json insieme ai
+# parametri che lo hanno generato: finché frame e griglia non cambiano si
+# rilegge la cache.
+
+CALIBRATION_DIR = os.path.join("data", "calibration")
+TABLE_FRAME_FILE = "table_frame.json"
+GRID_POSES_FILE = "grid_poses.json"
+
+
+def grid_offsets(rows: int, cols: int, cell_size: float, origin: Sequence[float]) -> np.ndarray:
+    """Centri delle celle (K×2, metri) nel piano del tavolo, ordinati per righe."""
+    r, c = np.divmod(np.arange(rows * cols), cols)
+    return np.asarray(origin, dtype=float) + cell_size * np.stack((c, r), axis=1)
+
+
+def frame_poses(frame: Sequence[float], offsets: np.ndarray, lift: float) -> np.ndarray:
+    """
+    Pose TCP (K×6) spostate di `offsets` lungo gli assi x/y del frame
+    (proiettati sul piano orizzontale) e sollevate di `lift` in z base.
+    """
+    frame = np.asarray(frame, dtype=float)
+    axes = rotvec_to_matrix(frame[3:6])[:, :2].T.copy()   # assi x e y del TCP
+    axes[:, 2] = 0.0
+    axes /= np.linalg.norm(axes, axis=1, keepdims=True)
+    poses = np.tile(frame, (len(offsets), 1))
+    poses[:, :3] += np.asarray(offsets, dtype=float).reshape(-1, 2) @ axes
+    poses[:, 2] += lift
+    return poses
+
+
+def load_table_frame(config: dict, calib_dir: str = CALIBRATION_DIR) -> Optional[List[float]]:
+    """Frame misurato (calibration/table_frame.json), altrimenti grid.table_frame del config."""
+    path = os.path.join(calib_dir, TABLE_FRAME_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return list(json.load(f)["table_frame"])
+    frame = (config.get("grid") or {}).get("table_frame")
+    return list(frame) if frame else None
+
+
+def save_table_frame(pose: Sequence[float], calib_dir: str = CALIBRATION_DIR) -> str:
+    ensure_folders([calib_dir])
+    path = os.path.join(calib_dir, TABLE_FRAME_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"table_frame": [round(float(v), 6) for v in pose]}, f, indent=2)
+    return path
+
+
+def _grid_params(config: dict, frame: Sequence[float]) -> dict:
+    """Tutto ciò da cui dipendono le pose generate (chiave della cache)."""
+    grid = config.get("grid") or {}
+    cell = grid.get("cell_size_mm", 50) / 1000.0
+    # Di default lo slot "0" è la prima cella oltre il bordo del marker, lungo x
+    marker = (config.get("vision") or {}).get("aruco_size_mm", 40) / 1000.0
+    origin = [v / 1000.0 for v in grid.get("slot_origin_mm", [])] or [marker / 2 + cell / 2, 0.0]
+    magazine = grid.get("magazine") or {}
+    return {
+        "frame": [float(v) for v in frame],
+        "cell_size": cell,
+        "rows": int(grid.get("rows", 1)),
+        "cols": int(grid.get("cols", 1)),
+        "slot_origin": origin,
+        "lift": -float((config.get("safety") or {}).get("z_pick_offset", -0.05)),
+        "magazine": {
+            "letters": str(magazine.get("letters", "")).upper(),
+            "cols": int(magazine.get("cols", 1)),
+            "origin": [v / 1000.0 for v in magazine.get("origin_mm", [0.0, 0.0])],
+        } if magazine else None,
+    }
+
+
+def build_grid_poses(params: dict) -> Dict[str, Dict[str, List[float]]]:
+    """Pose ALTE degli slot (e delle sorgenti del magazzino) dai parametri della griglia."""
+    offsets = grid_offsets(params["rows"], params["cols"], params["cell_size"], params["slot_origin"])
+    slots = frame_poses(params["frame"], offsets, params["lift"])
+    result = {"slots": {str(k): [round(v, 6) for v in pose] for k, pose in enumerate(slots.tolist())}}
+
+    magazine = params.get("magazine")
+    if magazine and magazine["letters"]:
+        letters = magazine["letters"]
+        cols = magazine["cols"]
+        rows = -(-len(letters) // cols)
+        offsets = grid_offsets(rows, cols, params["cell_size"], magazine["origin"])[:len(letters)]
+        sources = frame_poses(params["frame"], offsets, params["lift"])
+        result["letter_sources"] = {
+            letter: [round(v, 6) for v in pose] for letter, pose in zip(letters, sources.tolist())}
+    return result
+
+
+def load_grid_poses(config: dict, calib_dir: str = CALIBRATION_DIR) -> Optional[Dict[str, Dict[str, List[float]]]]:
+    """
+    Pose generate dalla griglia, dalla cache se i parametri non sono cambiati.
+    None se non c'è un table frame misurato.
+    """
+    frame = load_table_frame(config, calib_dir)
+    if frame is None:
+        return None
+    params = _grid_params(config, frame)
+    path = os.path.join(calib_dir, GRID_POSES_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("params") == params:
+            return cached["poses"]
+
+    poses = build_grid_poses(params)
+    ensure_folders([calib_dir])
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"params": params, "poses": poses}, f, indent=2)
+    print(f"📐 Pose della griglia rigenerate → {path}")
+    return poses
+
+
+def resolve_poses(config: dict, calib_dir: str = CALIBRATION_DIR) -> dict:
+    """
+    config["poses"] con slot (e sorgenti del magazzino) sostituiti da quelli
+    generati, se grid.generate_slots è attivo e il table frame è noto.
+    """
+    poses = dict(config.get("poses") or {})
+    if not (config.get("grid") or {}).get("generate_slots", False):
+        return poses
+    generated = load_grid_poses(config, calib_dir)
+    if generated is None:
+        print("⚠️ Nessun table frame misurato: uso gli slot del config.")
+        return poses
+    poses["slots"] = generated["slots"]
+    if "letter_sources" in generated:
+        poses["letter_sources"] = {**(poses.get("letter_sources") or {}), **generated["letter_sources"]}
+    print(f"📐 {len(generated['slots'])} slot dalla griglia"
+          + (f", {len(generated['letter_sources'])} sorgenti dal magazzino" if "letter_sources" in generated else ""))
+    return poses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera le pose degli slot dalla griglia del tavolo")
+    parser.add_argument("--measure", action="store_true",
+                        help="legge via RTDE la posa TCP attuale (pinza sul marker) e la salva come table frame")
+    args = parser.parse_args()
+
+    config = load_config(os.path.join("data", "config.yaml"))
+    if args.measure:
+        from rtde_client import RTDEClient
+        rtde = RTDEClient(config.get("robot_ip"), (config.get("state_stream") or {}).get("rtde_port", 30004))
+        rtde.connect()
+        try:
+            rtde.wait_for_update(0, 2.0)
+            state = rtde.latest
+        finally:
+            rtde.close()
+        if state is None:
+            print("❌ Nessuno stato RTDE ricevuto.")
+            return
+        print(f"✅ Table frame salvato in {save_table_frame(state.tcp_pose)}")
+
+    poses = load_grid_poses(config)
+    if poses is None:
+        print("⚠️ Nessun table frame: usa --measure o imposta grid.table_frame nel config.")
+        return
+    for group, entries in poses.items():
+        print(f"{group}:")
+        for key, pose in entries.items():
+            print(f'  "{key}": {pose}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# src/telemetry.py
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict
+
+# Telemetria di sessione: contatori e tempi cumulati di quello che fa il robot
+# (programmi inviati, byte, azionamenti del gripper, quelli saltati perché
+# superflui, prese fallite, ...). Robot ne tiene un'istanza; main e
+# sim_benchmark la stampano a fine sessione.
+
+
+class SessionTelemetry:
+    """Contatori e durate cumulate di una sessione."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.counters: Counter = Counter()
+        self.timings: Dict[str, float] = {}
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def add_time(self, name: str, seconds: float):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    @contextmanager
+    def timed(self, name: str):
+        """with telemetry.timed("nome"): ... somma la durata del blocco a `name`."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.monotonic() - start)
+
+    def snapshot(self) -> dict:
+        """Copia dei valori attuali: contatori, tempi (s) e durata della sessione."""
+        return {
+            "elapsed": time.monotonic() - self.started_at,
+            **dict(self.counters),
+            **{f"{name}_s": seconds for name, seconds in self.timings.items()},
+        }
+
+    def report(self) -> str:
+        lines = [f"📊 Telemetria sessione ({time.monotonic() - self.started_at:.1f}s)"]
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"   {name}: {value}")
+        for name, seconds in sorted(self.timings.items()):
+            lines.append(f"   {name}: {seconds:.2f}s")
+        return "\n".join(lines)
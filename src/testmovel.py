@@ -1,76 +1,107 @@
-import socket
 import time
 
+from connection import ConnectionLost, get_pool
+from ur_state import StateReader
+
 # --- CONFIGURAZIONE ---
 ROBOT_IP = "10.10.73.237"  # Metti il tuo IP
 PORT = 30002               # Porta standard per i comandi
+RTDE_PORT = 30004          # Porta RTDE per leggere lo stato (TCP, programma in esecuzione)
+
+# Connessioni persistenti condivise (riaperte da sole se cadono)
+pool = get_pool(ROBOT_IP, {"primary": PORT, "rtde": RTDE_PORT})
+# Il flusso di stato della 30002 va letto, altrimenti il buffer si riempie
+pool.primary.on_connect(lambda sock: StateReader(sock).start())
 
 def invia_comando(script_command):
-    """Funzione base per inviare testo al robot via socket"""
+    """Funzione base per inviare testo al robot sulla connessione persistente"""
+    # Aggiungi il newline necessario alla fine
+    if not script_command.endswith('\n'):
+        script_command += '\n'
     try:
-        # Crea il socket
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.settimeout(2)
-        s.connect((ROBOT_IP, PORT))
-        
-        # Aggiungi il newline necessario alla fine
-        if not script_command.endswith('\n'):
-            script_command += '\n'
-            
-        # Invia codificato in utf-8
-        s.sendall(script_command.encode('utf-8'))
-        s.close()
+        # Invia codificato in utf-8 (se la connessione è caduta viene riaperta e il comando reinviato)
+        pool.primary.sendall(script_command.encode('utf-8'))
         print("-> Comando inviato.")
-    except Exception as e:
+        return True
+    except ConnectionLost as e:
         print(f"ERRORE DI CONNESSIONE: {e}")
+        return False
+
+def attendi_fine_movimento(rtde, target, timeout=10.0, tolleranza=0.001):
+    """
+    Segue il flusso RTDE finché il programma non termina (runtime_state torna
+    fermo dopo essere partito) o il TCP arriva sul target.
+    """
+    partito = False
+    scadenza = time.monotonic() + timeout
+    for campione in rtde.stream(timeout=timeout):
+        if time.monotonic() > scadenza:
+            break
+        tcp = campione["actual_TCP_pose"]
+        arrivato = all(abs(tcp[i] - target[i]) < tolleranza for i in range(3))
+        in_esecuzione = campione["runtime_state"] == 2
+        partito = partito or in_esecuzione
+        if arrivato and not in_esecuzione:
+            print(f"-> Arrivato: Z = {tcp[2]:.4f}")
+            return True
+        if partito and not in_esecuzione:
+            print(f"-> Programma terminato lontano dal target (Z = {tcp[2]:.4f})")
+            return False
+    print("-> Timeout: nessuna conferma dal robot.")
+    return False
 
-def muovi_relativo_cartesiano(dx_m, dy_m, dz_m, acc=0.5, vel=0.25):
+def muovi_relativo_cartesiano(rtde, dx_m, dy_m, dz_m, acc=0.5, vel=0.25):
     """
-    Sposta il robot rispetto alla BASE (X, Y, Z del mondo), 
+    Sposta il robot rispetto alla BASE (X, Y, Z del mondo),
     mantenendo l'orientamento attuale della pinza.
     dx_m, dy_m, dz_m sono in METRI.
     """
     print(f"Sposto di X={dx_m}, Y={dy_m}, Z={dz_m}...")
 
-    # Qui costruiamo lo script UR dinamicamente usando le f-strings di Python.
-    # get_actual_tcp_pose() restituisce p[x,y,z,rx,ry,rz] rispetto alla BASE.
-    ur_script = f"""
-    def move_rel_python():
-        # 1. Leggi dove sono ora
-        p_now = get_actual_tcp_pose()
-        
-        # 2. Modifico solo le coordinate cartesiane (Indici 0, 1, 2)
-        # Lascio invariati rx, ry, rz (Indici 3, 4, 5) per non far ruotare la pinza
-        p_target = p_now
-        p_target[0] = p_now[0] + {dx_m}
-        p_target[1] = p_now[1] + {dy_m}
-        p_target[2] = p_now[2] + {dz_m}
+    # 1. Leggi dove sono ora (posa TCP p[x,y,z,rx,ry,rz] rispetto alla BASE, via RTDE)
+    rtde = pool.rtde() or rtde   # sessione riaperta se è caduta
+    stato = rtde.latest
+    if stato is None:
+        print("ERRORE: nessuno stato RTDE ricevuto.")
+        return False
+    p_now = stato.tcp_pose
 
-        # 3. Messaggio di debug sul Log del robot
-        textmsg("Python Target Z:", p_target[2])
+    # 2. Modifico solo le coordinate cartesiane (Indici 0, 1, 2)
+    # Lascio invariati rx, ry, rz (Indici 3, 4, 5) per non far ruotare la pinza
+    p_target = list(p_now)
+    p_target[0] += dx_m
+    p_target[1] += dy_m
+    p_target[2] += dz_m
+    print(f"Python Target Z: {p_target[2]:.4f}")
 
-        # 4. Eseguo il movimento lineare
-        movel(p_target, a={acc}, v={vel})
-    end
-    move_rel_python()
-    """
-    
-    invia_comando(ur_script)
+    # 3. Eseguo il movimento lineare verso la posa assoluta
+    pose = ", ".join(f"{v:.5f}" for v in p_target)
+    if not invia_comando(f"movel(p[{pose}], a={acc}, v={vel})"):
+        return False
+
+    # 4. Attendo la fine leggendo lo stato (niente sleep "a occhio")
+    return attendi_fine_movimento(rtde, p_target)
 
 # --- ESECUZIONE DEL TEST ---
 if __name__ == "__main__":
     print("--- TEST MOVEL SENZA LIBRERIE ---")
     print("Assicurati che il robot sia in REMOTE e non in Stop.")
-    
-    # 1. Test movimento verso l'ALTO (Z positivo)
-    input("Premi INVIO per salire di 5 cm (Z+0.05)...")
-    muovi_relativo_cartesiano(0.0, 0.0, 0.05) 
 
-    # Attesa per far finire il movimento (poiché la socket non aspetta da sola)
-    time.sleep(3.0)
+    rtde = pool.rtde()
+    if rtde is None or not pool.primary.connect():
+        raise SystemExit(f"Robot {ROBOT_IP} non raggiungibile.")
+    # aspetta il primo campione
+    rtde.wait_for_update(0, 2.0)
+
+    try:
+        # 1. Test movimento verso l'ALTO (Z positivo)
+        input("Premi INVIO per salire di 5 cm (Z+0.05)...")
+        muovi_relativo_cartesiano(rtde, 0.0, 0.0, 0.05)
+
+        # 2. Test movimento verso il BASSO (Z negativo)
+        input("Premi INVIO per scendere di 5 cm (Z-0.05)...")
+        muovi_relativo_cartesiano(rtde, 0.0, 0.0, -0.05)
+    finally:
+        pool.close()
 
-    # 2. Test movimento verso il BASSO (Z negativo)
-    input("Premi INVIO per scendere di 5 cm (Z-0.05)...")
-    muovi_relativo_cartesiano(0.0, 0.0, -0.05)
-    
-    print("Test finito.")
\ No newline at end of file
+    print("Test finito.")
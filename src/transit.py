@@ -0,0 +1,80 @@
+# src/transit.py
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# Pianificazione del tragitto tra due pose ALTE (sorgente -> slot, slot ->
+# sorgente successiva).
+#
+# Il tratto diretto va bene finché non passa sopra a tessere: quelle del
+# magazzino e quelle già negli slot occupati. Per ogni ostacolo il TCP deve
+# stare almeno `clearance` sopra la sua posa alta (tessera trasportata / dita
+# della pinza che sporgono sotto il TCP). Se il tratto diretto è troppo basso
+# sopra un ostacolo si sale alla quota minima che li libera tutti con due
+# via-point raccordati: sopra la partenza e sopra l'arrivo. Se quella quota è
+# oltre safe_height il tragitto non si può fare: TransitBlocked.
+
+
+class TransitBlocked(ValueError):
+    """Per liberare gli ostacoli servirebbe salire oltre safe_height."""
+
+
+def conflicts(start: Sequence[float], end: Sequence[float], obstacles: np.ndarray,
+              radius: float, clearance: float) -> np.ndarray:
+    """
+    Maschera (K,) degli ostacoli (pose alte K×6) che il tratto diretto
+    start -> end sfiora in pianta (entro `radius`) a una quota inferiore a
+    quella dell'ostacolo + `clearance`. Le tessere sotto gli estremi non
+    contano: la posa alta insegnata le libera già (es. lo slot appena riempito).
+    """
+    obstacles = np.asarray(obstacles, dtype=float).reshape(-1, 6)
+    if not len(obstacles):
+        return np.zeros(0, dtype=bool)
+    a = np.asarray(start, dtype=float)[:3]
+    b = np.asarray(end, dtype=float)[:3]
+    ab = b[:2] - a[:2]
+    length2 = float(ab @ ab)
+    # Punto del tratto (in pianta) più vicino a ogni ostacolo
+    t = np.zeros(len(obstacles)) if length2 == 0.0 else \
+        np.clip((obstacles[:, :2] - a[:2]) @ ab / length2, 0.0, 1.0)
+    closest = a[:2] + t[:, None] * ab
+    near = np.linalg.norm(obstacles[:, :2] - closest, axis=1) < radius
+    for point in (a, b):
+        near &= np.linalg.norm(obstacles[:, :2] - point[:2], axis=1) >= radius
+    z_line = a[2] + t * (b[2] - a[2])
+    return near & (z_line < obstacles[:, 2] + clearance)
+
+
+def transit_height(start: Sequence[float], end: Sequence[float], obstacles: np.ndarray,
+                   radius: float, clearance: float, safe_height: float) -> Optional[float]:
+    """
+    Quota di transito minima per passare sopra gli ostacoli incrociati.
+    None se il tratto diretto è già libero; TransitBlocked se la quota
+    necessaria supera safe_height.
+    """
+    obstacles = np.asarray(obstacles, dtype=float).reshape(-1, 6)
+    crossed = conflicts(start, end, obstacles, radius, clearance)
+    if not crossed.any():
+        return None
+    needed = float(obstacles[crossed, 2].max()) + clearance
+    if needed > safe_height:
+        raise TransitBlocked(f"servirebbe z={needed:.3f} m, oltre safe_height={safe_height:.3f} m")
+    return min(max(needed, start[2], end[2]), safe_height)
+
+
+def plan_transit(start: Sequence[float], end: Sequence[float], obstacles: np.ndarray,
+                 radius: float, clearance: float, safe_height: float) -> List[List[float]]:
+    """
+    Via-point da percorrere tra start ed end (esclusi); lista vuota = tratto
+    diretto. TransitBlocked se non c'è una quota sicura.
+    """
+    z = transit_height(start, end, obstacles, radius, clearance, safe_height)
+    if z is None:
+        return []
+    via = []
+    for pose in (start, end):
+        lifted = list(pose)
+        lifted[2] = z
+        via.append(lifted)
+    return via
@@ -0,0 +1,89 @@
+# src/tts_module.py
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Sintesi vocale con pyttsx3 (se installato), altrimenti solo testo a schermo.
+# say() blocca finché la frase non è finita; say_async() la esegue in un
+# thread così il loop del gioco può sovrapporla ai movimenti del robot.
+#
+# Il motore va creato e usato sempre dallo stesso thread (SAPI5 su Windows è
+# legato al thread COM che l'ha inizializzato): warm-up, frasi e stop girano
+# tutti nell'unico worker di _executor, che le esegue anche una alla volta.
+
+try:
+    import pyttsx3
+except ImportError:
+    pyttsx3 = None
+
+_engine = None
+_tts_thread = threading.local()
+
+
+def _mark_thread():
+    _tts_thread.active = True
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts", initializer=_mark_thread)
+
+
+def _on_tts_thread(fn, *args):
+    """Esegue fn nel thread della sintesi e ne ritorna il risultato (blocca)."""
+    if getattr(_tts_thread, "active", False):
+        return fn(*args)
+    return _executor.submit(fn, *args).result()
+
+
+def _get_engine():
+    global _engine
+    if _engine is None and pyttsx3 is not None:
+        _engine = pyttsx3.init()
+        _engine.setProperty("rate", 180)  # velocità di parlato
+    return _engine
+
+
+def _speak(text: str):
+    engine = _get_engine()
+    if engine is None:
+        return
+    engine.say(text)
+    engine.runAndWait()
+
+
+def _stop():
+    global _engine
+    if _engine is not None:
+        _engine.stop()
+        _engine = None
+
+
+def say(text: str):
+    """Pronuncia `text` (e lo stampa)."""
+    print(f"🎙️ {text}")
+    _on_tts_thread(_speak, text)
+
+
+def warm_up() -> bool:
+    """
+    Inizializza il motore (driver e voci caricati) senza dire nulla, così la
+    prima frase non aspetta pyttsx3.init(). False se la sintesi non è disponibile.
+    """
+    return _on_tts_thread(_get_engine) is not None
+
+
+def shutdown():
+    """Ferma il motore di sintesi (se era stato avviato)."""
+    _on_tts_thread(_stop)
+
+
+async def say_async(text: str):
+    """Versione asyncio di say(): da usare in asyncio.gather con il robot."""
+    print(f"🎙️ {text}")
+    await asyncio.wrap_future(_executor.submit(_speak, text))
+
+
+async def warm_up_async() -> bool:
+    """Versione asyncio di warm_up(), senza occupare un thread del loop in attesa."""
+    engine = await asyncio.wrap_future(_executor.submit(_get_engine))
+    return engine is not None
@@ -0,0 +1,221 @@
+# src/ur_realtime.py
+
+import socket
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from ur_state import (
+    HEADER, PKG_CARTESIAN_INFO, PKG_JOINT_DATA, PKG_ROBOT_MODE, PROGRAM_STATE_PLAYING,
+    REALTIME_LAYOUT,
+)
+
+# Decodifica "a costo zero" dello stato del robot con dtype strutturati NumPy.
+#
+# np.frombuffer crea una vista tipizzata direttamente sui byte ricevuti (nessun
+# oggetto Python per campo): i campi che ci interessano vengono poi copiati in
+# blocco in un buffer circolare a layout fisso, che conserva la storia recente.
+# Alla frequenza dell'interfaccia realtime (125 Hz) il costo per pacchetto è di
+# pochi microsecondi.
+
+# Sotto-pacchetti del messaggio Robot State (stessi campi degli Struct di ur_state)
+ROBOT_MODE_DTYPE = np.dtype([
+    ("timestamp", ">u8"), ("real_robot_connected", "?"), ("real_robot_enabled", "?"),
+    ("power_on", "?"), ("emergency_stopped", "?"), ("protective_stopped", "?"),
+    ("program_running", "?"), ("program_paused", "?"), ("robot_mode", "u1"),
+    ("control_mode", "u1"), ("target_speed_fraction", ">f8"), ("speed_scaling", ">f8"),
+    ("target_speed_fraction_limit", ">f8"),
+])
+JOINT_DTYPE = np.dtype([
+    ("q_actual", ">f8"), ("q_target", ">f8"), ("qd_actual", ">f8"), ("i_actual", ">f4"),
+    ("v_actual", ">f4"), ("t_motor", ">f4"), ("t_micro", ">f4"), ("joint_mode", "u1"),
+])
+CARTESIAN_DTYPE = np.dtype([("tcp_pose", ">f8", (6,))])
+
+# Pacchetto realtime (porta 30003): int32 lunghezza + double (vedi REALTIME_LAYOUT)
+REALTIME_DTYPE = np.dtype(
+    [("length", ">i4")]
+    + [(name, ">f8", (count,)) if count > 1 else (name, ">f8") for name, count in REALTIME_LAYOUT]
+)
+
+# Una riga della storia: layout nativo, comune alle due sorgenti
+HISTORY_DTYPE = np.dtype([
+    ("received_at", "f8"),        # time.monotonic() sul PC
+    ("controller_time", "f8"),    # tempo del controller (s)
+    ("q", "f8", (6,)),
+    ("qd", "f8", (6,)),
+    ("tcp", "f8", (6,)),
+    ("tcp_speed", "f8", (6,)),
+    ("program_running", "?"),
+    ("robot_mode", "i2"),
+    ("safety_mode", "i2"),
+])
+
+
+def decode_realtime(frame) -> np.void:
+    """Vista strutturata (0-d) su un pacchetto realtime; i campi in coda delle versioni recenti sono ignorati."""
+    return np.frombuffer(frame, dtype=REALTIME_DTYPE, count=1)[0]
+
+
+def decode_robot_state(payload) -> dict:
+    """
+    Viste strutturate sui sotto-pacchetti di un Robot State (header escluso):
+    {"robot_mode": record, "joints": array(6), "cartesian": record}, solo quelli presenti.
+    """
+    packages = {}
+    offset = 0
+    while offset + HEADER.size <= len(payload):
+        size, pkg_type = HEADER.unpack_from(payload, offset)
+        if size <= 0:
+            break
+        body = offset + HEADER.size
+        available = size - HEADER.size
+        if pkg_type == PKG_ROBOT_MODE and available >= ROBOT_MODE_DTYPE.itemsize:
+            packages["robot_mode"] = np.frombuffer(payload, ROBOT_MODE_DTYPE, 1, body)[0]
+        elif pkg_type == PKG_JOINT_DATA and available >= 6 * JOINT_DTYPE.itemsize:
+            packages["joints"] = np.frombuffer(payload, JOINT_DTYPE, 6, body)
+        elif pkg_type == PKG_CARTESIAN_INFO and available >= CARTESIAN_DTYPE.itemsize:
+            packages["cartesian"] = np.frombuffer(payload, CARTESIAN_DTYPE, 1, body)[0]
+        offset += size
+    return packages
+
+
+class StateHistory:
+    """
+    Buffer circolare a dimensione fissa con gli ultimi stati del robot.
+    Scritto da un solo thread di lettura; le letture restituiscono copie.
+    """
+
+    def __init__(self, capacity: int = 1250):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=HISTORY_DTYPE)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def count(self) -> int:
+        """Numero totale di stati ricevuti (anche quelli già sovrascritti)."""
+        return self._count
+
+    def push_realtime(self, frame) -> None:
+        rt = decode_realtime(frame)
+        with self._lock:
+            row = self._data[self._count % self.capacity]
+            row["received_at"] = time.monotonic()
+            row["controller_time"] = rt["time"]
+            row["q"] = rt["q_actual"]
+            row["qd"] = rt["qd_actual"]
+            row["tcp"] = rt["tool_vector_actual"]
+            row["tcp_speed"] = rt["tcp_speed_actual"]
+            row["program_running"] = rt["program_state"] == PROGRAM_STATE_PLAYING
+            row["robot_mode"] = rt["robot_mode"]
+            row["safety_mode"] = rt["safety_mode"]
+            self._count += 1
+
+    def push_robot_state(self, payload) -> None:
+        packages = decode_robot_state(payload)
+        with self._lock:
+            # Le parti non presenti nel messaggio restano quelle dello stato precedente
+            index = self._count % self.capacity
+            if self._count:
+                self._data[index] = self._data[(self._count - 1) % self.capacity]
+            row = self._data[index]
+            row["received_at"] = time.monotonic()
+            mode = packages.get("robot_mode")
+            if mode is not None:
+                row["controller_time"] = mode["timestamp"] / 1e6
+                row["program_running"] = mode["program_running"]
+                row["robot_mode"] = mode["robot_mode"]
+            joints = packages.get("joints")
+            if joints is not None:
+                row["q"] = joints["q_actual"]
+                row["qd"] = joints["qd_actual"]
+            cartesian = packages.get("cartesian")
+            if cartesian is not None:
+                row["tcp"] = cartesian["tcp_pose"]
+            self._count += 1
+
+    def latest(self) -> Optional[np.void]:
+        with self._lock:
+            if not self._count:
+                return None
+            return self._data[(self._count - 1) % self.capacity].copy()
+
+    def last(self, n: int) -> np.ndarray:
+        """Gli ultimi `n` stati in ordine cronologico (copia)."""
+        with self._lock:
+            n = min(n, len(self))
+            end = self._count % self.capacity
+            if n <= end:
+                return self._data[end - n:end].copy()
+            return np.concatenate((self._data[self.capacity - (n - end):], self._data[:end]))
+
+    def since(self, seconds: float) -> np.ndarray:
+        """Gli stati ricevuti negli ultimi `seconds` secondi (copia)."""
+        rows = self.last(len(self))
+        return rows[rows["received_at"] >= time.monotonic() - seconds]
+
+
+class RealtimeReader:
+    """Thread che legge i pacchetti a 125 Hz della porta 30003 e li mette in una StateHistory."""
+
+    BUFFER_SIZE = 65536
+
+    def __init__(self, host: str, history: StateHistory, port: int = 30003,
+                 connect_timeout: float = 2.0):
+        self.history = history
+        self.error: Optional[Exception] = None
+        self.sock = socket.create_connection((host, port), timeout=connect_timeout)
+        self.sock.settimeout(1.0)
+        self._buffer = bytearray(self.BUFFER_SIZE)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ur-realtime-reader", daemon=True)
+
+    @property
+    def alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        if self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+    def _run(self):
+        view = memoryview(self._buffer)
+        filled = 0
+        try:
+            while not self._stop.is_set():
+                try:
+                    n = self.sock.recv_into(view[filled:])
+                except socket.timeout:
+                    continue
+                if n == 0:
+                    raise OSError("connessione realtime chiusa dal controller")
+                filled += n
+                offset = 0
+                while filled - offset >= 4:
+                    length = int.from_bytes(view[offset:offset + 4], "big")
+                    if length < REALTIME_DTYPE.itemsize or length > self.BUFFER_SIZE:
+                        raise OSError(f"pacchetto realtime non valido ({length} byte)")
+                    if filled - offset < length:
+                        break
+                    self.history.push_realtime(view[offset:offset + length])
+                    offset += length
+                # Il pacchetto incompleto (se c'è) torna all'inizio del buffer
+                view[:filled - offset] = view[offset:filled]
+                filled -= offset
+        except OSError as e:
+            if not self._stop.is_set():
+                self.error = e
@@ -0,0 +1,175 @@
+# src/ur_service.py
+
+import socket
+from typing import List, Optional
+
+from commands import Command, Grip, MoveJ, MoveL, WaitGrip
+
+# Servizio persistente sul controller.
+#
+# Invece di ricaricare ad ogni presa i ~1500 righe di boilerplate OnRobot,
+# si invia UNA volta un programma che inizializza il runtime del gripper e poi
+# resta in ascolto di comandi brevi su una socket verso il PC:
+#
+#   PC  -> robot : "(op, a1, ..., a9)\n"   (formato di socket_read_ascii_float)
+#                  OP_GRIP: (larghezza, forza, bloccante); OP_GRIP_WAIT: barriera
+#   robot -> PC  : "done\n" oppure "grip,<larghezza>,<grip_detected>\n"
+#
+# Poiché un nuovo programma primario interromperebbe il servizio, quando il
+# servizio è attivo anche i movimenti passano da qui.
+
+OP_MOVEL = 1
+OP_MOVEJ = 2
+OP_GRIP = 3
+OP_GRIP_WAIT = 4
+OP_QUIT = 9
+
+SOCKET_NAME = "wb_srv"
+N_ARGS = 10   # opcode + 9 parametri
+
+_SERVICE_LOOP = """\
+  wb_open = socket_open("{host}", {port}, "{sock}")
+  while not wb_open:
+    sleep(0.5)
+    wb_open = socket_open("{host}", {port}, "{sock}")
+  end
+  socket_send_line("ready", "{sock}")
+  while (True):
+    wb_cmd = socket_read_ascii_float({n_args}, "{sock}", 0)
+    if wb_cmd[0] < 1:
+      break
+    end
+    wb_op = wb_cmd[1]
+    if wb_op == {movel}:
+      movel(p[wb_cmd[2], wb_cmd[3], wb_cmd[4], wb_cmd[5], wb_cmd[6], wb_cmd[7]], a=wb_cmd[8], v=wb_cmd[9], r=wb_cmd[10])
+      socket_send_line("done", "{sock}")
+    elif wb_op == {movej}:
+      movej([wb_cmd[2], wb_cmd[3], wb_cmd[4], wb_cmd[5], wb_cmd[6], wb_cmd[7]], a=wb_cmd[8], v=wb_cmd[9], r=wb_cmd[10])
+      socket_send_line("done", "{sock}")
+    elif wb_op == {grip}:
+      rg_grip(wb_cmd[2], wb_cmd[3], tool_index = 0, blocking = wb_cmd[4] > 0, depth_comp = False, popupmsg = True)
+      rg_payload_set(mass = 0.0, tool_index = 0, use_guard = True)
+      socket_send_line(str_cat(str_cat("grip,", rg_Width), str_cat(",", rg_Grip_detected)), "{sock}")
+    elif wb_op == {grip_wait}:
+      while rg_Busy_arr[0]:
+        sync()
+      end
+      socket_send_line("done", "{sock}")
+    elif wb_op == {quit}:
+      break
+    end
+  end
+  socket_close("{sock}")
+"""
+
+
+def encode_command(command: Command) -> str:
+    """Traduce un comando nella riga ASCII letta da socket_read_ascii_float."""
+    if isinstance(command, MoveL):
+        values = [OP_MOVEL, *command.pose, command.a, command.v, command.r]
+    elif isinstance(command, MoveJ):
+        values = [OP_MOVEJ, *command.joints, command.a, command.v, command.r]
+    elif isinstance(command, Grip):
+        values = [OP_GRIP, command.width, command.force, 1.0 if command.blocking else 0.0]
+    elif isinstance(command, WaitGrip):
+        values = [OP_GRIP_WAIT]
+    else:
+        raise TypeError(f"Comando non supportato dal servizio: {command!r}")
+    values += [0.0] * (N_ARGS - len(values))
+    return "(" + ",".join(f"{float(v):.6f}" for v in values) + ")\n"
+
+
+class URService:
+    """Lato PC del servizio persistente: socket in ascolto + protocollo a opcode."""
+
+    def __init__(self, host: str, port: int = 50002, connect_timeout: float = 20.0,
+                 reply_timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.reply_timeout = reply_timeout
+        self._server: Optional[socket.socket] = None
+        self._conn: Optional[socket.socket] = None
+        self._rx = b""
+        # Ultima lettura del gripper dopo un comando di presa: (larghezza mm, presa rilevata)
+        self.last_grip: Optional[tuple] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def program(self, preamble: str) -> str:
+        """Programma URScript del servizio (preamble = inizializzazione OnRobot)."""
+        loop = _SERVICE_LOOP.format(host=self.host, port=self.port, sock=SOCKET_NAME,
+                                    n_args=N_ARGS, movel=OP_MOVEL, movej=OP_MOVEJ,
+                                    grip=OP_GRIP, grip_wait=OP_GRIP_WAIT, quit=OP_QUIT)
+        return "def wb_service():\n" + preamble.rstrip("\n") + "\n" + loop + "end\n"
+
+    def listen(self):
+        """Apre la socket in ascolto PRIMA di inviare il programma al robot."""
+        self._server = socket.create_server(("", self.port))
+        self._server.settimeout(self.connect_timeout)
+
+    def accept(self) -> bool:
+        """Attende che il programma sul robot si colleghi e dica 'ready'."""
+        if self._server is None:
+            return False
+        try:
+            self._conn, _ = self._server.accept()
+            self._conn.settimeout(self.reply_timeout)
+            return self._read_line() == "ready"
+        except OSError as e:
+            print(f"⚠️ Servizio gripper: nessuna connessione dal robot ({e})")
+            self.close()
+            return False
+        finally:
+            if self._server is not None:
+                self._server.close()
+                self._server = None
+
+    def run(self, commands: List[Command]) -> bool:
+        """
+        Invia tutti i comandi in pipeline (così i raccordi funzionano) e poi
+        attende una risposta per ciascuno. False se il servizio è caduto.
+        last_grip vale solo per questo lotto (None se non contiene prese).
+        """
+        self.last_grip = None
+        if self._conn is None:
+            return False
+        try:
+            self._conn.sendall("".join(encode_command(c) for c in commands).encode("ascii"))
+            for _ in commands:
+                reply = self._read_line()
+                if reply.startswith("grip,"):
+                    _, width, detected = reply.split(",")
+                    self.last_grip = (float(width), detected.strip().lower() == "true")
+                elif reply != "done":
+                    raise OSError(f"risposta inattesa: {reply!r}")
+            return True
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Servizio gripper interrotto: {e}")
+            self.close()
+            return False
+
+    def close(self, send_quit: bool = False):
+        if self._conn is not None:
+            try:
+                if send_quit:
+                    values = [OP_QUIT] + [0.0] * (N_ARGS - 1)
+                    self._conn.sendall(("(" + ",".join(str(v) for v in values) + ")\n").encode("ascii"))
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    def _read_line(self) -> str:
+        while b"\n" not in self._rx:
+            chunk = self._conn.recv(4096)
+            if not chunk:
+                raise OSError("connessione chiusa dal robot")
+            self._rx += chunk
+        line, self._rx = self._rx.split(b"\n", 1)
+        return line.decode("utf-8", "replace").strip()
@@ -0,0 +1,314 @@
+# src/ur_state.py
+
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Decodifica dei pacchetti di stato che il controller UR invia sull'interfaccia
+# primaria/secondaria (porte 30001/30002, circa 10 Hz).
+#
+# Ogni messaggio inizia con: int32 lunghezza totale (header incluso) + uint8 tipo.
+# Il messaggio "Robot State" (tipo 16) contiene una serie di sotto-pacchetti,
+# ognuno con lo stesso header (int32 lunghezza + uint8 tipo).
+
+MSG_ROBOT_STATE = 16
+MSG_ROBOT_MESSAGE = 20
+
+ROBOT_MESSAGE_VERSION = 3
+ROBOT_MODE_RUNNING = 7
+JOINT_MODE_RUNNING = 253
+
+PKG_ROBOT_MODE = 0
+PKG_JOINT_DATA = 1
+PKG_CARTESIAN_INFO = 4
+
+HEADER = struct.Struct(">iB")
+# timestamp, realRobotConnected, realRobotEnabled, robotPowerOn, emergencyStopped,
+# protectiveStopped, programRunning, programPaused, robotMode, controlMode,
+# targetSpeedFraction, speedScaling, targetSpeedFractionLimit
+ROBOT_MODE = struct.Struct(">Q???????BBddd")
+# q_actual, q_target, qd_actual, I_actual, V_actual, T_motor, T_micro, jointMode
+JOINT = struct.Struct(">dddffffB")
+CARTESIAN = struct.Struct(">6d")
+# timestamp, source, robotMessageType
+ROBOT_MESSAGE = struct.Struct(">QbB")
+
+# Interfaccia realtime (porta 30003, 125 Hz): int32 lunghezza + sequenza di double.
+# Layout dei controller 3.5+ (1108 byte); le versioni più recenti aggiungono
+# campi in coda, che vengono ignorati.
+REALTIME_LAYOUT = [
+    ("time", 1), ("q_target", 6), ("qd_target", 6), ("qdd_target", 6),
+    ("i_target", 6), ("m_target", 6), ("q_actual", 6), ("qd_actual", 6),
+    ("i_actual", 6), ("i_control", 6), ("tool_vector_actual", 6),
+    ("tcp_speed_actual", 6), ("tcp_force", 6), ("tool_vector_target", 6),
+    ("tcp_speed_target", 6), ("digital_input_bits", 1), ("motor_temperatures", 6),
+    ("controller_timer", 1), ("test_value", 1), ("robot_mode", 1), ("joint_modes", 6),
+    ("safety_mode", 1), ("unused_1", 6), ("tool_accelerometer", 3), ("unused_2", 6),
+    ("speed_scaling", 1), ("linear_momentum_norm", 1), ("unused_3", 1), ("unused_4", 1),
+    ("v_main", 1), ("v_robot", 1), ("i_robot", 1), ("v_actual", 6),
+    ("digital_outputs", 1), ("program_state", 1), ("elbow_position", 3),
+    ("elbow_velocity", 3),
+]
+REALTIME_DOUBLES = sum(n for _, n in REALTIME_LAYOUT)
+REALTIME_FRAME = struct.Struct(f">i{REALTIME_DOUBLES}d")
+PROGRAM_STATE_STOPPED = 1.0
+PROGRAM_STATE_PLAYING = 2.0
+
+
+@dataclass
+class RobotState:
+    """Ultimo stato noto del robot, ricavato dal flusso della porta 30002."""
+
+    received_at: float = 0.0
+    # Numero progressivo del pacchetto da cui è stato ricavato (vedi StateReader)
+    sequence: int = 0
+    program_running: bool = False
+    program_paused: bool = False
+    protective_stopped: bool = False
+    emergency_stopped: bool = False
+    robot_mode: int = -1
+    q_actual: List[float] = field(default_factory=list)
+    qd_actual: List[float] = field(default_factory=list)
+    tcp_pose: List[float] = field(default_factory=list)
+    # Registri di output intero (solo dalle sorgenti che li forniscono, es. RTDE)
+    output_int_registers: Dict[int, int] = field(default_factory=dict)
+
+    def is_steady(self, tol: float = 1e-3) -> bool:
+        """True se tutti i giunti sono (quasi) fermi. False se le velocità non sono note."""
+        return bool(self.qd_actual) and all(abs(v) < tol for v in self.qd_actual)
+
+
+def parse_robot_state(payload: bytes, state: Optional[RobotState] = None) -> RobotState:
+    """
+    Decodifica il corpo di un messaggio Robot State (header del messaggio escluso).
+    I sotto-pacchetti non riconosciuti vengono saltati.
+    """
+    state = state or RobotState()
+    state.received_at = time.monotonic()
+
+    offset = 0
+    while offset + HEADER.size <= len(payload):
+        size, pkg_type = HEADER.unpack_from(payload, offset)
+        if size <= 0:
+            break
+        body = offset + HEADER.size
+
+        if pkg_type == PKG_ROBOT_MODE and size >= HEADER.size + ROBOT_MODE.size:
+            fields = ROBOT_MODE.unpack_from(payload, body)
+            state.emergency_stopped = fields[4]
+            state.protective_stopped = fields[5]
+            state.program_running = fields[6]
+            state.program_paused = fields[7]
+            state.robot_mode = fields[8]
+        elif pkg_type == PKG_JOINT_DATA and size >= HEADER.size + 6 * JOINT.size:
+            joints = [JOINT.unpack_from(payload, body + i * JOINT.size) for i in range(6)]
+            state.q_actual = [j[0] for j in joints]
+            state.qd_actual = [j[2] for j in joints]
+        elif pkg_type == PKG_CARTESIAN_INFO and size >= HEADER.size + CARTESIAN.size:
+            state.tcp_pose = list(CARTESIAN.unpack_from(payload, body))
+
+        offset += size
+
+    return state
+
+
+def iter_messages(view: memoryview) -> Iterator[Tuple[int, memoryview]]:
+    """
+    Scorre i messaggi completi di `view` come (tipo, payload) senza copiarli.
+    I payload sono viste su `view`: vanno usati e rilasciati subito.
+    ValueError se il flusso è desincronizzato.
+    """
+    offset = 0
+    while len(view) - offset >= HEADER.size:
+        size, msg_type = HEADER.unpack_from(view, offset)
+        if size < HEADER.size:
+            raise ValueError("flusso desincronizzato")
+        if len(view) - offset < size:
+            break
+        yield msg_type, view[offset + HEADER.size:offset + size]
+        offset += size
+
+
+def consumed_bytes(view: memoryview) -> int:
+    """Byte occupati dai messaggi completi all'inizio di `view`."""
+    offset = 0
+    while len(view) - offset >= HEADER.size:
+        size, _ = HEADER.unpack_from(view, offset)
+        if size < HEADER.size or len(view) - offset < size:
+            break
+        offset += size
+    return offset
+
+
+def split_messages(buffer: bytearray):
+    """
+    Estrae dal buffer tutti i messaggi completi come (tipo, payload) e
+    rimuove i byte consumati. I messaggi parziali restano nel buffer.
+    """
+    messages = []
+    with memoryview(buffer) as view:
+        try:
+            for msg_type, payload in iter_messages(view):
+                messages.append((msg_type, payload.tobytes()))
+                payload.release()
+        except ValueError:
+            # Flusso desincronizzato: scartiamo tutto e ripartiamo puliti
+            offset = len(buffer)
+        else:
+            offset = consumed_bytes(view)
+    del buffer[:offset]
+    return messages
+
+
+class StateReader:
+    """
+    Thread che svuota continuamente il flusso di stato della porta 30002.
+
+    Il controller invia ~10 pacchetti al secondo anche se nessuno li legge:
+    senza un lettore il buffer di ricezione si riempie. Qui i pacchetti
+    vengono decodificati direttamente dal buffer (memoryview + struct) e
+    resta disponibile solo l'ultimo stato, come snapshot immutabile.
+    Se viene passata una `history` (es. ur_realtime.StateHistory), ogni
+    payload Robot State le viene anche consegnato con push_robot_state().
+    """
+
+    CHUNK = 65536
+
+    def __init__(self, sock: socket.socket, history=None):
+        self.sock = sock
+        self.history = history
+        self.error: Optional[Exception] = None
+        self._latest: Optional[RobotState] = None
+        self._sequence = 0
+        self._buffer = bytearray()
+        self._chunk = bytearray(self.CHUNK)
+        self._updated = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ur-state-reader", daemon=True)
+
+    @property
+    def latest(self) -> Optional[RobotState]:
+        return self._latest
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+    @property
+    def alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=3.0)
+
+    def wait_for_update(self, after: int, timeout: float) -> Optional[RobotState]:
+        """
+        Attende uno stato con sequence > `after` (al massimo `timeout` s).
+        Ritorna None allo scadere o se il lettore si è fermato.
+        """
+        with self._updated:
+            self._updated.wait_for(
+                lambda: self._sequence > after or not self.alive, max(0.0, timeout))
+            if self._sequence > after:
+                return self._latest
+            return None
+
+    def _run(self):
+        chunk = memoryview(self._chunk)
+        try:
+            while not self._stop.is_set():
+                try:
+                    n = self.sock.recv_into(chunk)
+                except socket.timeout:
+                    continue
+                if n == 0:
+                    raise OSError("connessione chiusa dal controller")
+                self._buffer += chunk[:n]
+                self._consume()
+        except OSError as e:
+            if not self._stop.is_set():
+                self.error = e
+        finally:
+            with self._updated:
+                self._updated.notify_all()
+
+    def _consume(self):
+        state = self._latest
+        with memoryview(self._buffer) as view:
+            try:
+                for msg_type, payload in iter_messages(view):
+                    if msg_type == MSG_ROBOT_STATE:
+                        state = parse_robot_state(payload, replace(state) if state else None)
+                        if self.history is not None:
+                            self.history.push_robot_state(payload)
+                    payload.release()
+                offset = consumed_bytes(view)
+            except ValueError:
+                offset = len(view)
+        del self._buffer[:offset]
+        if state is not self._latest:
+            with self._updated:
+                self._sequence += 1
+                state.sequence = self._sequence
+                self._latest = state
+                self._updated.notify_all()
+
+
+# ---------- CODIFICA (usata dal controller simulato) ----------
+
+def _sub_package(pkg_type: int, body: bytes) -> bytes:
+    return HEADER.pack(HEADER.size + len(body), pkg_type) + body
+
+
+def build_robot_state_message(program_running: bool, q_actual: List[float],
+                              qd_actual: List[float], tcp_pose: List[float],
+                              timestamp_us: int = 0) -> bytes:
+    """Costruisce un messaggio Robot State con Robot Mode, Joint Data e Cartesian Info."""
+    mode = ROBOT_MODE.pack(timestamp_us, True, True, True, False, False,
+                           program_running, False, ROBOT_MODE_RUNNING, 0, 1.0, 1.0, 1.0)
+    joints = b"".join(
+        JOINT.pack(q, q, qd, 0.0, 48.0, 30.0, 0.0, JOINT_MODE_RUNNING)
+        for q, qd in zip(q_actual, qd_actual)
+    )
+    body = (
+        _sub_package(PKG_ROBOT_MODE, mode)
+        + _sub_package(PKG_JOINT_DATA, joints)
+        + _sub_package(PKG_CARTESIAN_INFO, CARTESIAN.pack(*tcp_pose))
+    )
+    return HEADER.pack(HEADER.size + len(body), MSG_ROBOT_STATE) + body
+
+
+def build_version_message(project: str = "URControl", major: int = 3, minor: int = 15,
+                          bugfix: int = 0, build: int = 0, build_date: str = "") -> bytes:
+    """Messaggio di versione che il controller invia appena si apre la connessione."""
+    name = project.encode("ascii")
+    body = (
+        ROBOT_MESSAGE.pack(0, -2, ROBOT_MESSAGE_VERSION)
+        + struct.pack(">b", len(name)) + name
+        + struct.pack(">BBii", major, minor, bugfix, build)
+        + build_date.encode("ascii")
+    )
+    return HEADER.pack(HEADER.size + len(body), MSG_ROBOT_MESSAGE) + body
+
+
+def build_realtime_frame(values: dict) -> bytes:
+    """
+    Costruisce un pacchetto realtime (porta 30003). I campi non presenti in
+    `values` valgono zero; i vettori vanno passati come liste della lunghezza giusta.
+    """
+    data = []
+    for name, count in REALTIME_LAYOUT:
+        value = values.get(name, 0.0)
+        if count == 1:
+            data.append(float(value))
+        else:
+            data.extend(float(v) for v in (value or [0.0] * count))
+    return REALTIME_FRAME.pack(REALTIME_FRAME.size, *data)
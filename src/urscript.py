@@ -0,0 +1,424 @@
+# src/urscript.py
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Parser minimale di URScript: estrae dal corpo principale di un programma
+# i comandi che ci interessano per stimare i tempi (movimenti, gripper, attese)
+# e le scritture dei registri di output (usate per segnalare la fine delle sequenze).
+# Non è un interprete: gli if vengono ignorati (si contano tutti i rami) e i
+# comandi dentro i cicli while/for non vengono considerati (iterazioni ignote).
+
+_CALL_RE = re.compile(r"^(?:global\s+)?(?:\w+\s*=\s*)?(movel|movej|rg_grip|sleep|write_output_integer_register)\s*\((.*)\)\s*$")
+_BLOCK_OPENERS = ("if", "while", "for")
+# Barriera di attesa del gripper (commands.WaitGrip)
+_GRIP_WAIT_RE = re.compile(r"^while\s*\(?\s*rg_Busy")
+
+
+@dataclass(frozen=True)
+class ScriptCommand:
+    """Un comando estratto da un programma URScript."""
+
+    kind: str                                   # "movel" | "movej" | "grip" | "grip_wait" | "sleep" | "register"
+    target: Optional[Tuple[float, ...]] = None  # posa/giunti, (width, force), (secondi,) o (registro, valore)
+    a: Optional[float] = None
+    v: Optional[float] = None
+    r: float = 0.0
+    blocking: bool = True
+
+
+@dataclass
+class ScriptProgram:
+    """Programma analizzato: comandi del corpo principale + info per il modello di carico."""
+
+    commands: List[ScriptCommand] = field(default_factory=list)
+    size_bytes: int = 0
+    needs_gripper_init: bool = False
+
+
+def _first_word(line: str) -> str:
+    return re.split(r"[\s(:]", line, 1)[0]
+
+
+def block_delta(line: str) -> int:
+    """+1 se la riga apre un blocco (def/thread/if/while/...), -1 se è un `end`, altrimenti 0."""
+    line = line.split("#", 1)[0].strip()
+    word = _first_word(line)
+    if word in ("def", "sec", "thread") + _BLOCK_OPENERS and line.endswith(":"):
+        return 1
+    if word == "end":
+        return -1
+    return 0
+
+
+def split_programs(buffer: str) -> Tuple[List[str], str]:
+    """
+    Divide il testo ricevuto dal controller in programmi completi:
+    un blocco def/sec ... end oppure una singola istruzione per riga.
+    Ritorna (programmi completi, testo residuo ancora incompleto).
+    """
+    programs: List[str] = []
+    current: List[str] = []
+    depth = 0
+    consumed = 0
+
+    for line in buffer.splitlines(keepends=True):
+        if not line.endswith("\n"):
+            break
+        consumed += len(line)
+        stripped = line.strip()
+        if depth == 0 and not current and (not stripped or stripped.startswith("#")):
+            continue
+        current.append(line)
+        depth = max(0, depth + block_delta(stripped))
+        if depth == 0:
+            programs.append("".join(current))
+            current = []
+
+    rest = "".join(current) + buffer[consumed:]
+    return programs, rest
+
+
+def _split_args(args: str) -> List[str]:
+    """Divide gli argomenti di una chiamata sulle virgole di primo livello."""
+    parts, depth, current = [], 0, []
+    for ch in args:
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if current:
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _parse_number(text: str) -> Optional[float]:
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _parse_vector(text: str) -> Optional[Tuple[float, ...]]:
+    text = text.strip()
+    if text.startswith("p["):
+        text = text[1:]
+    if not (text.startswith("[") and text.endswith("]")):
+        return None
+    values = [_parse_number(v) for v in text[1:-1].split(",")]
+    if any(v is None for v in values):
+        return None
+    return tuple(values)
+
+
+def _parse_call(name: str, args: str) -> Optional[ScriptCommand]:
+    positional, keywords = [], {}
+    for arg in _split_args(args):
+        key, sep, value = arg.partition("=")
+        if sep and re.fullmatch(r"\w+", key.strip()):
+            keywords[key.strip()] = value.strip()
+        else:
+            positional.append(arg)
+
+    if name in ("movel", "movej"):
+        if not positional:
+            return None
+        values = {k: _parse_number(keywords[k]) for k in ("a", "v", "r") if k in keywords}
+        return ScriptCommand(
+            kind=name,
+            target=_parse_vector(positional[0]),
+            a=values.get("a"),
+            v=values.get("v"),
+            r=values.get("r") or 0.0,
+        )
+    if name == "rg_grip":
+        width = _parse_number(positional[0]) if positional else None
+        force = _parse_number(positional[1]) if len(positional) > 1 else None
+        blocking = keywords.get("blocking", "True") != "False"
+        return ScriptCommand(kind="grip", target=(width, force), blocking=blocking)
+    if name == "sleep":
+        seconds = _parse_number(positional[0]) if positional else None
+        return ScriptCommand(kind="sleep", target=(seconds or 0.0,))
+    if name == "write_output_integer_register":
+        values = [_parse_number(p) for p in positional[:2]]
+        if len(values) < 2 or None in values:
+            return None
+        return ScriptCommand(kind="register", target=tuple(values))
+    return None
+
+
+@lru_cache(maxsize=64)
+def parse_program(script: str) -> ScriptProgram:
+    """
+    Analizza uno script (singola istruzione o programma def ... end).
+    Vengono considerati solo i comandi del corpo principale, non quelli
+    dentro funzioni, thread annidati o cicli (la barriera `while rg_Busy...`
+    di commands.WaitGrip diventa un comando "grip_wait").
+    """
+    program = ScriptProgram(size_bytes=len(script.encode("utf-8")))
+    program.needs_gripper_init = "rg_wait_for_init(" in script
+
+    stack: List[str] = []
+    wrapped = script.lstrip().startswith(("def ", "sec "))
+    allowed_defs = 1 if wrapped else 0
+
+    for raw in script.splitlines():
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        word = _first_word(line)
+
+        if word in ("def", "sec", "thread") and line.endswith(":"):
+            stack.append("def")
+            continue
+        if word in _BLOCK_OPENERS and line.endswith(":"):
+            in_body = stack.count("def") <= allowed_defs and "loop" not in stack
+            if in_body and _GRIP_WAIT_RE.match(line):
+                program.commands.append(ScriptCommand(kind="grip_wait"))
+            stack.append("loop" if word in ("while", "for") else "block")
+            continue
+        if word in ("elif", "else"):
+            continue
+        if word == "end":
+            if stack:
+                stack.pop()
+            continue
+
+        if stack.count("def") > allowed_defs or "loop" in stack:
+            continue
+
+        match = _CALL_RE.match(line)
+        if match:
+            command = _parse_call(match.group(1), match.group(2))
+            if command is not None:
+                program.commands.append(command)
+
+    return program
+
+
+# ---------- MINIFICAZIONE ----------
+#
+# I programmi del gripper contengono tutto il motore OnRobot esportato dal
+# pendant: log di debug, stub per gli altri dispositivi (VG, SG, Eyes, ...),
+# rami per il doppio gripper, messaggi tradotti, il thread contatore di passi.
+# Il controller deve comunque compilarli ad ogni invio, quindi prima di
+# spedirli si tolgono commenti/spazi e il codice che non può essere eseguito.
+# Le trasformazioni sono conservative: nel dubbio una riga resta.
+
+_IDENT_RE = re.compile(r"[A-Za-z_]\w*")
+_SPACES_RE = re.compile(r"\s+")
+_COMPACT_RE = re.compile(r"\s*([)\],=:<>*/])\s*|([(\[])\s+")
+_ASSIGN_RE = re.compile(r"^([A-Za-z_]\w*)\s*=(?!=)(.*)$")
+_OPENER_RE = re.compile(r"^(def|thread)\s+(\w+)\s*\((.*)\)\s*:$")
+_CALL_IN_EXPR_RE = re.compile(r"\w\s*\(")
+_LITERAL_RE = re.compile(r"^(True|False|-?\d+(\.\d+)?)$")
+_FALSE_IF_RE = re.compile(r"^if\s*\(?\s*False\s*\)?\s*:$")
+_IDLE_LOOP_RE = re.compile(r"^while\s*\(?\s*True\s*\)?\s*:$")
+_CONDITION_RE = re.compile(r"^(?:\s|True|False|and|or|not|-?\d+(?:\.\d+)?|==|!=|<=|>=|<|>|\(|\))*$")
+
+
+def _strip_line(line: str) -> str:
+    """Toglie commento e spazi superflui, senza toccare il contenuto delle stringhe."""
+    parts = line.split('"')
+    for i in range(0, len(parts), 2):
+        if "#" in parts[i]:
+            parts = parts[:i] + [parts[i].split("#", 1)[0]]
+            break
+    for i in range(0, len(parts), 2):
+        code = _SPACES_RE.sub(" ", parts[i])
+        parts[i] = _COMPACT_RE.sub(lambda m: m.group(1) or m.group(2), code)
+    return '"'.join(parts).strip()
+
+
+def _code(line: str) -> str:
+    """La riga senza le stringhe letterali (per cercare gli identificatori)."""
+    return " ".join(line.split('"')[0::2])
+
+
+def _identifier_counts(lines: List[str]) -> Counter:
+    counts: Counter = Counter()
+    for line in lines:
+        counts.update(_IDENT_RE.findall(_code(line)))
+    return counts
+
+
+def _structure(lines: List[str]) -> Tuple[Dict[int, int], Dict[int, List[int]]]:
+    """Per ogni riga che apre un blocco: indice dell'`end` e delle righe elif/else."""
+    end_of: Dict[int, int] = {}
+    branches: Dict[int, List[int]] = {}
+    stack: List[int] = []
+    for i, line in enumerate(lines):
+        delta = block_delta(line)
+        if delta > 0:
+            stack.append(i)
+            branches[i] = []
+        elif delta < 0 and stack:
+            end_of[stack.pop()] = i
+        elif stack and _first_word(line) in ("elif", "else"):
+            branches[stack[-1]].append(i)
+    return end_of, branches
+
+
+def _constants(lines: List[str]) -> Dict[str, str]:
+    """Variabili del corpo principale assegnate una sola volta a un letterale."""
+    assignments: Dict[str, List[Tuple[int, str]]] = {}
+    excluded = set()
+    depth = 0
+    for line in lines:
+        word = _first_word(line)
+        opener = _OPENER_RE.match(line)
+        if opener:
+            excluded.update(_IDENT_RE.findall(opener.group(3)))
+        elif word in ("global", "local"):
+            excluded.update(_IDENT_RE.findall(line.split("=", 1)[0])[1:])
+        else:
+            assign = _ASSIGN_RE.match(line)
+            if assign:
+                assignments.setdefault(assign.group(1), []).append((depth, assign.group(2)))
+        depth += block_delta(line)
+    return {
+        name: values[0][1]
+        for name, values in assignments.items()
+        if len(values) == 1 and values[0][0] == 1 and name not in excluded
+        and _LITERAL_RE.match(values[0][1])
+    }
+
+
+def _evaluate(condition: str, constants: Dict[str, str]) -> Optional[bool]:
+    """Valuta una condizione fatta solo di costanti note; None se non si può."""
+    expr = _IDENT_RE.sub(lambda m: constants.get(m.group(0), m.group(0)), condition)
+    if not _CONDITION_RE.match(expr):
+        return None
+    try:
+        return bool(eval(expr, {"__builtins__": {}}, {}))
+    except (SyntaxError, TypeError, ValueError):
+        return None
+
+
+def _fold_constant_branches(lines: List[str]) -> List[str]:
+    """Sostituisce gli if con condizione costante (es. ON_DEBUG_LOG) con il ramo che viene eseguito."""
+    constants = _constants(lines)
+    end_of, branches = _structure(lines)
+    result: List[str] = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if _first_word(line) != "if" or i not in end_of:
+            result.append(line)
+            i += 1
+            continue
+        end = end_of[i]
+        # `if (False): global ...` è il modo in cui il pendant dichiara le
+        # variabili globali: va lasciato anche se non viene mai eseguito
+        if _FALSE_IF_RE.match(line) and any(l.startswith("global ") for l in lines[i + 1:end]):
+            value = None
+        else:
+            value = _evaluate(line[2:-1], constants)
+        if value is None:
+            result.append(line)
+            i += 1
+            continue
+        chain = branches[i] + [end]
+        if value:
+            result.extend(lines[i + 1:chain[0]])
+        elif chain[0] != end:
+            branch = lines[chain[0]]
+            if _first_word(branch) == "else":
+                result.extend(lines[chain[0] + 1:end])
+            else:
+                result.append("if" + branch[4:])
+                result.extend(lines[chain[0] + 1:end + 1])
+        i = end + 1
+    return result
+
+
+def _drop_unused_defs(lines: List[str]) -> List[str]:
+    """Toglie funzioni e thread mai chiamati (es. vg_missing, sg_missing, ...)."""
+    end_of, _ = _structure(lines)
+    counts = _identifier_counts(lines)
+    unused = []
+    for start, end in end_of.items():
+        opener = _OPENER_RE.match(lines[start])
+        if start == 0 or not opener:
+            continue
+        name = opener.group(2)
+        own = sum(_IDENT_RE.findall(_code(l)).count(name) for l in lines[start:end + 1])
+        if counts[name] == own:
+            unused.append((start, end))
+    return _drop_ranges(lines, unused)
+
+
+def _drop_dead_stores(lines: List[str]) -> List[str]:
+    """Toglie le assegnazioni senza effetti a variabili che nessuno legge."""
+    counts = _identifier_counts(lines)
+    stores: Dict[str, List[int]] = {}
+    for i, line in enumerate(lines):
+        assign = _ASSIGN_RE.match(line)
+        if assign and not _CALL_IN_EXPR_RE.search(_code(assign.group(2))) \
+                and not assign.group(2).startswith("run "):
+            stores.setdefault(assign.group(1), []).append(i)
+    dead = set()
+    for name, indexes in stores.items():
+        own = sum(_IDENT_RE.findall(_code(lines[i])).count(name) for i in indexes)
+        if counts[name] == own:
+            dead.update(indexes)
+    return [line for i, line in enumerate(lines) if i not in dead]
+
+
+def _drop_idle_threads(lines: List[str]) -> List[str]:
+    """Toglie i thread che girano a vuoto (while True: sync()) e il loro `run`."""
+    end_of, _ = _structure(lines)
+    counts = _identifier_counts(lines)
+    idle = []
+    for start, end in end_of.items():
+        opener = _OPENER_RE.match(lines[start])
+        if not opener or opener.group(1) != "thread":
+            continue
+        body = lines[start + 1:end]
+        if not all(_IDLE_LOOP_RE.match(l) or l in ("sync()", "end") for l in body):
+            continue
+        name = opener.group(2)
+        runs = [i for i, l in enumerate(lines) if l == f"run {name}()"]
+        if counts[name] == 1 + len(runs):
+            idle.append((start, end))
+            idle.extend((i, i) for i in runs)
+    return _drop_ranges(lines, idle)
+
+
+def _drop_ranges(lines: List[str], ranges: List[Tuple[int, int]]) -> List[str]:
+    if not ranges:
+        return lines
+    dropped = set()
+    for start, end in ranges:
+        dropped.update(range(start, end + 1))
+    return [line for i, line in enumerate(lines) if i not in dropped]
+
+
+@lru_cache(maxsize=32)
+def minify(script: str) -> str:
+    """
+    Versione compatta di un programma `def ... end`: senza commenti e spazi
+    superflui, con i rami a condizione costante risolti e senza funzioni,
+    thread e variabili che non possono avere effetti.
+    Le istruzioni singole vengono restituite così come sono.
+    """
+    lines = [line for line in (_strip_line(raw) for raw in script.splitlines()) if line]
+    if not lines or _first_word(lines[0]) not in ("def", "sec"):
+        return script
+    passes = (_fold_constant_branches, _drop_unused_defs, _drop_dead_stores, _drop_idle_threads)
+    changed = True
+    while changed:
+        changed = False
+        for transform in passes:
+            reduced = transform(lines)
+            if len(reduced) != len(lines) or reduced != lines:
+                lines, changed = reduced, True
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,32 @@
+# src/vision.py
+
+# Camera per leggere le tessere sul tavolo (OpenCV, se installato).
+# Aprire il dispositivo può richiedere qualche secondo (driver, esposizione
+# automatica): startup.py lo fa in background mentre si sceglie la difficoltà.
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+def open_camera(camera_id: int = 0):
+    """
+    Apre la camera e legge un primo frame (così l'esposizione è già assestata).
+    Ritorna il cv2.VideoCapture, oppure None se OpenCV manca o la camera non risponde.
+    """
+    if cv2 is None:
+        print("⚠️ OpenCV non installato: camera disattivata.")
+        return None
+    camera = cv2.VideoCapture(camera_id)
+    if not camera.isOpened():
+        print(f"⚠️ Camera {camera_id} non disponibile.")
+        camera.release()
+        return None
+    ok, _frame = camera.read()
+    if not ok:
+        print(f"⚠️ Camera {camera_id}: nessun frame.")
+        camera.release()
+        return None
+    print(f"📷 Camera {camera_id} pronta.")
+    return camera
@@ -0,0 +1,58 @@
+# tests/conftest.py
+
+import os
+import socket
+import sys
+
+import pytest
+
+# I moduli in src/ si importano tra loro per nome (come quando si lancia
+# python src/main.py): stessa cosa per i test
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from mock_ur_controller import MockURController  # noqa: E402
+from robot_control import Robot  # noqa: E402
+
+PORT_NAMES = ("primary", "secondary", "realtime", "rtde", "dashboard")
+
+
+def free_ports(n: int) -> list:
+    sockets = [socket.create_server(("127.0.0.1", 0)) for _ in range(n)]
+    ports = [s.getsockname()[1] for s in sockets]
+    for s in sockets:
+        s.close()
+    return ports
+
+
+@pytest.fixture
+def controller():
+    """Controller UR simulato (mock_ur_controller) su porte libere, 4 volte più veloce."""
+    mock = MockURController(ports=dict(zip(PORT_NAMES, free_ports(len(PORT_NAMES)))),
+                            time_scale=4.0, verbose=False)
+    mock.start()
+    yield mock
+    mock.stop()
+
+
+@pytest.fixture
+def make_robot(controller):
+    """Robot collegato al controller simulato; `poses`, `motion`, ... come nel config."""
+    robots = []
+
+    def make(poses=None, rtde=True, **sections):
+        ports = controller.ports
+        robot = Robot(
+            robot_ip="127.0.0.1", poses=poses or {}, port=ports["secondary"],
+            safety={"max_speed": 0.25, "max_acc": 1.2, **sections.pop("safety", {})},
+            state_stream={"rtde": rtde, "rtde_port": ports["rtde"], **sections.pop("state_stream", {})},
+            connection={"dashboard_port": ports["dashboard"], "backoff_s": 0.05,
+                        **sections.pop("connection", {})},
+            kinematics={"check_poses": False, **sections.pop("kinematics", {})},
+            **sections,
+        )
+        robots.append(robot)
+        return robot
+
+    yield make
+    for robot in robots:
+        robot.close()
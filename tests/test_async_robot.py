@@ -0,0 +1,61 @@
+# tests/test_async_robot.py
+
+import asyncio
+import threading
+import time
+
+from async_robot import AsyncRobot
+
+
+def at(x, y, z=0.2):
+    return [x, y, z, 3.14, 0.0, 0.0]
+
+
+def test_moves_run_in_order_on_the_robot_thread_while_the_loop_works(controller, make_robot):
+    robot = make_robot()
+    threads = []
+    send = robot.move_linear
+
+    def move_linear(pose, profile=None):
+        threads.append(threading.current_thread().name)
+        return send(pose, profile)
+
+    robot.move_linear = move_linear
+
+    async def go():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        arobot = AsyncRobot(robot)
+        clock = asyncio.create_task(ticker())
+        started = time.monotonic()
+        results = await asyncio.gather(arobot.move_linear(at(0.3, 0.1)), arobot.move_linear(at(0.3, -0.1)))
+        elapsed = time.monotonic() - started
+        clock.cancel()
+        await arobot.close()
+        return results, ticks, elapsed
+
+    results, ticks, elapsed = asyncio.run(go())
+    assert results == [True, True]
+    # Seconda mossa eseguita dopo la prima: il robot è fermo sull'ultima posa
+    assert controller.model.tcp_pose[:2] == [0.3, -0.1]
+    assert threads and all(name.startswith("robot") for name in threads)
+    # Il loop non è rimasto bloccato durante i movimenti
+    assert ticks >= elapsed / 0.01 / 2
+    assert robot.pool is None and robot.dispatcher is None
+
+
+def test_context_manager_closes_the_robot(make_robot):
+    robot = make_robot()
+
+    async def go():
+        async with AsyncRobot(robot) as arobot:
+            assert await arobot.grip(True)
+
+    asyncio.run(go())
+    assert robot.pool is None and robot.dispatcher is None
@@ -0,0 +1,195 @@
+# tests/test_connection.py
+
+import socket
+import threading
+import time
+
+import pytest
+
+from connection import Backoff, ConnectionLost, DashboardConnection, ManagedConnection, get_pool
+
+FAST = Backoff(base=0.01, cap=0.02, attempts=3)
+
+
+class Server:
+    """Server TCP locale: per ogni connessione salva i dati ricevuti (e risponde, se richiesto)."""
+
+    def __init__(self, greeting: bytes = b"", reply: bytes = b""):
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self.greeting = greeting
+        self.reply = reply
+        self.received = []
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        data = bytearray()
+        self.received.append(data)
+        with conn:
+            if self.greeting:
+                conn.sendall(self.greeting)
+            while True:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    return
+                data.extend(chunk)
+                if self.reply:
+                    conn.sendall(self.reply)
+
+    def close(self):
+        self.sock.close()
+
+
+class BrokenSocket:
+    """Socket già caduto: ogni invio fallisce."""
+
+    def sendall(self, data):
+        raise BrokenPipeError("broken pipe")
+
+    def close(self):
+        pass
+
+
+def closed_port() -> int:
+    sock = socket.create_server(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_backoff_delays_double_up_to_cap():
+    assert Backoff(base=0.5, cap=3.0, attempts=5).delays() == [0.5, 1.0, 2.0, 3.0]
+    assert Backoff(attempts=1).delays() == []
+    assert Backoff(attempts=0).delays() == []
+
+
+def test_connect_fails_after_all_attempts():
+    conn = ManagedConnection("127.0.0.1", closed_port(), "test", FAST, connect_timeout=0.5)
+    assert not conn.connect()
+    assert conn.error is not None
+    with pytest.raises(ConnectionLost):
+        conn.sendall(b"x\n")
+
+
+def test_dropped_connection_is_replayed_once():
+    server = Server()
+    conn = ManagedConnection("127.0.0.1", server.port, "test", FAST)
+    connects = []
+    conn.on_connect(connects.append)
+    assert conn.connect()
+    conn.sock.close()
+    conn.sock = BrokenSocket()
+    conn.sendall(b"movel\n")
+    assert conn.reconnects == 1 and len(connects) == 2
+    assert wait_for(lambda: len(server.received) == 2 and server.received[1] == b"movel\n")
+    conn.close()
+    server.close()
+
+
+def test_dropped_connection_without_replay_raises():
+    server = Server()
+    conn = ManagedConnection("127.0.0.1", server.port, "test", FAST, replay=False)
+    assert conn.connect()
+    conn.sock.close()
+    conn.sock = BrokenSocket()
+    with pytest.raises(ConnectionLost):
+        conn.sendall(b"movel\n")
+    # Riconnessa: il comando successivo passa, quello perso non viene reinviato
+    conn.sendall(b"next\n")
+    assert wait_for(lambda: len(server.received) == 2 and server.received[1] == b"next\n")
+    conn.close()
+    server.close()
+
+
+def test_failed_health_check_reconnects_before_sending():
+    server = Server()
+    conn = ManagedConnection("127.0.0.1", server.port, "test", FAST)
+    assert conn.connect()
+    # Il primo controllo fallisce (es. lettore di stato morto), i successivi no
+    checks = iter([False])
+    conn.health_check = lambda: next(checks, True)
+    conn.sendall(b"x\n")
+    assert conn.reconnects == 1
+    assert wait_for(lambda: len(server.received) == 2 and server.received[1] == b"x\n")
+    conn.close()
+    server.close()
+
+
+def test_closed_connection_does_not_reconnect():
+    server = Server()
+    conn = ManagedConnection("127.0.0.1", server.port, "test", FAST)
+    assert conn.connect()
+    conn.close()
+    assert not conn.reconnect()
+    server.close()
+
+
+def test_dashboard_request_returns_reply_line():
+    server = Server(greeting=b"Connected: Universal Robots Dashboard Server\n", reply=b"Stopped\n")
+    dashboard = DashboardConnection("127.0.0.1", server.port, "dashboard", FAST)
+    assert dashboard.request("stop") == "Stopped"
+    assert wait_for(lambda: server.received and server.received[0] == b"stop\n")
+    dashboard.close()
+    server.close()
+
+
+def test_get_pool_is_shared_across_port_maps():
+    primary, dashboard, rtde = closed_port(), closed_port(), closed_port()
+    # Come UR3.py, testmovel.py e Robot: ognuno indica solo le porte che usa
+    script = get_pool("127.0.0.1", {"primary": primary}, FAST)
+    assert get_pool("127.0.0.1", {"primary": primary, "rtde": rtde}) is script
+    robot = get_pool("127.0.0.1", {"primary": primary, "dashboard": dashboard, "rtde": rtde})
+    assert robot is script
+    assert (robot.dashboard.port, robot.rtde_port) == (dashboard, rtde)
+    # Un altro controller (porta primaria diversa) ha il suo pool
+    other = get_pool("127.0.0.1", {"primary": closed_port()})
+    assert other is not script
+    script.close()
+    assert get_pool("127.0.0.1", {"primary": primary}) is not script
+    get_pool("127.0.0.1", {"primary": primary}).close()
+    other.close()
+
+
+def test_cancelled_send_stops_reconnecting_and_is_not_replayed():
+    conn = ManagedConnection("127.0.0.1", closed_port(), "test", Backoff(base=1.0, cap=1.0, attempts=5),
+                             connect_timeout=0.5)
+    conn.sock = BrokenSocket()
+    gave_up = threading.Event()
+    threading.Timer(0.1, gave_up.set).start()
+    start = time.monotonic()
+    with pytest.raises(ConnectionLost):
+        conn.sendall(b"movel\n", cancelled=gave_up.is_set)
+    # Senza annullamento i tentativi durerebbero 4 s
+    assert time.monotonic() - start < 1.0
+    conn.close()
+
+
+def test_send_cancelled_during_reconnect_is_not_replayed():
+    server = Server()
+    conn = ManagedConnection("127.0.0.1", server.port, "test", FAST)
+    conn.sock = BrokenSocket()
+    # Riconnessione riuscita, ma nel frattempo il chiamante ha rinunciato
+    reconnected = threading.Event()
+    conn.on_connect(lambda sock: reconnected.set())
+    with pytest.raises(ConnectionLost):
+        conn.sendall(b"movel\n", cancelled=reconnected.is_set)
+    assert conn.connected
+    time.sleep(0.1)
+    assert server.received == [bytearray()]
+    conn.close()
+    server.close()
@@ -0,0 +1,196 @@
+# tests/test_dispatcher.py
+
+import queue
+import socket
+import threading
+import time
+
+import pytest
+
+from commands import Grip, MoveL
+from connection import Backoff, ManagedConnection
+from dispatcher import PRIORITY_HIGH, STOP_SCRIPT, Dispatcher
+
+POSE = (0.1, 0.2, 0.3, 2.2, -2.2, 0.0)
+
+
+class FakeSocket:
+    """Registra quello che il dispatcher scrive; `fail` fa fallire gli invii."""
+
+    def __init__(self, fail: bool = False):
+        self.sent = []
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def sendall(self, data: bytes):
+        if self.fail:
+            raise OSError("socket chiuso")
+        with self.lock:
+            self.sent.append(data)
+
+
+def move(x: float) -> MoveL:
+    return MoveL((x,) + POSE[1:], 0.5, 0.2)
+
+
+def test_priority_then_arrival_order():
+    sock = FakeSocket()
+    dispatcher = Dispatcher(sock)
+    # Il thread parte dopo: la coda si riempie prima del primo invio
+    first = dispatcher.submit_program(b"a\n")
+    second = dispatcher.submit_program(b"b\n")
+    urgent = dispatcher.submit_program(b"c\n", priority=PRIORITY_HIGH)
+    dispatcher.start()
+    assert all(h.wait(2.0) for h in (first, second, urgent))
+    assert sock.sent == [b"c\n", b"a\n", b"b\n"]
+    dispatcher.close()
+
+
+def test_adjacent_motions_are_coalesced():
+    sock = FakeSocket()
+    dispatcher = Dispatcher(sock)
+    handles = [dispatcher.submit_motion([move(0.1)]), dispatcher.submit_motion([move(0.2), move(0.3)])]
+    program = dispatcher.submit_program(b"x\n")
+    dispatcher.start()
+    assert all(h.wait(2.0) for h in handles + [program])
+    # Un solo programma con i tre movimenti, poi il programma non unibile
+    assert len(sock.sent) == 2
+    batch = sock.sent[0].decode("utf-8")
+    assert batch.startswith("def wb_batch_1():") and batch.count("movel(") == 3
+    assert sock.sent[1] == b"x\n"
+    assert (dispatcher.sent, dispatcher.coalesced) == (2, 1)
+    dispatcher.close()
+
+
+def test_single_motion_is_sent_as_one_line():
+    sock = FakeSocket()
+    dispatcher = Dispatcher(sock)
+    dispatcher.start()
+    assert dispatcher.submit_motion([move(0.1)]).wait(2.0)
+    assert sock.sent == [(move(0.1).to_urscript() + "\n").encode("utf-8")]
+    dispatcher.close()
+
+
+def test_submit_motion_rejects_non_motion_commands():
+    dispatcher = Dispatcher(FakeSocket())
+    with pytest.raises(ValueError):
+        dispatcher.submit_motion([Grip(40, 20)])
+    with pytest.raises(ValueError):
+        dispatcher.submit_motion([])
+
+
+def test_full_queue_applies_back_pressure():
+    dispatcher = Dispatcher(FakeSocket(), maxsize=1)
+    dispatcher.submit_program(b"a\n")
+    with pytest.raises(queue.Full):
+        dispatcher.submit_program(b"b\n", block=False)
+    with pytest.raises(queue.Full):
+        dispatcher.submit_program(b"b\n", timeout=0.05)
+    # Appena il thread svuota la coda il chiamante bloccato riparte
+    dispatcher.start()
+    assert dispatcher.submit_program(b"b\n", timeout=2.0).wait(2.0)
+    dispatcher.close()
+
+
+def test_emergency_stop_cancels_pending_and_bypasses_full_queue():
+    sock = FakeSocket()
+    dispatcher = Dispatcher(sock, maxsize=1)
+    pending = dispatcher.submit_program(b"a\n")
+    stop = dispatcher.emergency_stop()
+    dispatcher.start()
+    assert stop.wait(2.0)
+    assert pending.done() and not pending.ok
+    assert sock.sent == [STOP_SCRIPT]
+    assert dispatcher.cancelled == 1
+    dispatcher.close()
+
+
+def test_send_failure_fails_handles_and_reports():
+    errors = []
+    dispatcher = Dispatcher(FakeSocket(fail=True), on_error=errors.append)
+    handles = [dispatcher.submit_motion([move(0.1)]), dispatcher.submit_motion([move(0.2)])]
+    dispatcher.start()
+    assert not any(h.wait(2.0) for h in handles)
+    assert all(h.error == "socket chiuso" for h in handles)
+    assert errors == ["socket chiuso"]
+    dispatcher.close()
+
+
+def test_close_fails_pending_and_later_submissions():
+    dispatcher = Dispatcher(FakeSocket())
+    pending = dispatcher.submit_program(b"a\n")
+    dispatcher.close()
+    assert pending.done() and not pending.ok
+    late = dispatcher.submit_program(b"b\n")
+    assert late.done() and late.error == "dispatcher chiuso"
+
+
+def test_hold_waits_for_release_and_coalesces_queued_motions():
+    sock = FakeSocket()
+    dispatcher = Dispatcher(sock)
+    dispatcher.start()
+    running = dispatcher.submit_motion([move(0.1)], hold=5.0)
+    assert running.wait(2.0)
+    # Arrivano mentre il primo programma è ancora in esecuzione
+    queued = [dispatcher.submit_motion([move(0.2)]), dispatcher.submit_motion([move(0.3)])]
+    assert not any(h.wait(0.1) for h in queued)
+    assert dispatcher.busy()
+    running.release()
+    assert all(h.wait(2.0) for h in queued)
+    assert len(sock.sent) == 2 and sock.sent[1].decode("utf-8").count("movel(") == 2
+    assert not running.preempted
+    dispatcher.close()
+
+
+def test_hold_expires_and_marks_the_interrupted_program():
+    sock = FakeSocket()
+    dispatcher = Dispatcher(sock, before_send=lambda: len(sock.sent))
+    dispatcher.start()
+    running = dispatcher.submit_program(b"a\n", hold=0.1)
+    later = dispatcher.submit_program(b"b\n")
+    assert running.wait(2.0) and later.wait(2.0)
+    assert running.preempted
+    assert (running.mark, later.mark) == (0, 1)
+    dispatcher.close()
+
+
+def test_emergency_stop_does_not_wait_for_held_program():
+    sock = FakeSocket()
+    dispatcher = Dispatcher(sock)
+    dispatcher.start()
+    running = dispatcher.submit_program(b"a\n", hold=5.0)
+    assert running.wait(2.0)
+    queued = dispatcher.submit_program(b"b\n")
+    assert dispatcher.emergency_stop().wait(2.0)
+    assert not queued.ok and running.preempted
+    assert sock.sent == [b"a\n", STOP_SCRIPT]
+    dispatcher.close()
+
+
+def test_cancelled_job_is_never_sent():
+    sock = FakeSocket()
+    dispatcher = Dispatcher(sock)
+    handle = dispatcher.submit_program(b"a\n")
+    assert handle.cancel("timeout")
+    assert not handle.cancel()
+    dispatcher.start()
+    assert dispatcher.submit_program(b"b\n").wait(2.0)
+    assert sock.sent == [b"b\n"] and dispatcher.cancelled == 1
+    dispatcher.close()
+
+
+def test_emergency_stop_cancels_program_stuck_in_reconnect():
+    port = socket.create_server(("127.0.0.1", 0))
+    closed = port.getsockname()[1]
+    port.close()
+    conn = ManagedConnection("127.0.0.1", closed, "primary", Backoff(base=1.0, cap=1.0, attempts=5),
+                             connect_timeout=0.5)
+    dispatcher = Dispatcher(conn)
+    dispatcher.start()
+    stuck = dispatcher.submit_program(b"a\n")
+    time.sleep(0.1)
+    dispatcher.emergency_stop()
+    # Il programma in invio non verrà più mandato, nemmeno dopo una riconnessione
+    assert not stuck.wait(0.5)
+    assert stuck.error == "annullato da stop di emergenza"
+    dispatcher.close()
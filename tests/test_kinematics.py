@@ -0,0 +1,65 @@
+# tests/test_kinematics.py
+
+import numpy as np
+
+from gripper import template_tcp
+from kinematics import URKinematics, matrix_to_rotvec, rotvec_to_matrix, validate_poses
+
+# Configurazioni lontane dalle singolarità (|sin q3|, |sin q5| non piccoli)
+Q = np.array([
+    [0.3, -1.2, 1.4, -1.8, -1.5, 0.4],
+    [-1.0, -2.0, -1.0, 0.5, 1.0, -2.5],
+    [2.5, -0.7, 0.9, -1.0, 2.0, 1.0],
+])
+
+
+def test_rotvec_round_trip_including_near_pi():
+    rotvecs = np.array([[0.0, 0.0, 0.0], [0.1, -0.2, 0.3], [2.2, -2.2, 0.0], [0.0, np.pi - 1e-7, 0.0]])
+    back = matrix_to_rotvec(rotvec_to_matrix(rotvecs))
+    np.testing.assert_allclose(rotvec_to_matrix(back), rotvec_to_matrix(rotvecs), atol=1e-6)
+
+
+def test_ik_contains_the_configuration_used_for_fk():
+    for tcp in (None, template_tcp()):
+        kin = URKinematics(tcp=tcp)
+        solutions, valid = kin.ik(kin.fk(Q))
+        assert valid.any(axis=1).all()
+        for i, q in enumerate(Q):
+            assert np.abs(solutions[i][valid[i]] - q).max(axis=1).min() < 1e-6
+        # Tutte le soluzioni valide riportano alla stessa posa
+        poses = kin.fk_matrix(np.where(valid[..., None], solutions, 0.0))
+        expected = np.broadcast_to(kin.fk_matrix(Q)[:, None], poses.shape)
+        np.testing.assert_allclose(poses[valid], expected[valid], atol=1e-6)
+
+
+def test_nearest_ik_follows_the_start_branch():
+    kin = URKinematics(tcp=template_tcp())
+    # Piccoli passi a partire da Q[0]: deve restare sullo stesso ramo
+    path = Q[0] + np.linspace(0.0, 0.2, 5)[:, None]
+    joints, ok = kin.nearest_ik(kin.fk(path), Q[0])
+    assert ok.all()
+    np.testing.assert_allclose(joints, path, atol=1e-6)
+
+
+def test_nearest_ik_uses_2pi_equivalent_within_limits():
+    kin = URKinematics()
+    q = Q[0].copy()
+    q[5] -= 2 * np.pi      # 0.4 - 2π, ancora entro i limiti
+    joints, ok = kin.nearest_ik(kin.fk(q)[None], q)
+    assert ok[0]
+    np.testing.assert_allclose(joints[0], q, atol=1e-6)
+
+
+def test_ik_rejects_unreachable_pose():
+    kin = URKinematics()
+    _, valid = kin.ik([[2.0, 0.0, 0.2, 0.0, 3.14, 0.0]])
+    assert not valid.any()
+
+
+def test_validate_poses_names_the_joint_vectors():
+    kin = URKinematics(tcp=template_tcp())
+    tcp = kin.fk(Q[0]).tolist()
+    problems = validate_poses({"letter_sources": {"A": tcp, "B": [0.20, -1.50, 1.80, 0.00, 1.60, 0.00]},
+                               "slots": {"0": tcp}}, kin)
+    assert list(problems) == ["letter_sources.B"]
+    assert "vettore di giunti" in problems["letter_sources.B"]
@@ -0,0 +1,63 @@
+# tests/test_motion_model.py
+
+import math
+import time
+
+import numpy as np
+
+from commands import Grip, MoveJ, MoveL, WaitGrip
+from motion_model import GRIPPER_SETTLE, GRIPPER_SPEED_MM_S, MotionModel, trapezoid_time, trapezoid_times
+
+TOOL = (2.22, -2.22, 0.0)
+
+
+def test_trapezoid_and_triangle_profiles():
+    # Raggiunge v: d/v + v/a
+    assert math.isclose(trapezoid_time(0.5, 0.25, 1.0), 0.5 / 0.25 + 0.25)
+    # Troppo corto per arrivare a v: profilo triangolare 2·sqrt(d/a)
+    assert math.isclose(trapezoid_time(0.01, 0.25, 1.0), 2.0 * math.sqrt(0.01))
+    assert trapezoid_time(0.0, 0.25, 1.0) == 0.0 and trapezoid_time(0.1, 0.0, 1.0) == 0.0
+
+
+def test_vector_version_matches_the_scalar_one():
+    distances = np.array([[0.0, 0.01, -0.2], [0.5, 1.0, 0.0625]])
+    expected = [[trapezoid_time(d, 0.25, 1.0) for d in row] for row in distances]
+    np.testing.assert_allclose(trapezoid_times(distances, 0.25, 1.0), expected)
+
+
+def test_blend_shortens_only_between_moves_of_the_same_type():
+    model = MotionModel(0.25, 1.0)
+    start = (0.3, -0.2, 0.2) + TOOL
+    path = [MoveL((0.3, 0.0, 0.2) + TOOL, 1.0, 0.25), MoveL((0.3, 0.2, 0.2) + TOOL, 1.0, 0.25)]
+    sharp = model.sequence_time(path, tcp=start)
+    blended = model.sequence_time([MoveL(path[0].pose, 1.0, 0.25, 0.01)] + path[1:], tcp=start)
+    assert math.isclose(sharp, 2 * trapezoid_time(0.2, 0.25, 1.0))
+    assert math.isclose(sharp - blended, 0.25 / 1.0)
+    # Un raccordo verso un movej non fa risparmiare nulla
+    mixed = [MoveL(path[0].pose, 1.0, 0.25, 0.01), MoveJ((0.0,) * 6, 1.0, 1.0)]
+    assert model.command_times(mixed, tcp=start, joints=(0.0,) * 6)[0] == trapezoid_time(0.2, 0.25, 1.0)
+
+
+def test_non_blocking_grip_overlaps_the_motion():
+    model = MotionModel(0.25, 1.0)
+    start = (0.3, -0.2, 0.2) + TOOL
+    move = MoveL((0.3, 0.2, 0.2) + TOOL, 1.0, 0.25)
+    grip = 45 / GRIPPER_SPEED_MM_S + GRIPPER_SETTLE
+    blocking = model.sequence_time([Grip(45, 20), move], tcp=start, gripper_width=0)
+    overlapped = model.sequence_time([Grip(45, 20, blocking=False), move, WaitGrip()], tcp=start, gripper_width=0)
+    assert math.isclose(blocking, grip + trapezoid_time(0.4, 0.25, 1.0))
+    # Il movimento dura più dell'apertura: la barriera non aspetta nulla
+    assert math.isclose(overlapped, trapezoid_time(0.4, 0.25, 1.0))
+    assert grip < trapezoid_time(0.4, 0.25, 1.0)
+
+
+def test_estimate_matches_the_mock_controller(make_robot, controller):
+    robot = make_robot(motion={"peephole": False})
+    moves = [MoveL((0.3, 0.1, 0.2) + TOOL, 1.2, 0.25), MoveL((0.1, 0.1, 0.2) + TOOL, 1.2, 0.25)]
+    estimate = robot.estimate_time(moves)
+    assert math.isclose(estimate, trapezoid_time(0.3, 0.25, 1.2) + trapezoid_time(0.2, 0.25, 1.2))
+    start = time.monotonic()
+    assert robot.run_sequence(moves)
+    # Tempo robot del mock (4 volte più veloce): stima + caricamento e campionamento dello stato
+    elapsed = (time.monotonic() - start) * controller.time_scale
+    assert estimate <= elapsed < estimate + 1.0
@@ -0,0 +1,90 @@
+# tests/test_peephole.py
+
+from commands import Grip, MoveJ, MoveL, WaitGrip
+from motion_model import MotionModel
+from peephole import (blend_pass_through, drop_out_and_back, drop_redundant_grips,
+                      drop_zero_length, merge_collinear, optimize)
+
+ROT = (2.2, -2.2, 0.0)
+
+
+def movel(x, y, z=0.1):
+    return MoveL((x, y, z) + ROT, 0.2, 0.2)
+
+
+def test_drop_zero_length_skips_move_to_current_pose():
+    commands = [movel(0.0, 0.0), movel(0.1, 0.0), movel(0.1, 0.0)]
+    result, changed = drop_zero_length(commands, tcp=[0.0, 0.0, 0.1, *ROT])
+    assert result == [movel(0.1, 0.0)]
+    assert changed == 2
+
+
+def test_drop_zero_length_keeps_move_when_pose_unknown():
+    # Dopo un movej la posa del TCP non è nota: il movel resta
+    commands = [MoveJ((0.0,) * 6, 1.0, 1.0), movel(0.0, 0.0)]
+    result, changed = drop_zero_length(commands, tcp=[0.0, 0.0, 0.1, *ROT])
+    assert result == commands
+    assert changed == 0
+
+
+def test_drop_out_and_back():
+    commands = [movel(0.2, 0.0), movel(0.0, 0.0), Grip(40, 20)]
+    result, changed = drop_out_and_back(commands, tcp=[0.0, 0.0, 0.1, *ROT])
+    assert result == [Grip(40, 20)]
+    assert changed == 2
+
+
+def test_drop_out_and_back_keeps_trip_with_grip_in_between():
+    commands = [movel(0.2, 0.0), Grip(40, 20), movel(0.0, 0.0)]
+    result, changed = drop_out_and_back(commands, tcp=[0.0, 0.0, 0.1, *ROT])
+    assert result == commands
+    assert changed == 0
+
+
+def test_merge_collinear_follows_merged_pose():
+    # (0.1,0) sta su (0,0)->(0.2,0) e si toglie; (0.3,0.1) NON sta su
+    # (0.2,0)->(0.5,0.2) e deve restare
+    commands = [movel(0.1, 0.0), movel(0.2, 0.0), movel(0.3, 0.1), movel(0.5, 0.2)]
+    result, changed = merge_collinear(commands, tcp=[0.0, 0.0, 0.1, *ROT])
+    assert [c.pose[:2] for c in result] == [(0.2, 0.0), (0.3, 0.1), (0.5, 0.2)]
+    assert changed == 1
+
+
+def test_merge_collinear_keeps_different_speeds():
+    slow = MoveL((0.2, 0.0, 0.1) + ROT, 0.1, 0.05)
+    commands = [movel(0.1, 0.0), slow]
+    result, changed = merge_collinear(commands, tcp=[0.0, 0.0, 0.1, *ROT])
+    assert result == commands
+    assert changed == 0
+
+
+def test_drop_redundant_grips():
+    commands = [Grip(80, 20), Grip(40, 20), movel(0.1, 0.0), Grip(40, 20), WaitGrip()]
+    result, changed = drop_redundant_grips(commands, gripper_width=None)
+    # Il primo Grip è sostituito dal secondo, il terzo è già alla larghezza,
+    # il WaitGrip non ha nulla da aspettare (Grip bloccante)
+    assert result == [Grip(40, 20), movel(0.1, 0.0)]
+    assert changed == 3
+
+
+def test_drop_redundant_grips_keeps_wait_after_non_blocking_grip():
+    commands = [Grip(80, 20, blocking=False), movel(0.1, 0.0), WaitGrip()]
+    result, changed = drop_redundant_grips(commands, gripper_width=40)
+    assert result == commands
+    assert changed == 0
+
+
+def test_blend_pass_through_only_between_moves_of_same_type():
+    commands = [movel(0.1, 0.0), movel(0.2, 0.0), Grip(40, 20), movel(0.3, 0.0)]
+    result, changed = blend_pass_through(commands, blend_radius=0.01)
+    assert [getattr(c, "r", None) for c in result] == [0.01, 0.0, None, 0.0]
+    assert changed == 1
+    assert blend_pass_through(commands) == (commands, 0)
+
+
+def test_optimize_reports_only_passes_that_changed_something():
+    commands = [movel(0.0, 0.0), movel(0.1, 0.0), movel(0.2, 0.0), Grip(40, 20), Grip(40, 20)]
+    result, rewrites = optimize(commands, MotionModel(max_speed=0.5, max_acc=1.0), tcp=[0.0, 0.0, 0.1, *ROT])
+    assert result == [movel(0.2, 0.0), Grip(40, 20)]
+    assert [r.name for r in rewrites] == ["zero_length", "collinear", "gripper"]
+    assert all(r.saved >= 0.0 for r in rewrites)
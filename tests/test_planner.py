@@ -0,0 +1,63 @@
+# tests/test_planner.py
+
+import itertools
+import math
+
+import numpy as np
+
+from motion_model import MotionModel, trapezoid_time
+from planner import EXACT_JOBS, order_jobs, travel_length, travel_time
+
+TOOL = [2.22, -2.22, 0.0]
+
+
+def poses(points):
+    return np.array([list(p) + [0.1] + TOOL for p in points])
+
+
+def brute_force(sources, slots, start):
+    return min(travel_length(list(order), sources, slots, start)
+               for order in itertools.permutations(range(len(sources))))
+
+
+def test_order_finds_the_shortest_path():
+    rng = np.random.default_rng(5)
+    for start in (None, [0.3, -0.2, 0.2] + TOOL):
+        for _ in range(10):
+            sources = poses(rng.uniform(0.1, 0.4, size=(6, 2)))
+            slots = poses(rng.uniform(0.1, 0.4, size=(6, 2)))
+            order = order_jobs(sources, slots, start)
+            assert sorted(order) == list(range(6))
+            assert math.isclose(travel_length(order, sources, slots, start), brute_force(sources, slots, start))
+
+
+def test_long_words_use_the_heuristic_and_never_do_worse():
+    rng = np.random.default_rng(7)
+    n = EXACT_JOBS + 3
+    sources = poses(rng.uniform(0.1, 0.4, size=(n, 2)))
+    slots = poses(rng.uniform(0.1, 0.4, size=(n, 2)))
+    start = [0.3, -0.2, 0.2] + TOOL
+    order = order_jobs(sources, slots, start)
+    assert sorted(order) == list(range(n))
+    assert travel_length(order, sources, slots, start) <= travel_length(list(range(n)), sources, slots, start)
+
+
+def test_order_starts_from_the_nearest_source():
+    # Lavori in fila: dalla posizione vicina all'ultimo conviene partire da lì
+    sources = poses([(0.1 * i, 0.0) for i in range(1, 5)])
+    slots = poses([(0.1 * i, 0.05) for i in range(1, 5)])
+    assert order_jobs(sources, slots, [0.45, 0.0, 0.1] + TOOL) == [3, 2, 1, 0]
+    assert order_jobs(sources, slots, [0.05, 0.0, 0.1] + TOOL) == [0, 1, 2, 3]
+    assert order_jobs(sources[:1], slots[:1]) == [0]
+
+
+def test_travel_time_follows_the_order():
+    sources = poses([(0.1, 0.0), (0.3, 0.0)])
+    slots = poses([(0.1, 0.2), (0.3, 0.2)])
+    start = [0.1, 0.0, 0.1] + TOOL
+    model = MotionModel(0.25, 1.0)
+    # sorgente 0 -> slot 0 -> sorgente 1 -> slot 1
+    legs = [0.0, 0.2, math.hypot(0.2, 0.2), 0.2]
+    expected = sum(trapezoid_time(d, 0.25, 1.0) for d in legs)
+    assert math.isclose(travel_time([0, 1], sources, slots, start, model), expected)
+    assert travel_time([], sources, slots, start, model) == 0.0
@@ -0,0 +1,43 @@
+# tests/test_pose_table.py
+
+import numpy as np
+
+from planner import _cost_tables, order_jobs, travel_length
+from pose_table import PoseTable
+
+TOOL = [2.22, -2.22, 0.0]
+
+
+def make_table() -> PoseTable:
+    sources = {letter: [0.20 + 0.04 * i, -0.30, 0.05] + TOOL for i, letter in enumerate("ABCDE")}
+    slots = {str(j): [0.40 - 0.05 * j, -0.10 + 0.02 * j, 0.05] + TOOL for j in range(5)}
+    return PoseTable(sources, slots, z_pick_offset=-0.04)
+
+
+def test_low_poses_are_offset_in_z():
+    table = make_table()
+    np.testing.assert_allclose(table.source_down[:, 2], table.source_up[:, 2] - 0.04)
+    np.testing.assert_allclose(table.slot_down[:, [0, 1, 3, 4, 5]], table.slot_up[:, [0, 1, 3, 4, 5]])
+    assert table.lookup("AZ", [0, 9])[0].tolist() == [0, -1]
+    assert table.pick_place_poses(1, 2)[1] == table.source_down[1].tolist()
+
+
+def test_job_costs_match_the_planner_tables():
+    table = make_table()
+    sources, slots = np.array([4, 0, 2, 1]), np.array([0, 3, 1, 4])
+    start = [0.3, -0.2, 0.2] + TOOL
+    expected = _cost_tables(table.source_up[sources], table.slot_up[slots], start)
+    for got, want in zip(table.job_costs(sources, slots, start), expected):
+        np.testing.assert_allclose(got, want)
+    assert not table.job_costs(sources, slots)[2].any()
+
+
+def test_planner_gives_the_same_plan_from_the_table_costs():
+    table = make_table()
+    sources, slots = np.array([4, 0, 2, 1, 3]), np.array([0, 3, 1, 4, 2])
+    start = [0.3, -0.2, 0.2] + TOOL
+    up, down = table.source_up[sources], table.slot_up[slots]
+    costs = table.job_costs(sources, slots, start)
+    order = order_jobs(up, down, start, costs)
+    assert order == order_jobs(up, down, start)
+    assert travel_length(order, up, down, start, costs) <= travel_length(list(range(5)), up, down, start, costs)
@@ -0,0 +1,231 @@
+# tests/test_robot_control.py
+
+import threading
+import time
+
+import pytest
+
+import robot_control
+from commands import DONE_REGISTER, Grip, MoveL
+
+HOME = [0.3, -0.2, 0.2, 2.22, -2.22, 0.0]
+
+
+def at(x, y, z=0.2):
+    return [x, y, z] + HOME[3:]
+
+
+def settle():
+    """Il mock esegue i programmi in un suo thread: tempo per contare quelli già ricevuti."""
+    time.sleep(0.2)
+
+
+def wait_running(controller, timeout=5.0):
+    """Aspetta che il mock stia eseguendo un programma (es. prima di uno stop)."""
+    deadline = time.monotonic() + timeout
+    while not controller.program_running:
+        assert time.monotonic() < deadline, "nessun programma in esecuzione"
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("rtde", [True, False])
+def test_move_returns_when_the_motion_is_finished(controller, make_robot, rtde):
+    # Stato da RTDE o, senza, dalla porta 30002
+    robot = make_robot(rtde=rtde)
+    assert robot.move_linear(at(0.3, 0.1))
+    assert not controller.program_running
+    assert controller.model.tcp_pose[:3] == [0.3, 0.1, 0.2]
+    assert robot.move_joints([0.2, -1.5708, 1.5708, -1.5708, -1.5708, 0.0])
+    assert controller.model.joints[0] == 0.2
+
+
+def test_wait_times_out_on_a_slow_motion(controller, make_robot):
+    robot = make_robot()
+    # Timeout molto più corto del movimento stimato
+    robot.TIMEOUT_FACTOR, robot.TIMEOUT_MARGIN = 0.1, 0.0
+    assert not robot.move_linear(at(0.3, 0.2))
+    # Il movimento successivo parte comunque (l'attesa scaduta libera la coda)
+    robot.TIMEOUT_FACTOR, robot.TIMEOUT_MARGIN = 2.0, 5.0
+    assert robot.move_linear(at(0.3, -0.2))
+    assert controller.model.tcp_pose[:2] == [0.3, -0.2]
+
+
+def test_concurrent_moves_do_not_interrupt_each_other(controller, make_robot):
+    robot = make_robot()
+    results = {}
+
+    def move(name, pose, delay):
+        time.sleep(delay)
+        results[name] = (robot.move_linear(pose), list(controller.model.tcp_pose), time.monotonic())
+
+    first = threading.Thread(target=move, args=("first", at(0.3, 0.1), 0.0))
+    second = threading.Thread(target=move, args=("second", at(0.1, 0.1), 0.2))
+    first.start()
+    second.start()
+    first.join(10.0)
+    second.join(10.0)
+
+    # Il secondo programma parte solo dopo la fine del primo: nessuna interruzione
+    assert results["first"][0] and results["second"][0]
+    assert controller.stats["preempted"] == 0
+    assert results["first"][1][:2] == [0.3, 0.1]
+    assert results["second"][1][:2] == [0.1, 0.1]
+    assert results["first"][2] < results["second"][2]
+
+
+def test_emergency_stop_fails_the_wait_and_skips_the_queue(controller, make_robot):
+    robot = make_robot()
+    results = []
+
+    def move(pose):
+        results.append(robot.move_linear(pose))
+
+    movers = [threading.Thread(target=move, args=(at(0.3, 0.2),)),
+              threading.Thread(target=move, args=(at(0.1, 0.1),))]
+    movers[0].start()
+    wait_running(controller)
+    movers[1].start()
+    time.sleep(0.2)
+    # Il secondo movimento è in coda dietro al primo: lo stop scavalca entrambi
+    assert robot.emergency_stop()
+    for mover in movers:
+        mover.join(10.0)
+    settle()
+    assert results == [False, False]
+    assert controller.stats["programs"] == 2      # movimento + stopl, il secondo mai inviato
+
+
+def test_emergency_stop_drops_the_gripper_service(controller, make_robot):
+    from conftest import free_ports
+    robot = make_robot(gripper={"persistent_service": True, "service_port": free_ports(1)[0]})
+    assert robot.start_gripper_service()
+    stopped = robot.service
+    assert robot.emergency_stop()
+    assert robot.service is None and not stopped.connected
+    # Il comando successivo riavvia il servizio
+    assert robot.move_linear(at(0.3, 0.0))
+    assert robot.service is not None and robot.service is not stopped
+
+
+POSES = {
+    "letter_sources": {"A": at(0.30, -0.20, 0.10), "B": at(0.30, -0.10, 0.10)},
+    "slots": {"0": at(0.40, -0.20, 0.10), "1": at(0.40, -0.10, 0.10)},
+}
+STEPWISE = {"motion": {"compiled_sequences": False, "overlap_gripper": False},
+            "gripper": {"verify_grasp": False}}
+
+
+def test_stepwise_place_letter_succeeds(make_robot):
+    robot = make_robot(POSES, **STEPWISE)
+    assert robot.place_letter_in_slot("A", 0)
+    assert robot.occupied_slots == {"0"}
+    assert robot.telemetry.counters["letters_placed"] == 1
+
+
+def test_stepwise_place_letter_stops_at_first_failed_step(controller, make_robot):
+    robot = make_robot(POSES, **STEPWISE)
+    result = []
+    worker = threading.Thread(target=lambda: result.append(robot.place_letter_in_slot("A", 0)))
+    worker.start()
+    wait_running(controller)
+    robot.emergency_stop()
+    settle()
+    programs = controller.stats["programs"]
+    worker.join(30.0)
+    settle()
+    assert result == [False]
+    # Nessun passo successivo inviato dopo lo stop, e la lettera non risulta depositata
+    assert controller.stats["programs"] == programs
+    assert robot.occupied_slots == set()
+    assert robot.telemetry.counters["letters_placed"] == 0
+
+
+def test_grip_reports_an_unconfirmed_program(controller, make_robot):
+    robot = make_robot(POSES, **STEPWISE)
+    # Il programma del gripper impiega più di così a essere caricato: timeout
+    robot.GRIP_TIMEOUT = 0.05
+    assert not robot.grip(True)
+    assert robot.failed_grasp is None
+    settle()
+    programs = controller.stats["programs"]
+    assert not robot.open_while_moving(at(0.3, -0.2))
+    settle()
+    # Apertura non confermata: il movimento non parte
+    assert controller.stats["programs"] == programs + 1
+
+
+def test_invalid_poses_are_rejected_before_moving(controller, make_robot):
+    # Come nel config: lettera C e slot 2 scritti come vettori di giunti
+    poses = {
+        "letter_sources": {**POSES["letter_sources"], "C": [0.30, -1.50, 1.80, 0.00, 1.60, 0.00]},
+        "slots": {**POSES["slots"], "2": [0.60, -1.40, 1.90, 0.00, 1.60, 0.00]},
+    }
+    robot = make_robot(poses, kinematics={"check_poses": True}, **STEPWISE)
+    assert robot.pose_table.source_valid.tolist() == [True, True, False]
+    assert robot.pose_table.slot_valid.tolist() == [True, True, False]
+    programs = controller.stats["programs"]
+    assert not robot.place_letter_in_slot("C", 0)
+    assert not robot.place_letter_in_slot("A", 2)
+    assert controller.stats["programs"] == programs
+    # place_word salta la lettera con la posa non valida e posiziona le altre
+    assert robot.place_word("AC", [0, 1], compiled=True) == [("A", 0)]
+
+
+@pytest.mark.parametrize("peephole", [False, True])
+def test_gripper_counters_follow_the_executed_program(make_robot, peephole):
+    robot = make_robot(motion={"peephole": peephole})
+    open_ = Grip(*robot.grip_open)
+    # Il secondo Grip non cambia nulla: tolto una volta sola e contato come saltato
+    assert robot.run_sequence([open_, MoveL(tuple(at(0.3, -0.1)), 1.0, 0.2), open_])
+    assert robot.telemetry.counters["gripper_actuations"] == 1
+    assert robot.telemetry.counters["gripper_skipped"] == 1
+
+
+def test_gripper_counters_ignore_an_interrupted_program(controller, make_robot):
+    robot = make_robot()
+    close = Grip(*robot.grip_close)
+    result = []
+    worker = threading.Thread(target=lambda: result.append(robot.run_sequence(
+        [MoveL(tuple(at(0.3, 0.1)), 1.0, 0.1), close, Grip(*robot.grip_open)])))
+    worker.start()
+    wait_running(controller)
+    robot.emergency_stop()
+    worker.join(30.0)
+    assert result == [False]
+    assert robot.telemetry.counters["gripper_actuations"] == 0
+    assert robot.telemetry.counters["gripper_skipped"] == 0
+
+
+COMPILED = {"motion": {"compiled_sequences": True}, "gripper": {"verify_grasp": True}}
+
+
+def test_compiled_pick_and_place_is_one_program(controller, make_robot):
+    robot = make_robot(POSES, **COMPILED)
+    programs = controller.stats["programs"]
+    assert robot.place_letter_in_slot("A", 0)
+    assert controller.stats["programs"] == programs + 1
+    # Fine riconosciuta dal registro scritto a fine programma
+    assert controller.registers[DONE_REGISTER] == robot._sequence_id
+    assert controller.model.tcp_pose == POSES["slots"]["0"]
+    assert robot.occupied_slots == {"0"}
+
+
+def test_compiled_word_is_one_program(controller, make_robot):
+    robot = make_robot(POSES, **COMPILED)
+    programs = controller.stats["programs"]
+    placed = robot.place_word("AB", [0, 1])
+    assert sorted(placed) == [("A", 0), ("B", 1)]
+    assert controller.stats["programs"] == programs + 1
+    assert robot.occupied_slots == {"0", "1"}
+    assert robot.telemetry.counters["letters_placed"] == 2
+
+
+def test_compiled_program_that_ends_early_fails(controller, make_robot, monkeypatch):
+    # Come un halt a metà programma: il registro di fine sequenza non viene scritto
+    compile_program = robot_control.compile_program
+    monkeypatch.setattr(robot_control, "compile_program", lambda *args: "\n".join(
+        line for line in compile_program(*args).splitlines()
+        if f"register({DONE_REGISTER}," not in line) + "\n")
+    robot = make_robot(POSES, **COMPILED)
+    assert not robot.place_letter_in_slot("A", 0)
+    assert robot.occupied_slots == set()
@@ -0,0 +1,49 @@
+# tests/test_rtde_client.py
+
+import asyncio
+import time
+
+import pytest
+
+from rtde_client import RTDEClient
+
+
+@pytest.fixture
+def rtde(controller):
+    client = RTDEClient("127.0.0.1", controller.ports["rtde"])
+    client.connect()
+    yield client
+    client.close()
+
+
+def test_stream_starts_from_fresh_samples(rtde):
+    # Nessuno stream attivo: i campioni di questo intervallo non si accumulano
+    time.sleep(0.3)
+    started = time.monotonic()
+    first = next(rtde.stream(timeout=1.0))
+    assert first["received_at"] >= started
+    # Finito lo stream, il buffer non tiene i campioni per quello successivo
+    time.sleep(0.3)
+    started = time.monotonic()
+    assert next(rtde.stream(timeout=1.0))["received_at"] >= started
+
+
+def test_stream_yields_samples_in_order(rtde):
+    timestamps = []
+    for sample in rtde.stream(timeout=1.0):
+        timestamps.append(sample["timestamp"])
+        if len(timestamps) == 10:
+            break
+    assert timestamps == sorted(timestamps) and len(set(timestamps)) == 10
+
+
+def test_closed_loop_does_not_stop_the_reader(rtde):
+    loop = asyncio.new_event_loop()
+    samples = rtde.astream()
+    assert loop.run_until_complete(samples.__anext__())["actual_q"]
+    # Il loop si chiude senza chiudere il generatore: il thread di lettura prosegue
+    loop.close()
+    sequence = rtde.sequence
+    assert rtde.wait_for_update(sequence + 5, timeout=1.0) is not None
+    assert rtde.alive and rtde.error is None
+    assert not rtde._subscribers
@@ -0,0 +1,54 @@
+# tests/test_sim_benchmark.py
+
+import os
+import string
+
+import pytest
+
+import sim_benchmark
+from robot_control import Robot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOL = [2.274, -2.17, 0.021]
+
+
+def table_poses() -> dict:
+    """Tutte le lettere su una griglia 6×5 e 8 slot, pose TCP raggiungibili."""
+    sources = {letter: [0.20 + 0.03 * (i % 6), -0.30 + 0.03 * (i // 6), 0.047] + TOOL
+               for i, letter in enumerate(string.ascii_uppercase)}
+    slots = {str(j): [0.385, -0.25 + 0.03 * j, 0.047] + TOOL for j in range(8)}
+    return {"letter_sources": sources, "slots": slots}
+
+
+@pytest.fixture
+def results(monkeypatch):
+    """Esiti reali di place_letter_in_slot durante il benchmark, sul tavolo di table_poses()."""
+    monkeypatch.chdir(ROOT)
+    load_config = sim_benchmark.load_config
+    monkeypatch.setattr(sim_benchmark, "load_config",
+                        lambda path: {**load_config(path), "poses": table_poses()})
+    outcomes = []
+    place = Robot.place_letter_in_slot
+
+    def recorded(self, letter, slot_index, compiled=None):
+        outcomes.append(place(self, letter, slot_index, compiled))
+        return outcomes[-1]
+
+    monkeypatch.setattr(Robot, "place_letter_in_slot", recorded)
+    return outcomes
+
+
+def test_benchmark_places_every_letter_in_simulation(results):
+    result = sim_benchmark.run(10, "easy", seed=3)
+    assert results and all(results)
+    assert result["placed"] == len(results) and result["failed"] == 0 and result["skipped"] == 0
+    assert result["programs"] >= result["placed"] and result["sim_time"] > 0
+
+
+def test_benchmark_counts_failed_placements_separately(results, monkeypatch):
+    # Nessun programma arriva al controller (es. connessione persa)
+    monkeypatch.setattr(Robot, "_send_program", lambda self, *args, **kwargs: False)
+    monkeypatch.setattr(Robot, "_run_service_batches", lambda self, commands: False)
+    result = sim_benchmark.run(10, "easy", seed=3)
+    assert results and not any(results)
+    assert result["placed"] == 0 and result["failed"] == len(results)
@@ -0,0 +1,132 @@
+# tests/test_startup.py
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import main
+import startup
+import tts_module
+from startup import Startup
+
+
+@pytest.fixture
+def words_file(tmp_path):
+    path = tmp_path / "words.json"
+    path.write_text(json.dumps(["GATTO", "LUNA", "SOLE"]), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def slow_startup(monkeypatch, make_robot):
+    """Startup con robot sul controller simulato e camera che impiega 0.3 s a non rispondere."""
+    def robot(self):
+        time.sleep(0.3)
+        return make_robot()
+
+    def camera(camera_id):
+        time.sleep(0.3)
+        return None
+
+    monkeypatch.setattr(Startup, "_make_robot", robot)
+    monkeypatch.setattr(startup, "open_camera", camera)
+
+
+def test_startup_runs_the_tasks_together(slow_startup, words_file):
+    async def go():
+        boot = Startup({}, words_file).start()
+        return boot, await boot.ready()
+
+    boot, resources = asyncio.run(go())
+    try:
+        assert resources["words"][0] == ["GATTO", "LUNA", "SOLE"]
+        assert resources["camera"] is None
+        assert set(boot.durations) == {"robot", "gripper", "words", "camera", "tts"}
+        # robot e camera si sovrappongono: il totale è quello del più lento
+        assert boot.telemetry.timings["startup_ready"] < boot.durations["robot"] + boot.durations["camera"]
+    finally:
+        resources["robot"].close()
+
+
+def test_missing_words_fail_and_close_releases_the_robot(slow_startup, tmp_path):
+    async def go():
+        boot = Startup({}, str(tmp_path / "nessuna.json")).start()
+        with pytest.raises(FileNotFoundError):
+            await boot.ready()
+        await boot.close()
+        return boot.tasks["robot"].result()
+
+    robot = asyncio.run(go())
+    assert robot.pool is None and robot.dispatcher is None
+
+
+class FakeEngine:
+    def __init__(self, threads):
+        self.threads = threads
+        self.threads.append(("init", threading.get_ident()))
+
+    def setProperty(self, name, value):
+        pass
+
+    def say(self, text):
+        self.threads.append(("say", threading.get_ident()))
+
+    def runAndWait(self):
+        pass
+
+    def stop(self):
+        self.threads.append(("stop", threading.get_ident()))
+
+
+def test_tts_engine_lives_on_one_thread(monkeypatch):
+    threads = []
+    fake = type("pyttsx3", (), {"init": staticmethod(lambda: FakeEngine(threads))})
+    monkeypatch.setattr(tts_module, "pyttsx3", fake)
+    monkeypatch.setattr(tts_module, "_engine", None)
+
+    async def go():
+        assert await tts_module.warm_up_async()
+        await asyncio.gather(tts_module.say_async("uno"), tts_module.say_async("due"))
+        await asyncio.to_thread(tts_module.say, "tre")
+
+    asyncio.run(go())
+    tts_module.shutdown()
+    assert [step for step, _ in threads] == ["init", "say", "say", "say", "stop"]
+    assert len({ident for _, ident in threads}) == 1
+    assert threading.get_ident() not in {ident for _, ident in threads}
+
+
+def test_run_closes_robot_and_camera_when_word_selection_fails(monkeypatch):
+    closed = []
+
+    class Robot:
+        def close(self):
+            closed.append("robot")
+
+    class Camera:
+        def release(self):
+            closed.append("camera")
+
+    class FakeStartup:
+        def __init__(self, config, words_path):
+            pass
+
+        def start(self):
+            return self
+
+        async def ready(self):
+            return {"robot": Robot(), "words": (["GATTO"], {}), "camera": Camera(), "tts": False}
+
+    def select_word(words, index=None):
+        raise KeyError("indice rotto")
+
+    monkeypatch.setattr(main, "Startup", FakeStartup)
+    monkeypatch.setattr(main, "select_word", select_word)
+    monkeypatch.setattr("builtins.input", lambda prompt="": "easy")
+
+    with pytest.raises(KeyError):
+        asyncio.run(main.run({}))
+    assert sorted(closed) == ["camera", "robot"]
@@ -0,0 +1,78 @@
+# tests/test_table_grid.py
+
+import math
+
+import numpy as np
+import pytest
+
+from gripper import template_tcp
+from kinematics import URKinematics, matrix_to_rotvec, validate_poses
+from table_grid import build_grid_poses, grid_offsets, load_grid_poses, resolve_poses, save_table_frame
+
+# Pinza rivolta verso il basso sul marker (come la posa A del config)
+FRAME = [0.30, -0.25, 0.05, 2.274, -2.17, 0.021]
+
+
+def tool_down(yaw: float) -> np.ndarray:
+    """Orientamento con z del TCP verso il basso e asse x ruotato di `yaw` nel piano."""
+    rotation = np.array([[math.cos(yaw), -math.sin(yaw), 0.0], [math.sin(yaw), math.cos(yaw), 0.0], [0.0, 0.0, 1.0]])
+    return rotation @ np.diag([1.0, -1.0, -1.0])
+
+
+def config(**grid):
+    return {
+        "safety": {"z_pick_offset": -0.04},
+        "vision": {"aruco_size_mm": 40},
+        "grid": {"cell_size_mm": 50, "rows": 2, "cols": 3, "generate_slots": True, **grid},
+        "poses": {"letter_sources": {"A": FRAME}, "slots": {"0": FRAME}},
+    }
+
+
+def test_offsets_are_row_major():
+    offsets = grid_offsets(2, 3, 0.05, [0.01, 0.0])
+    np.testing.assert_allclose(offsets, [[0.01, 0.0], [0.06, 0.0], [0.11, 0.0],
+                                         [0.01, 0.05], [0.06, 0.05], [0.11, 0.05]])
+
+
+@pytest.mark.parametrize("yaw", [0.0, 0.5, math.pi / 2])
+def test_slots_follow_the_frame_axes(yaw):
+    tool = tool_down(yaw)
+    frame = FRAME[:3] + matrix_to_rotvec(tool).tolist()
+    poses = build_grid_poses({"frame": frame, "cell_size": 0.05, "rows": 2, "cols": 3,
+                              "slot_origin": [0.0, 0.0], "lift": 0.04})["slots"]
+    # Colonne lungo l'asse x del TCP, righe lungo il suo asse y
+    np.testing.assert_allclose(np.subtract(poses["1"][:3], poses["0"][:3]), 0.05 * tool[:, 0], atol=1e-6)
+    np.testing.assert_allclose(np.subtract(poses["3"][:3], poses["0"][:3]), 0.05 * tool[:, 1], atol=1e-6)
+    # Tutte all'altezza di presa + lift, con l'orientamento del frame
+    assert all(math.isclose(p[2], 0.09) for p in poses.values())
+    assert all(p[3:] == pytest.approx(frame[3:], abs=1e-6) for p in poses.values())
+
+
+def test_generated_poses_are_reachable():
+    poses = build_grid_poses({"frame": FRAME, "cell_size": 0.05, "rows": 2, "cols": 3,
+                              "slot_origin": [0.0, 0.0], "lift": 0.04,
+                              "magazine": {"letters": "ABCD", "cols": 2, "origin": [-0.1, 0.05]}})
+    assert len(poses["slots"]) == 6 and list(poses["letter_sources"]) == list("ABCD")
+    assert validate_poses(poses, URKinematics(tcp=template_tcp()), z_pick_offset=-0.04) == {}
+
+
+def test_grid_poses_are_cached_until_the_parameters_change(tmp_path, capsys):
+    assert load_grid_poses(config(), str(tmp_path)) is None
+    save_table_frame(FRAME, str(tmp_path))
+    first = load_grid_poses(config(), str(tmp_path))
+    assert "rigenerate" in capsys.readouterr().out
+    assert load_grid_poses(config(), str(tmp_path)) == first
+    assert "rigenerate" not in capsys.readouterr().out
+    # Griglia diversa: si rigenera
+    assert len(load_grid_poses(config(cols=4), str(tmp_path))["slots"]) == 8
+    assert "rigenerate" in capsys.readouterr().out
+
+
+def test_resolve_poses_replaces_slots_and_merges_the_magazine(tmp_path):
+    save_table_frame(FRAME, str(tmp_path))
+    manual = resolve_poses({**config(), "grid": {"generate_slots": False}}, str(tmp_path))
+    assert manual["slots"] == {"0": FRAME}
+    generated = resolve_poses(config(magazine={"letters": "BC", "cols": 2, "origin_mm": [0, 120]}), str(tmp_path))
+    assert list(generated["slots"]) == [str(k) for k in range(6)]
+    assert list(generated["letter_sources"]) == ["A", "B", "C"]
+    assert generated["letter_sources"]["A"] == FRAME
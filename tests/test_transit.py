@@ -0,0 +1,37 @@
+# tests/test_transit.py
+
+import pytest
+
+from transit import TransitBlocked, conflicts, plan_transit
+
+ROT = [3.14, 0.0, 0.0]
+START = [0.30, -0.30, 0.10] + ROT
+END = [0.30, 0.10, 0.10] + ROT
+
+
+def tile(x, y, z=0.10):
+    return [x, y, z] + ROT
+
+
+def test_clear_path_is_direct():
+    # Tessera lontana dal tratto: nessun via-point
+    assert plan_transit(START, END, [tile(0.50, -0.10)], radius=0.04, clearance=0.03, safe_height=0.30) == []
+    assert plan_transit(START, END, [], radius=0.04, clearance=0.03, safe_height=0.30) == []
+
+
+def test_crossed_tile_lifts_above_start_and_end():
+    via = plan_transit(START, END, [tile(0.31, -0.10), tile(0.30, 0.0, 0.12)],
+                       radius=0.04, clearance=0.03, safe_height=0.30)
+    # La quota libera l'ostacolo più alto; xy e orientamento restano quelli degli estremi
+    assert via == [START[:2] + [pytest.approx(0.15)] + ROT, END[:2] + [pytest.approx(0.15)] + ROT]
+
+
+def test_tiles_under_the_endpoints_do_not_count():
+    obstacles = [tile(*START[:2]), tile(*END[:2])]
+    assert not conflicts(START, END, obstacles, radius=0.04, clearance=0.03).any()
+    assert plan_transit(START, END, obstacles, radius=0.04, clearance=0.03, safe_height=0.30) == []
+
+
+def test_too_high_obstacle_blocks_the_transit():
+    with pytest.raises(TransitBlocked):
+        plan_transit(START, END, [tile(0.30, -0.10, 0.29)], radius=0.04, clearance=0.03, safe_height=0.30)
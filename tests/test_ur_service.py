@@ -0,0 +1,85 @@
+# tests/test_ur_service.py
+
+import socket
+import threading
+
+import pytest
+
+from commands import CheckGrasp, Grip, MoveJ, MoveL, WaitGrip
+from ur_service import N_ARGS, OP_GRIP, OP_GRIP_WAIT, OP_MOVEJ, OP_MOVEL, URService, encode_command
+
+
+def decode(line: str):
+    assert line.startswith("(") and line.endswith(")\n")
+    values = [float(v) for v in line[1:-2].split(",")]
+    assert len(values) == N_ARGS
+    return values
+
+
+def test_encode_movel_and_movej():
+    pose = (0.1, -0.2, 0.3, 2.2, -2.2, 0.0)
+    assert decode(encode_command(MoveL(pose, 0.5, 0.25, 0.01))) == [OP_MOVEL, *pose, 0.5, 0.25, 0.01]
+    joints = (0.0, -1.57, 1.57, -1.57, -1.57, 0.0)
+    assert decode(encode_command(MoveJ(joints, 1.0, 0.5))) == [OP_MOVEJ, *joints, 1.0, 0.5, 0.0]
+
+
+def test_encode_grip_and_wait():
+    assert decode(encode_command(Grip(40, 20))) == [OP_GRIP, 40.0, 20.0, 1.0] + [0.0] * 6
+    assert decode(encode_command(Grip(80, 20, blocking=False)))[:4] == [OP_GRIP, 80.0, 20.0, 0.0]
+    assert decode(encode_command(WaitGrip())) == [OP_GRIP_WAIT] + [0.0] * 9
+
+
+def test_encode_rejects_unsupported_command():
+    with pytest.raises(TypeError):
+        encode_command(CheckGrasp())
+
+
+def connected_service():
+    """URService collegato a un socketpair: l'altro capo fa la parte del robot."""
+    service = URService("127.0.0.1")
+    service._conn, robot = socket.socketpair()
+    robot.settimeout(2.0)
+    return service, robot
+
+
+def test_run_pipelines_commands_and_reads_grip_reply():
+    service, robot = connected_service()
+    commands = [MoveL((0.1, 0.2, 0.3, 0, 0, 0), 0.5, 0.2), Grip(40, 20)]
+    robot.sendall(b"done\ngrip,39.5,True\n")
+    assert service.run(commands)
+    assert service.last_grip == (39.5, True)
+    sent = robot.recv(4096).decode("ascii")
+    assert sent == "".join(encode_command(c) for c in commands)
+    # Un lotto senza prese azzera l'esito precedente
+    robot.sendall(b"done\n")
+    assert service.run([WaitGrip()])
+    assert service.last_grip is None
+    robot.close()
+    service.close()
+
+
+def test_run_fails_and_closes_on_unexpected_reply():
+    service, robot = connected_service()
+    robot.sendall(b"error\n")
+    assert not service.run([WaitGrip()])
+    assert not service.connected
+    assert not service.run([WaitGrip()])
+    robot.close()
+
+
+def test_accept_waits_for_ready():
+    service = URService("127.0.0.1", port=0, connect_timeout=2.0)
+    service.listen()
+    port = service._server.getsockname()[1]
+
+    def robot():
+        with socket.create_connection(("127.0.0.1", port)) as sock:
+            sock.sendall(b"ready\n")
+            sock.recv(1)     # resta aperto finché il PC non chiude
+
+    thread = threading.Thread(target=robot)
+    thread.start()
+    assert service.accept()
+    assert service.connected
+    service.close()
+    thread.join(timeout=2.0)
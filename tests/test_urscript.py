@@ -0,0 +1,88 @@
+# tests/test_urscript.py
+
+from gripper import render_grip_program
+from urscript import minify, parse_program
+
+
+def test_minify_returns_single_statements_unchanged():
+    script = "movel(p[0.1, 0.2, 0.3, 0, 0, 0], a=0.5, v=0.2)  # commento\n"
+    assert minify(script) == script
+
+
+def test_minify_strips_comments_and_spaces_but_not_strings():
+    script = (
+        "def prog():\n"
+        "  # commento\n"
+        '  textmsg("a  # b")   # fine riga\n'
+        "  x = ( 1 + 2 )\n"
+        "  movel(p[ 0.1, 0.2, 0.3, 0, 0, 0 ], a = 0.5, v = 0.2)\n"
+        "  textmsg(x)\n"
+        "end\n"
+    )
+    assert minify(script) == (
+        "def prog():\n"
+        'textmsg("a  # b")\n'
+        "x=(1 + 2)\n"
+        "movel(p[0.1,0.2,0.3,0,0,0],a=0.5,v=0.2)\n"
+        "textmsg(x)\n"
+        "end\n"
+    )
+
+
+def test_minify_folds_constant_branches():
+    script = (
+        "def prog():\n"
+        "  ON_DEBUG = False\n"
+        "  if ON_DEBUG:\n"
+        '    textmsg("debug")\n'
+        "  else:\n"
+        "    sleep(0.1)\n"
+        "  end\n"
+        "end\n"
+    )
+    # Tolto il ramo, ON_DEBUG non è più letto e sparisce anche l'assegnazione
+    assert minify(script) == "def prog():\nsleep(0.1)\nend\n"
+
+
+def test_minify_keeps_pendant_global_declarations():
+    script = (
+        "def prog():\n"
+        "  if (False):\n"
+        "    global rg_Width = 0\n"
+        "  end\n"
+        "  textmsg(rg_Width)\n"
+        "end\n"
+    )
+    assert "global rg_Width=0" in minify(script)
+
+
+def test_minify_drops_unused_defs_and_idle_threads():
+    script = (
+        "def prog():\n"
+        "  def vg_missing():\n"
+        '    popup("VG")\n'
+        "  end\n"
+        "  thread idle():\n"
+        "    while (True):\n"
+        "      sync()\n"
+        "    end\n"
+        "  end\n"
+        "  run idle()\n"
+        "  def used():\n"
+        "    sleep(0.1)\n"
+        "  end\n"
+        "  used()\n"
+        "end\n"
+    )
+    assert minify(script) == "def prog():\ndef used():\nsleep(0.1)\nend\nused()\nend\n"
+
+
+def test_minify_keeps_grip_program_behaviour():
+    script = render_grip_program(40, compact=False).decode("utf-8")
+    compact = minify(script)
+    assert len(compact) < len(script)
+    # Stessi comandi nel corpo principale, inizializzazione del gripper ancora presente
+    assert parse_program(compact).commands == parse_program(script).commands
+    assert parse_program(compact).needs_gripper_init
+    # Minificare di nuovo non cambia nulla
+    assert minify(compact) == compact